@@ -9,14 +9,14 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from app.models.models import Base
-from app.db.database import DATABASE_URL
+from app.db.database import database_url
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
 # Set the database URL from our database settings
-config.set_main_option("sqlalchemy.url", DATABASE_URL)
+config.set_main_option("sqlalchemy.url", database_url())
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -0,0 +1,124 @@
+"""Add parsed quantity columns to pantry_items
+
+Revision ID: 4f7d2b8e6c15
+Revises: 9a4c2f6b1d3e
+Create Date: 2025-11-26 10:41:08.573120
+
+"""
+from typing import Sequence, Union
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f7d2b8e6c15'
+down_revision: Union[str, Sequence[str], None] = '9a4c2f6b1d3e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copy of app.services.quantities as of this revision, so later
+# parser or unit-table changes cannot alter what this migration writes
+_VULGAR_FRACTIONS = {
+    "½": 1 / 2, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 1 / 4, "¾": 3 / 4,
+    "⅕": 1 / 5, "⅛": 1 / 8, "⅜": 3 / 8, "⅝": 5 / 8, "⅞": 7 / 8,
+}
+_VULGAR = "".join(_VULGAR_FRACTIONS)
+_QUANTITY_PATTERN = re.compile(
+    rf"^\s*(?P<value>\d+\s+\d+\s*/\s*\d+|\d+\s*/\s*\d+|\d*\s*[{_VULGAR}]|\d+(?:[.,]\d+)?)"
+    r"\s*(?P<unit>[^\W\d_]+)?\.?",
+)
+_FRACTION_PATTERN = re.compile(
+    r"^(?:(?P<whole>\d+)\s+)?(?P<numerator>\d+)\s*/\s*(?P<denominator>\d+)$"
+    rf"|^(?P<vulgar_whole>\d+)?\s*(?P<vulgar>[{_VULGAR}])$"
+)
+_UNIT_ALIASES = {
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsp": "tbsp", "tbs": "tbsp",
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsp": "tsp",
+    "g": "g", "gram": "g", "grams": "g", "gr": "g",
+    "kg": "kg", "kilogram": "kg", "kilograms": "kg",
+    "ml": "ml", "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "l": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "pinch": "pinch", "pinches": "pinch",
+    "clove": "clove", "cloves": "clove",
+    "can": "can", "cans": "can",
+    "slice": "slice", "slices": "slice",
+}
+_UNIT_CONVERSIONS = {
+    "g": ("g", 1.0),
+    "kg": ("g", 1000.0),
+    "oz": ("g", 28.349523125),
+    "lb": ("g", 453.59237),
+    "ml": ("ml", 1.0),
+    "l": ("ml", 1000.0),
+    "cup": ("ml", 236.5882365),
+    "tbsp": ("ml", 14.78676478125),
+    "tsp": ("ml", 4.92892159375),
+}
+
+
+def _parse_number(text):
+    fraction = _FRACTION_PATTERN.match(text)
+    if fraction is None:
+        return float(text.replace(",", "."))
+    if fraction.group("vulgar"):
+        return float(fraction.group("vulgar_whole") or 0) + _VULGAR_FRACTIONS[fraction.group("vulgar")]
+    whole = float(fraction.group("whole") or 0)
+    return whole + float(fraction.group("numerator")) / float(fraction.group("denominator"))
+
+
+def _normalize_quantity(text):
+    """(value, unit) in canonical units, or None when text does not start with an amount"""
+    match = _QUANTITY_PATTERN.match(text or "")
+    if match is None:
+        return None
+    try:
+        value = _parse_number(match.group("value"))
+    except (ValueError, ZeroDivisionError):
+        return None
+    unit = match.group("unit")
+    unit = _UNIT_ALIASES.get(unit.lower()) if unit else None
+    canonical_unit, factor = _UNIT_CONVERSIONS.get(unit, (unit, 1.0))
+    return value * factor, canonical_unit
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('pantry_items', sa.Column('quantity_value', sa.Float(), nullable=True))
+    op.add_column('pantry_items', sa.Column('quantity_unit', sa.String(length=10), nullable=True))
+
+    # Backfill from the existing free-text quantities
+    pantry_items = sa.table(
+        'pantry_items',
+        sa.column('id', sa.Integer),
+        sa.column('quantity', sa.String),
+        sa.column('quantity_value', sa.Float),
+        sa.column('quantity_unit', sa.String),
+    )
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(pantry_items.c.id, pantry_items.c.quantity).where(pantry_items.c.quantity.isnot(None))
+    ).all()
+    updates = []
+    for item_id, quantity in rows:
+        parsed = _normalize_quantity(quantity)
+        if parsed is not None:
+            updates.append({"item_id": item_id, "value": parsed[0], "unit": parsed[1]})
+    if updates:
+        bind.execute(
+            pantry_items.update()
+            .where(pantry_items.c.id == sa.bindparam('item_id'))
+            .values(quantity_value=sa.bindparam('value'), quantity_unit=sa.bindparam('unit')),
+            updates,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('pantry_items', 'quantity_unit')
+    op.drop_column('pantry_items', 'quantity_value')
@@ -0,0 +1,31 @@
+"""Add keyset index for liked recipes pagination
+
+Revision ID: 5d8e2a7c1f90
+Revises: b3f1c9d2e7a4
+Create Date: 2025-11-17 10:21:45.903112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d8e2a7c1f90'
+down_revision: Union[str, Sequence[str], None] = 'b3f1c9d2e7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_interactions_user_liked_created', 'user_recipe_interactions',
+        ['user_id', 'liked', 'created_at', 'id'], unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_interactions_user_liked_created', table_name='user_recipe_interactions')
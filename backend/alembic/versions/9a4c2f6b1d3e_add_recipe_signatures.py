@@ -0,0 +1,35 @@
+"""Add recipe_signatures table for similar-recipe lookups
+
+Revision ID: 9a4c2f6b1d3e
+Revises: e7b05f3c8a12
+Create Date: 2025-11-24 14:03:51.218904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c2f6b1d3e'
+down_revision: Union[str, Sequence[str], None] = 'e7b05f3c8a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'recipe_signatures',
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.Column('signature', sa.LargeBinary(), nullable=False),
+        sa.Column('source_updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('recipe_id'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('recipe_signatures')
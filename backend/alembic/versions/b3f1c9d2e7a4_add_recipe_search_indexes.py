@@ -0,0 +1,38 @@
+"""Add recipe search indexes
+
+Revision ID: b3f1c9d2e7a4
+Revises: 46ec0ab64dc0
+Create Date: 2025-11-16 14:02:11.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c9d2e7a4'
+down_revision: Union[str, Sequence[str], None] = '46ec0ab64dc0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'recipes',
+        sa.Column('total_time', sa.Integer(), sa.Computed('prep_time + cook_time', persisted=True)),
+    )
+    op.create_index(op.f('ix_recipes_total_time'), 'recipes', ['total_time'], unique=False)
+    op.create_index(
+        'ix_recipes_fulltext', 'recipes', ['name', 'description', 'ingredients'],
+        unique=False, mysql_prefix='FULLTEXT',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_recipes_fulltext', table_name='recipes')
+    op.drop_index(op.f('ix_recipes_total_time'), table_name='recipes')
+    op.drop_column('recipes', 'total_time')
@@ -0,0 +1,30 @@
+"""Add list version counters to users
+
+Revision ID: c41a7e9b2d35
+Revises: 5d8e2a7c1f90
+Create Date: 2025-11-18 18:47:03.215490
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a7e9b2d35'
+down_revision: Union[str, Sequence[str], None] = '5d8e2a7c1f90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('pantry_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('likes_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'likes_version')
+    op.drop_column('users', 'pantry_version')
@@ -0,0 +1,31 @@
+"""Key recipe_signatures staleness on an ingredients hash
+
+Revision ID: c8d2f4a61e93
+Revises: 4f7d2b8e6c15
+Create Date: 2025-11-27 09:12:44.806215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8d2f4a61e93'
+down_revision: Union[str, Sequence[str], None] = '4f7d2b8e6c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows get no hash and are recomputed on the next preload
+    op.add_column('recipe_signatures', sa.Column('ingredients_hash', sa.String(length=32), nullable=True))
+    op.drop_column('recipe_signatures', 'source_updated_at')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('recipe_signatures', sa.Column('source_updated_at', sa.DateTime(timezone=True), nullable=True))
+    op.drop_column('recipe_signatures', 'ingredients_hash')
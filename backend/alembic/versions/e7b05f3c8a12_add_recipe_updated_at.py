@@ -0,0 +1,33 @@
+"""Add updated_at to recipes
+
+Revision ID: e7b05f3c8a12
+Revises: c41a7e9b2d35
+Create Date: 2025-11-20 09:12:37.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b05f3c8a12'
+down_revision: Union[str, Sequence[str], None] = 'c41a7e9b2d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'recipes',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    )
+    op.create_index(op.f('ix_recipes_updated_at'), 'recipes', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_recipes_updated_at'), table_name='recipes')
+    op.drop_column('recipes', 'updated_at')
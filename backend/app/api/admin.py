@@ -0,0 +1,74 @@
+"""
+Admin endpoints for DADLY
+Handles on-demand diagnostics for production workers
+"""
+
+import asyncio
+from typing import Annotated, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from app.api.auth import get_admin_user
+from app.config.config import Config, get_logger
+from app.core.loop_monitor import loop_monitor
+from app.core.profiler import ProfilerBusy, profile
+from app.models.models import User
+
+router = APIRouter()
+logger = get_logger(__name__)
+
+
+@router.get("/profile", tags=["Admin"])
+async def capture_profile(
+    admin: Annotated[User, Depends(get_admin_user)],
+    seconds: float = Query(10, gt=0),
+    interval_ms: Optional[float] = Query(None, ge=1, le=1000),
+    format: Literal["collapsed", "speedscope"] = "collapsed",
+    route: Optional[str] = Query(None, description="Route template, e.g. /api/v1/recipes/feed"),
+):
+    """
+    Sample the stacks of every thread in this worker for a while
+
+    - **seconds**: How long to sample (at most PROFILER_MAX_SECONDS)
+    - **interval_ms**: Time between samples (defaults to PROFILER_INTERVAL_MS)
+    - **format**: `collapsed` (flamegraph.pl / speedscope text) or `speedscope` JSON
+    - **route**: Only keep samples taken while serving this route
+
+    Sampling runs in a background thread, so the worker keeps serving the
+    traffic being profiled. Only one profile runs per worker at a time;
+    with several workers, each request profiles whichever worker accepted it.
+    """
+    if seconds > Config.PROFILER_MAX_SECONDS:
+        raise HTTPException(status_code=422,
+                            detail=f"seconds must be at most {Config.PROFILER_MAX_SECONDS:g}")
+    if interval_ms is None:
+        interval_ms = Config.PROFILER_INTERVAL_MS
+
+    logger.info("Profiling for %gs (interval %gms, route %s) requested by user %s",
+                seconds, interval_ms, route or "any", admin.id)
+    try:
+        result = await asyncio.to_thread(profile, seconds, interval_ms / 1000, route)
+    except ProfilerBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="A profile is already running on this worker")
+
+    headers = {"X-Profile-Samples": str(result.samples)}
+    if format == "speedscope":
+        return JSONResponse(result.speedscope(), headers=headers)
+    return PlainTextResponse(result.collapsed(), headers=headers)
+
+
+@router.get("/loop-stalls", tags=["Admin"])
+async def get_loop_stalls(admin: Annotated[User, Depends(get_admin_user)]):
+    """
+    Recent event-loop stalls in this worker, most recent first
+
+    Each stall has its duration, the route whose handler blocked the loop
+    ("background" outside requests) and the blocking stack, outermost frame
+    first. Lag and stall counts per route are also exported on /metrics.
+    """
+    return {
+        "threshold_ms": loop_monitor.threshold * 1000,
+        "stalls": loop_monitor.recent_stalls(),
+    }
@@ -1,29 +1,25 @@
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Optional
 from fastapi import APIRouter, HTTPException, Depends, status, Header
-import bcrypt
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from jose import JWTError, jwt
 
 from app.schemas.schemas import UserCreate, UserResponse, Token, TokenWithRefresh, RefreshTokenRequest
 from app.db.database import db_dependency
 from app.models.models import User
 from app.config.config import get_logger, Config
+from app.core.token_cache import TokenClaimsCache
 
 logger = get_logger(__name__)
 
 router = APIRouter()
 
-# JWT Configuration from Config class
-SECRET_KEY = Config.SECRET_KEY
-ALGORITHM = Config.ALGORITHM
-ACCESS_TOKEN_EXPIRE_MINUTES = Config.ACCESS_TOKEN_EXPIRE_MINUTES
-REFRESH_TOKEN_EXPIRE_DAYS = Config.REFRESH_TOKEN_EXPIRE_DAYS
-
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
 token_blacklist = set()
 
+# Sized from Config.TOKEN_CACHE_* on first use
+token_claims_cache = TokenClaimsCache()
+
 
 @router.post("/register", response_model=UserResponse, tags=["Authentication"])
 async def register_user(db: db_dependency, user: UserCreate):
@@ -36,6 +32,9 @@ async def register_user(db: db_dependency, user: UserCreate):
     - **dietary_type**: Optional dietary preference
     - **allergies**: Optional allergy information
     """
+    # Deferred: bcrypt and jose are imported on first use so workers start faster
+    import bcrypt
+
     # Check if user already exists
     existing_user = db.query(User).filter(User.email == user.email).first()
     if existing_user:
@@ -54,7 +53,7 @@ async def register_user(db: db_dependency, user: UserCreate):
     db.commit()
     db.refresh(create_user_model)
     
-    logger.info(f"New user registered: {user.email}")
+    logger.info("New user registered: %s", user.email)
     return create_user_model
 
 
@@ -79,10 +78,10 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
             headers={"WWW-Authenticate": "Bearer"}
         )
     
-    access_token = create_access_token(user.email, user.id, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    refresh_token = create_refresh_token(user.email, user.id, timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
+    access_token = create_access_token(user.email, user.id, timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES))
+    refresh_token = create_refresh_token(user.email, user.id, timedelta(days=Config.REFRESH_TOKEN_EXPIRE_DAYS))
     
-    logger.info(f"User logged in: {user.email}")
+    logger.info("User logged in: %s", user.email)
     return {
         "access_token": access_token,
         "refresh_token": refresh_token,
@@ -92,6 +91,8 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
 
 def authenticate_user(email: str, password: str, db: db_dependency):
     """Authenticate user by email and password"""
+    import bcrypt
+
     user = db.query(User).filter(User.email == email).first()
 
     if not user:
@@ -103,22 +104,44 @@ def authenticate_user(email: str, password: str, db: db_dependency):
 
 def create_access_token(email: str, user_id: int, expires_delta: timedelta):
     """Create JWT access token"""
+    from jose import jwt
+
     encode = {"sub": email, "id": user_id, "type": "access"}
     expires = datetime.now(timezone.utc) + expires_delta
     encode.update({"exp": expires})
-    return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(encode, Config.SECRET_KEY, algorithm=Config.ALGORITHM)
 
 
 def create_refresh_token(email: str, user_id: int, expires_delta: timedelta):
     """Create JWT refresh token"""
+    from jose import jwt
+
     encode = {"sub": email, "id": user_id, "type": "refresh"}
     expires = datetime.now(timezone.utc) + expires_delta
     encode.update({"exp": expires})
-    return jwt.encode(encode, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(encode, Config.SECRET_KEY, algorithm=Config.ALGORITHM)
+
+
+def decode_access_token(token: str) -> dict:
+    """
+    Verify a JWT and return its claims, reusing earlier verifications.
+
+    Callers must check token_blacklist first. Raises JWTError for
+    invalid or expired tokens (these are never cached).
+    """
+    claims = token_claims_cache.get(token)
+    if claims is None:
+        from jose import jwt
+
+        claims = jwt.decode(token, Config.SECRET_KEY, algorithms=[Config.ALGORITHM])
+        token_claims_cache.put(token, claims)
+    return claims
 
 
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: db_dependency):
     """Get current user from access token"""
+    from jose import JWTError
+
     # Check if token is blacklisted
     if token in token_blacklist:
         raise HTTPException(
@@ -127,7 +150,7 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: db
         )
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         email: str = payload.get("sub")
         user_id: int = payload.get("id")
         token_type: str = payload.get("type")
@@ -172,6 +195,8 @@ async def get_current_user_optional(
     # If no authorization header, return None (guest user)
     if not authorization:
         return None
+
+    from jose import JWTError
     
     # Extract token from "Bearer <token>" format
     try:
@@ -186,7 +211,7 @@ async def get_current_user_optional(
         return None
     
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_access_token(token)
         email: str = payload.get("sub")
         user_id: int = payload.get("id")
         token_type: str = payload.get("type")
@@ -204,6 +229,15 @@ async def get_current_user_optional(
     except JWTError:
         return None  # Invalid token - treat as guest
 
+
+async def get_admin_user(current_user: Annotated[User, Depends(get_current_user)]) -> User:
+    """Current user, if their email is listed in Config.ADMIN_EMAILS"""
+    if current_user.email.lower() not in Config.ADMIN_EMAILS:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Admin access required.")
+    return current_user
+
+
 @router.get("/me", response_model=UserResponse, tags=["Authentication"])
 async def get_me(current_user: Annotated[User, Depends(get_current_user)]):
     """
@@ -224,6 +258,8 @@ async def refresh_access_token(request: RefreshTokenRequest, db: db_dependency):
     
     Returns new access token
     """
+    from jose import JWTError, jwt
+
     refresh_token = request.refresh_token
     
     # Check if token is blacklisted
@@ -234,7 +270,7 @@ async def refresh_access_token(request: RefreshTokenRequest, db: db_dependency):
         )
     
     try:
-        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(refresh_token, Config.SECRET_KEY, algorithms=[Config.ALGORITHM])
         email: str = payload.get("sub")
         user_id: int = payload.get("id")
         token_type: str = payload.get("type")
@@ -264,10 +300,10 @@ async def refresh_access_token(request: RefreshTokenRequest, db: db_dependency):
         new_access_token = create_access_token(
             user.email, 
             user.id, 
-            timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+            timedelta(minutes=Config.ACCESS_TOKEN_EXPIRE_MINUTES)
         )
         
-        logger.info(f"Access token refreshed for user: {user.email}")
+        logger.info("Access token refreshed for user: %s", user.email)
         return {
             "access_token": new_access_token,
             "token_type": "bearer"
@@ -291,6 +327,7 @@ async def logout(current_user: Annotated[User, Depends(get_current_user)],
     """
     # Add token to blacklist
     token_blacklist.add(token)
+    token_claims_cache.discard(token)
     
-    logger.info(f"User logged out: {current_user.email}")
+    logger.info("User logged out: %s", current_user.email)
     return {"message": "Successfully logged out"}   
\ No newline at end of file
@@ -1,19 +1,56 @@
-from fastapi import APIRouter
+"""
+Health check endpoints for DADLY
+Handles liveness and readiness probes
+"""
+
 from datetime import datetime
 
+from fastapi import APIRouter, Response
+from fastapi.responses import JSONResponse
+
 from app.config.config import Config, get_logger
+from app.core.readiness import readiness_monitor
 
 logger = get_logger(__name__)
 
+LIVE_BODY = b'{"status":"OK"}'
+
 
 router = APIRouter()
 
-@router.api_route("/health", methods=["GET", "HEAD"], tags=["Health"])
+# HEAD is registered separately and kept out of the schema; on a shared
+# GET/HEAD route both methods get the same OpenAPI operation id
+
+@router.get("/health", tags=["Health"])
+@router.head("/health", include_in_schema=False)
 async def health_check():
-    baku_tz = Config.get_timezone() 
-    baku_time = datetime.now(tz=baku_tz).strftime("%Y-%m-%d %H:%M:%S")
-    logger.info(f"Health check called at {baku_time}")
+    baku_time = datetime.now(tz=Config.get_timezone()).strftime("%Y-%m-%d %H:%M:%S")
     return {
         "status": "OK",
         "time_baku": baku_time
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/health/live", tags=["Health"])
+@router.head("/health/live", include_in_schema=False)
+async def liveness():
+    """
+    Liveness probe: the process is serving requests
+
+    Constant response with no I/O, for frequent orchestrator probes.
+    """
+    return Response(LIVE_BODY, media_type="application/json")
+
+
+@router.get("/health/ready", tags=["Health"])
+@router.head("/health/ready", include_in_schema=False)
+async def readiness():
+    """
+    Readiness probe: the worker can serve traffic
+
+    Returns the cached result of the background database ping and
+    connection-pool check (200 when ready, 503 otherwise), so probes
+    add no database load.
+    """
+    ready, body = readiness_monitor.snapshot()
+    return JSONResponse(body, status_code=200 if ready else 503)
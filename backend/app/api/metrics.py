@@ -0,0 +1,23 @@
+"""
+Prometheus metrics endpoint for DADLY
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.core.metrics import registry
+
+router = APIRouter()
+
+# Prometheus text exposition format, version 0.0.4
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", response_class=PlainTextResponse, tags=["Monitoring"])
+async def get_metrics():
+    """
+    Expose request timing and SQL metrics in Prometheus text format
+
+    Per-route histograms of total time, DB time and query count.
+    """
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
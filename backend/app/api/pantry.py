@@ -3,9 +3,9 @@ Pantry and ingredient management endpoints for DADLY
 Handles user's pantry items and ingredient tracking
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from typing import Annotated
-from sqlalchemy import func
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from typing import Annotated, Optional
+from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
 from app.db.database import db_dependency
@@ -13,6 +13,16 @@ from app.models.models import User, PantryItem
 from app.api.auth import get_current_user
 from app.schemas.schemas import AddIngredientRequest, BulkAddRequest, PantryItemResponse
 from app.config.config import get_logger
+from app.core.http_cache import (
+    weak_etag,
+    is_not_modified,
+    not_modified_response,
+    set_cache_headers,
+    bump_pantry_version,
+)
+from app.core.idempotency import idempotency_store
+from app.services.ingredients import canonical_ingredient
+from app.services.quantities import Quantity, normalize_quantity
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -21,13 +31,41 @@ logger = get_logger(__name__)
 def normalize_ingredient_name(name: str) -> str:
     """
     Normalize ingredient name to lowercase and strip whitespace.
-    Ensures consistent storage and comparison.
+    This is the name stored and shown; see ingredient_key for comparisons.
     """
     return name.strip().lower()
 
 
+def ingredient_key(name: str) -> str:
+    """
+    Canonical key of a pantry name ("cherry tomatoes" -> "tomato").
+    Used to find duplicates and to match recipe ingredients, never stored.
+    """
+    return canonical_ingredient(name)
+
+
+def pantry_keys(db: Session, user_id: int) -> set[str]:
+    """Canonical keys of everything already in a user's pantry"""
+    names = db.query(PantryItem.ingredient_name).filter(PantryItem.user_id == user_id).all()
+    return {ingredient_key(name) for (name,) in names}
+
+
+def new_pantry_item(user_id: int, ingredient_name: str, quantity: Optional[str],
+                    parsed: Optional[Quantity]) -> PantryItem:
+    """Pantry row keeping the raw quantity text next to its canonical amount"""
+    return PantryItem(
+        user_id=user_id,
+        ingredient_name=ingredient_name,
+        quantity=quantity,
+        quantity_value=parsed.value if parsed else None,
+        quantity_unit=parsed.unit if parsed else None,
+    )
+
+
 @router.get("/", response_model=list[PantryItemResponse], tags=["Pantry"])
 async def get_pantry_ingredients(
+    request: Request,
+    response: Response,
     current_user: Annotated[User, Depends(get_current_user)],
     db: db_dependency
 ):
@@ -35,8 +73,17 @@ async def get_pantry_ingredients(
     Get all ingredients in user's pantry
     
     Returns list of pantry items ordered by most recently added.
+    Supports conditional GET: send the returned ETag in If-None-Match
+    to get an empty 304 when the pantry has not changed.
     """
     try:
+        # The version counter is already loaded with the user, so an
+        # unchanged pantry costs no extra query
+        etag = weak_etag("pantry", current_user.id, current_user.pantry_version)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        set_cache_headers(response, etag)
+        
         # Get all pantry items for user
         pantry_items = db.query(PantryItem).filter(
             PantryItem.user_id == current_user.id
@@ -45,7 +92,7 @@ async def get_pantry_ingredients(
         return pantry_items
         
     except Exception as e:
-        logger.error(f"Error getting pantry for user {current_user.id}: {e}")
+        logger.error("Error getting pantry for user %s: %s", current_user.id, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -58,7 +105,8 @@ async def add_pantry_ingredient(
     """
     Add single ingredient to user's pantry
     
-    Rejects if ingredient already exists (case-insensitive).
+    Rejects if the ingredient already exists under any name with the same
+    canonical key ("tomatoes" when "cherry tomato" is stored).
     Stores ingredient name in lowercase for consistency.
     """
     try:
@@ -66,26 +114,20 @@ async def add_pantry_ingredient(
         # (Validation already done by Pydantic schema)
         ingredient_lower = normalize_ingredient_name(request.ingredient_name)
         
-        # Check if ingredient already exists (case-insensitive)
-        # Use func.lower() to handle any legacy mixed-case data
-        existing = db.query(PantryItem).filter(
-            PantryItem.user_id == current_user.id,
-            func.lower(PantryItem.ingredient_name) == ingredient_lower
-        ).first()
-        
-        if existing:
+        # Compare canonical keys; the unique constraint below still guards
+        # the exact name against concurrent adds
+        if ingredient_key(ingredient_lower) in pantry_keys(db, current_user.id):
             raise HTTPException(
                 status_code=400, 
                 detail=f"Ingredient '{ingredient_lower}' already exists in pantry"
             )
         
         # Add new ingredient
-        new_item = PantryItem(
-            user_id=current_user.id,
-            ingredient_name=ingredient_lower,
-            quantity=request.quantity
+        new_item = new_pantry_item(
+            current_user.id, ingredient_lower, request.quantity, normalize_quantity(request.quantity)
         )
         db.add(new_item)
+        bump_pantry_version(db, current_user.id)
         
         try:
             db.commit()
@@ -98,7 +140,7 @@ async def add_pantry_ingredient(
                 detail=f"Ingredient '{ingredient_lower}' already exists in pantry"
             )
         
-        logger.info(f"User {current_user.id} added ingredient: {ingredient_lower}")
+        logger.info("User %s added ingredient: %s", current_user.id, ingredient_lower)
         
         return {
             "message": "Ingredient added successfully",
@@ -106,6 +148,8 @@ async def add_pantry_ingredient(
                 "id": new_item.id,
                 "ingredient_name": new_item.ingredient_name,
                 "quantity": new_item.quantity,
+                "quantity_value": new_item.quantity_value,
+                "quantity_unit": new_item.quantity_unit,
                 "added_at": new_item.added_at.isoformat()
             }
         }
@@ -113,7 +157,7 @@ async def add_pantry_ingredient(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error adding ingredient for user {current_user.id}: {e}")
+        logger.error("Error adding ingredient for user %s: %s", current_user.id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -122,7 +166,8 @@ async def add_pantry_ingredient(
 async def add_multiple_ingredients(
     request: BulkAddRequest,
     current_user: Annotated[User, Depends(get_current_user)],
-    db: db_dependency
+    db: db_dependency,
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
     """
     Add multiple ingredients to pantry at once
@@ -130,89 +175,95 @@ async def add_multiple_ingredients(
     Automatically deduplicates the input list (keeps first occurrence).
     Skips ingredients that already exist in user's pantry.
     Returns summary of added and skipped items.
+    A retry carrying the same Idempotency-Key header replays the first response
+    (409 while the first request is still running).
     """
+    request_body = request.model_dump()
+    replay = idempotency_store.begin(current_user.id, "bulk_add", idempotency_key, request_body)
+    if replay is not None:
+        return replay
+    
     try:
         if not request.ingredients:
             raise HTTPException(status_code=400, detail="Ingredients list cannot be empty")
         
-        # Get existing pantry items (normalize to lowercase for comparison)
-        existing_items = db.query(func.lower(PantryItem.ingredient_name)).filter(
-            PantryItem.user_id == current_user.id
-        ).all()
-        existing_set = {item[0] for item in existing_items}
+        # Canonical keys of existing pantry items, for comparison
+        existing_keys = pantry_keys(db, current_user.id)
         
-        # Deduplicate input list (case-insensitive, keep first)
+        # Deduplicate input list by canonical key (keep first) and parse
+        # each quantity once; the retry path below reuses the parsed values
         # Validation already done by Pydantic schema for each AddIngredientRequest
         seen = set()
         unique_ingredients = []
+        existing_set = set()
         
         for item in request.ingredients:
             ingredient_lower = normalize_ingredient_name(item.ingredient_name)
+            key = ingredient_key(ingredient_lower)
             
-            if ingredient_lower not in seen:
-                seen.add(ingredient_lower)
-                unique_ingredients.append((ingredient_lower, item.quantity))
+            if key not in seen:
+                seen.add(key)
+                unique_ingredients.append((ingredient_lower, item.quantity, normalize_quantity(item.quantity)))
+                if key in existing_keys:
+                    existing_set.add(ingredient_lower)
         
         # Add ingredients (skip existing check, rely on unique constraint)
         # This prevents race conditions by letting database enforce uniqueness
         added = []
         skipped = []
         
-        for ingredient_name, quantity in unique_ingredients:
+        for ingredient_name, quantity, parsed in unique_ingredients:
             # Skip if we already know it exists from our pre-check
             if ingredient_name in existing_set:
                 skipped.append(ingredient_name)
                 continue
             
-            new_item = PantryItem(
-                user_id=current_user.id,
-                ingredient_name=ingredient_name,
-                quantity=quantity
-            )
-            db.add(new_item)
+            db.add(new_pantry_item(current_user.id, ingredient_name, quantity, parsed))
+        bump_pantry_version(db, current_user.id)
         
         # Commit all at once - if any constraint violation, handle it
         try:
             db.commit()
             # If successful, all items were added
-            added = [name for name, _ in unique_ingredients if name not in existing_set]
+            added = [name for name, _, _ in unique_ingredients if name not in existing_set]
         except IntegrityError:
             # Some items conflicted - need to check which ones succeeded
             db.rollback()
             # Re-add one by one to identify conflicts
-            for ingredient_name, quantity in unique_ingredients:
+            for ingredient_name, quantity, parsed in unique_ingredients:
                 if ingredient_name in existing_set:
                     skipped.append(ingredient_name)
                     continue
                 try:
-                    new_item = PantryItem(
-                        user_id=current_user.id,
-                        ingredient_name=ingredient_name,
-                        quantity=quantity
-                    )
-                    db.add(new_item)
+                    db.add(new_pantry_item(current_user.id, ingredient_name, quantity, parsed))
+                    bump_pantry_version(db, current_user.id)
                     db.commit()
                     added.append(ingredient_name)
                 except IntegrityError:
                     db.rollback()
                     skipped.append(ingredient_name)
         
-        logger.info(f"User {current_user.id} bulk added {len(added)} ingredients, skipped {len(skipped)}")
+        logger.info("User %s bulk added %s ingredients, skipped %s", current_user.id, len(added), len(skipped))
         
-        return {
+        result = {
             "message": "Bulk add completed",
             "added": added,
             "skipped": skipped,
             "added_count": len(added),
             "skipped_count": len(skipped)
         }
+        idempotency_store.remember(current_user.id, "bulk_add", idempotency_key, request_body, body=result)
+        return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error bulk adding ingredients for user {current_user.id}: {e}")
+        logger.error("Error bulk adding ingredients for user %s: %s", current_user.id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        # No-op once the response was remembered
+        idempotency_store.release(current_user.id, "bulk_add", idempotency_key)
 
 
 @router.delete("/{ingredient_id}", tags=["Pantry"])
@@ -241,9 +292,10 @@ async def remove_pantry_ingredient(
         
         ingredient_name = ingredient.ingredient_name
         db.delete(ingredient)
+        bump_pantry_version(db, current_user.id)
         db.commit()
         
-        logger.info(f"User {current_user.id} deleted ingredient: {ingredient_name}")
+        logger.info("User %s deleted ingredient: %s", current_user.id, ingredient_name)
         
         return {
             "message": "Ingredient removed successfully",
@@ -253,7 +305,7 @@ async def remove_pantry_ingredient(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting ingredient {ingredient_id}: {e}")
+        logger.error("Error deleting ingredient %s: %s", ingredient_id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -273,10 +325,11 @@ async def clear_pantry(
         deleted_count = db.query(PantryItem).filter(
             PantryItem.user_id == current_user.id
         ).delete(synchronize_session=False)
+        bump_pantry_version(db, current_user.id)
         
         db.commit()
         
-        logger.info(f"User {current_user.id} cleared pantry ({deleted_count} items)")
+        logger.info("User %s cleared pantry (%s items)", current_user.id, deleted_count)
         
         return {
             "message": "Pantry cleared successfully",
@@ -284,6 +337,6 @@ async def clear_pantry(
         }
         
     except Exception as e:
-        logger.error(f"Error clearing pantry for user {current_user.id}: {e}")
+        logger.error("Error clearing pantry for user %s: %s", current_user.id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")    
\ No newline at end of file
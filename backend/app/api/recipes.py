@@ -3,18 +3,48 @@ Recipe management and discovery endpoints for DADLY
 Handles recipe operations, swiping, and recommendations
 """
 
+import base64
+import binascii
+import heapq
 import json
+import random
+import re
 from datetime import datetime
 from typing import Optional, Annotated
-from fastapi import APIRouter, HTTPException, Query, Depends
-from sqlalchemy import func, or_, update, case
+from fastapi import APIRouter, HTTPException, Query, Depends, Header, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, or_, and_, update, select, text
+from sqlalchemy.dialects.mysql import match
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer_group
 
-from app.schemas.schemas import RecipeResponse
-from app.db.database import db_dependency
+from app.schemas.schemas import RecipeResponse, DifficultyLevel
+from app.db.database import db_dependency, detached_session
 from app.models.models import Recipe, User, UserRecipeInteraction, PantryItem
-from app.config.config import get_logger
+from app.config.config import get_logger, Config
 from app.api.auth import get_current_user, get_current_user_optional
+from app.services.catalog import recipe_catalog
+from app.services.guest_feed import guest_feed_pool
+from app.services.ingredient_index import ingredient_index, parse_ingredients
+from app.services.similarity import similarity_index, minhash
+from app.services.shopping_list import build_shopping_list
+from app.services.meal_plan import (
+    MealCandidate,
+    MealPlanSolver,
+    allergen_phrases,
+    excluded_ingredients,
+    mentions_any,
+)
+from app.core.single_flight import SingleFlight, make_key
+from app.core.idempotency import idempotency_store
+from app.core.http_cache import (
+    weak_etag,
+    content_digest,
+    is_not_modified,
+    not_modified_response,
+    set_cache_headers,
+    bump_likes_version,
+)
 
 router = APIRouter()
 logger = get_logger(__name__)
@@ -22,20 +52,33 @@ logger = get_logger(__name__)
 # Constants for feed optimization and security
 MAX_EXCLUDE_IDS = 100  # Maximum number of excluded recipe IDs to prevent abuse
 MAX_EXCLUDE_LENGTH = 1000  # Maximum length of exclude parameter string
+MAX_SEARCH_TERMS = 10  # Maximum number of words used from a search query
+MAX_SHOPPING_LIST_RECIPES = 50  # Maximum number of recipes in one shopping list
 
+# Coalesces concurrent GET /recipes/{id} for the same (e.g. trending) recipe
+recipe_detail_flight = SingleFlight("recipe_detail")
+
+
+def encode_liked_cursor(created_at: datetime, interaction_id: int) -> str:
+    """Encode a (created_at, id) keyset position as an opaque URL-safe cursor"""
+    raw = f"{created_at.isoformat()}|{interaction_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_liked_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_liked_cursor.
+
+    Raises ValueError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_at_str, interaction_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at_str), int(interaction_id)
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise ValueError(f"Malformed cursor: {e}") from e
 
-# Helper function to create minimal recipe response
-def create_minimal_recipe_response(recipe: Recipe) -> dict:
-    """Create minimal recipe data for feed"""
-    return {
-        "id": recipe.id,
-        "name": recipe.name,
-        "image_url": recipe.image_url,
-        "prep_time": recipe.prep_time,
-        "cook_time": recipe.cook_time,
-        "difficulty": recipe.difficulty,
-        "like_count": recipe.like_count,
-    }
 
 
 @router.get("/feed", tags=["Recipes"])
@@ -49,8 +92,8 @@ async def get_recipe_feed(
     Get recipe feed for swiping interface
     
     **Guest users (no authentication):**
-    - Returns random recipes
-    - No personalization
+    - Returns random recipes from a shared, periodically reshuffled pool
+    - No personalization, no database query per request
     - Cannot use 'exclude' parameter
     
     **Authenticated users (with login):**
@@ -64,11 +107,13 @@ async def get_recipe_feed(
     try:
         # ===== GUEST USER PATH (no authentication) =====
         if current_user is None:
-            # Simple random feed for guests - no personalization
-            recipes = db.query(Recipe).order_by(func.random()).limit(limit).all()
-            result = [create_minimal_recipe_response(recipe) for recipe in recipes]
-            logger.info(f"Returned {len(result)} random recipes for guest user")
-            return result
+            # Sample pre-serialized cards from the shared guest pool
+            guest_feed_pool.ensure_loaded(db)
+            logger.info("Returned up to %s pooled random recipes for guest user", limit)
+            return Response(content=guest_feed_pool.sample_json(limit), media_type="application/json")
+        
+        # Only ids come from the database; cards are filled from the in-memory catalog
+        recipe_catalog.refresh_if_stale(db)
         
         # ===== AUTHENTICATED USER PATH (with login) ====
         # Get liked recipe IDs (permanent exclusion)
@@ -83,7 +128,7 @@ async def get_recipe_feed(
         if exclude:
             # Validate exclude parameter length to prevent DoS
             if len(exclude) > MAX_EXCLUDE_LENGTH:
-                logger.warning(f"Exclude parameter too long ({len(exclude)} > {MAX_EXCLUDE_LENGTH} chars).")
+                logger.warning("Exclude parameter too long (%s > %s chars).", len(exclude), MAX_EXCLUDE_LENGTH)
                 raise HTTPException(
                     status_code=400, 
                     detail=f"Exclude parameter too long (max {MAX_EXCLUDE_LENGTH} chars)."
@@ -94,7 +139,7 @@ async def get_recipe_feed(
                 
                 # Validate number of excluded IDs to prevent abuse
                 if len(exclude_items) > MAX_EXCLUDE_IDS:
-                    logger.warning(f"Too many IDs in exclude parameter ({len(exclude_items)} > {MAX_EXCLUDE_IDS}).")
+                    logger.warning("Too many IDs in exclude parameter (%s > %s).", len(exclude_items), MAX_EXCLUDE_IDS)
                     raise HTTPException(
                         status_code=400, 
                         detail=f"Too many excluded IDs (max {MAX_EXCLUDE_IDS})."
@@ -102,81 +147,323 @@ async def get_recipe_feed(
                 
                 session_excluded_ids = [int(x) for x in exclude_items]
             except ValueError:
-                logger.warning(f"Invalid exclude parameter: {exclude}. Contains non-integer values.")
+                logger.warning("Invalid exclude parameter: %s. Contains non-integer values.", exclude)
                 raise HTTPException(status_code=400, detail="Exclude parameter must contain valid integer IDs.")
         
         # Combine exclusions
         excluded_ids = list(set(liked_ids + session_excluded_ids))
         
-        # Base query
-        query = db.query(Recipe)
+        # Base query (ids only)
+        query = select(Recipe.id)
         
         # Exclude already seen/liked recipes
         if excluded_ids:
-            query = query.filter(~Recipe.id.in_(excluded_ids))
+            query = query.where(~Recipe.id.in_(excluded_ids))
         
         # Check if user has pantry items
-        pantry_items = db.query(PantryItem).filter(
-            PantryItem.user_id == current_user.id
-        ).all()
-        
-        if pantry_items:
-            # User has pantry items - match recipes by ingredients
-            ingredient_names = [item.ingredient_name.lower() for item in pantry_items]
-            
-            # Build SQL-based scoring using CASE expressions for each ingredient
-            # This moves scoring to database level for better performance (O(n) vs O(nmk))
-            match_cases = []
-            ingredient_conditions = []
-            
-            for ingredient in ingredient_names:
-                # Escape SQL LIKE wildcards (% and _) to prevent unintended matching
-                escaped_ingredient = ingredient.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
-                pattern = f'%{escaped_ingredient}%'
-                
-                # Build CASE expression: 1 if match, 0 otherwise
-                match_cases.append(
-                    case(
-                        (Recipe.ingredients.ilike(pattern, escape='\\'), 1),  # Positional tuple
-                        else_=0
-                    )
-                )
-                
-                # Also build OR condition for filtering
-                ingredient_conditions.append(Recipe.ingredients.ilike(pattern, escape='\\'))
-            
-            # Check if we have valid ingredients to match
-            if not match_cases:
-                # No valid pantry items to match - return random recipes
-                recipes = query.order_by(func.random()).limit(limit).all()
-            else:
-                # Add computed match_count column by summing all CASE expressions
-                # Chain CASE expressions with + operator to create proper SQL expression
-                match_count_expr = match_cases[0]
-                for case_expr in match_cases[1:]:
-                    match_count_expr = match_count_expr + case_expr
-                
-                query = query.add_columns(match_count_expr.label('match_count'))
-                
-                # Order by match count (highest first), then random for recipes with same match count
-                query = query.order_by(match_count_expr.desc(), func.random())
-                query = query.limit(limit)
-                
-                # Execute query - results are tuples of (Recipe, match_count)
-                results = query.all()
-                recipes = [result[0] for result in results]
-        else:
-            # No pantry items - return random recipes
-            recipes = query.order_by(func.random()).limit(limit).all()
+        pantry_names = db.execute(
+            select(PantryItem.ingredient_name).where(PantryItem.user_id == current_user.id)
+        ).scalars().all()
+        
+        recipe_ids = []
+        if pantry_names:
+            # User has pantry items - rank recipes by canonical ingredient overlap,
+            # counted from the in-memory ingredient index instead of LIKE scans
+            ingredient_index.refresh_if_stale(db)
+            hits = ingredient_index.hit_counts(pantry_names)
+            excluded = set(excluded_ids)
+            # Highest match count first, random order among equal counts
+            recipe_ids = heapq.nlargest(
+                limit,
+                (recipe_id for recipe_id in hits if recipe_id not in excluded),
+                key=lambda recipe_id: (hits[recipe_id], random.random()),
+            )
+        
+        if len(recipe_ids) < limit:
+            # No (or not enough) pantry matches - fill with random recipes
+            if recipe_ids:
+                query = query.where(~Recipe.id.in_(recipe_ids))
+            recipe_ids += db.execute(
+                query.order_by(func.random()).limit(limit - len(recipe_ids))
+            ).scalars().all()
         
         # Convert to minimal response
-        result = [create_minimal_recipe_response(recipe) for recipe in recipes]
+        result = recipe_catalog.cards(db, recipe_ids)
         
-        logger.info(f"Returned {len(result)} recipes for user {current_user.id}")
+        logger.info("Returned %s recipes for user %s", len(result), current_user.id)
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error getting recipe feed: {e}")
+        logger.error("Error getting recipe feed: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def build_search_filter(db, search_query: str):
+    """
+    Build a full-text filter for the search query.
+
+    Uses the MySQL FULLTEXT index (boolean mode, prefix match on every word)
+    and falls back to the SQLite FTS5 table in tests. Returns None when the
+    query contains no searchable words.
+    """
+    terms = re.findall(r"\w+", search_query.lower())[:MAX_SEARCH_TERMS]
+    if not terms:
+        return None
+
+    if db.get_bind().dialect.name == "sqlite":
+        fts_query = " ".join(f'"{term}"*' for term in terms)
+        matching_ids = select(text("rowid")).select_from(text("recipes_fts")).where(
+            text("recipes_fts MATCH :fts_query").bindparams(fts_query=fts_query)
+        )
+        return Recipe.id.in_(matching_ids)
+
+    boolean_query = " ".join(f"+{term}*" for term in terms)
+    return match(
+        Recipe.name, Recipe.description, Recipe.ingredients, against=boolean_query
+    ).in_boolean_mode()
+
+
+@router.get("/search", tags=["Recipes"])
+async def search_recipes(
+    db: db_dependency,
+    q: Optional[str] = Query(None, max_length=200, description="Words to search in name, description and ingredients"),
+    difficulty: Optional[DifficultyLevel] = Query(None),
+    max_total_time: Optional[int] = Query(None, ge=1, description="Maximum prep_time + cook_time in minutes"),
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[int] = Query(None, ge=1, description="Cursor for pagination (next_cursor from previous response)"),
+):
+    """
+    Browse and search recipes with keyset pagination
+
+    - **q**: Optional full-text query; every word must match (prefix match)
+    - **difficulty**: Optional difficulty filter (easy, medium, hard)
+    - **max_total_time**: Optional limit on prep_time + cook_time
+
+    Results are ordered newest first. Pagination seeks by recipe id instead
+    of using OFFSET, so deep pages cost the same as the first one.
+    Pass the 'next_cursor' from the response to get the next page.
+
+    This endpoint is public (no authentication required).
+    """
+    try:
+        query = select(Recipe.id)
+
+        if q:
+            search_filter = build_search_filter(db, q)
+            if search_filter is None:
+                return {"recipes": [], "next_cursor": None, "has_more": False}
+            query = query.where(search_filter)
+
+        if difficulty is not None:
+            query = query.where(Recipe.difficulty == difficulty.value)
+
+        if max_total_time is not None:
+            query = query.where(Recipe.total_time <= max_total_time)
+
+        # Keyset pagination: seek past the last id of the previous page
+        if cursor is not None:
+            query = query.where(Recipe.id < cursor)
+
+        # Fetch one extra to determine if there's a next page
+        recipe_ids = db.execute(query.order_by(Recipe.id.desc()).limit(limit + 1)).scalars().all()
+
+        has_more = len(recipe_ids) > limit
+        if has_more:
+            recipe_ids = recipe_ids[:limit]
+
+        recipe_catalog.refresh_if_stale(db)
+        return {
+            "recipes": recipe_catalog.cards(db, recipe_ids),
+            "next_cursor": recipe_ids[-1] if has_more else None,
+            "has_more": has_more
+        }
+
+    except Exception as e:
+        logger.error("Error searching recipes: %s", e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/cook-now", tags=["Recipes"])
+async def get_cook_now_recipes(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: db_dependency,
+    max_missing: int = Query(0, ge=0, le=5, description="Allow up to this many ingredients not in the pantry"),
+    limit: int = Query(20, ge=1, le=50),
+):
+    """
+    Recipes the user can cook with what is in their pantry
+
+    Returns recipes whose every ingredient is in the pantry, or with
+    max_missing > 0, recipes missing at most that many ingredients (each
+    result lists its 'missing' ingredients). Recipes missing the fewest
+    ingredients come first, then newest.
+
+    Uses the in-memory ingredient index, so cost depends on the pantry
+    size rather than the number of recipes.
+    """
+    try:
+        pantry = db.execute(
+            select(PantryItem.ingredient_name).where(PantryItem.user_id == current_user.id)
+        ).scalars().all()
+        if not pantry:
+            return {"recipes": [], "count": 0}
+
+        ingredient_index.refresh_if_stale(db)
+        matches = ingredient_index.match(pantry, max_missing=max_missing)[:limit]
+
+        recipe_catalog.refresh_if_stale(db)
+        missing_by_id = dict(matches)
+        recipes = recipe_catalog.cards(db, missing_by_id)
+        for card in recipes:
+            card["missing"] = missing_by_id[card["id"]]
+
+        return {"recipes": recipes, "count": len(recipes)}
+
+    except Exception as e:
+        logger.error("Error finding cook-now recipes for user %s: %s", current_user.id, e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/shopping-list", tags=["Recipes"])
+async def get_shopping_list(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: db_dependency,
+    recipe_ids: Optional[list[int]] = Query(
+        None, description="Liked recipe IDs to shop for (repeat the parameter); defaults to all liked recipes"
+    ),
+):
+    """
+    Shopping list for a set of liked recipes
+
+    Combines the canonical ingredients of the selected liked recipes,
+    sums quantities whose units convert into each other and subtracts
+    what the pantry holds (pantry items without an amount cover the
+    ingredient). Ids that are not among the user's liked recipes are ignored.
+
+    Returns 'items' (ingredient, merged quantities, recipe_ids),
+    'in_pantry' and the 'recipe_ids' actually used.
+    """
+    try:
+        if recipe_ids is not None and len(set(recipe_ids)) > MAX_SHOPPING_LIST_RECIPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Too many recipes (max {MAX_SHOPPING_LIST_RECIPES})."
+            )
+
+        # One batched query for every selected recipe's ingredients
+        query = select(Recipe.id, Recipe.ingredients).join(
+            UserRecipeInteraction, UserRecipeInteraction.recipe_id == Recipe.id
+        ).where(
+            UserRecipeInteraction.user_id == current_user.id,
+            UserRecipeInteraction.liked.is_(True)
+        )
+        if recipe_ids is not None:
+            query = query.where(Recipe.id.in_(set(recipe_ids)))
+        query = query.order_by(Recipe.id).limit(MAX_SHOPPING_LIST_RECIPES)
+        recipes = db.execute(query).all()
+
+        # Amounts were parsed when the pantry items were added
+        pantry = db.execute(
+            select(PantryItem.ingredient_name, PantryItem.quantity_value, PantryItem.quantity_unit)
+            .where(PantryItem.user_id == current_user.id)
+        ).all()
+
+        shopping_list = build_shopping_list(recipes, pantry)
+        shopping_list["recipe_ids"] = [recipe_id for recipe_id, _ in recipes]
+        return shopping_list
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error building shopping list for user %s: %s", current_user.id, e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@router.get("/meal-plan", tags=["Recipes"])
+async def get_meal_plan(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: db_dependency,
+    meals: int = Query(7, ge=1, le=14, description="Number of recipes to plan"),
+    max_total_time: Optional[int] = Query(None, ge=1, description="Budget for the sum of prep_time + cook_time in minutes"),
+):
+    """
+    Plan meals from the user's liked recipes
+
+    Picks up to 'meals' liked recipes that use as much of the pantry as
+    possible and share the ingredients that have to be bought, skipping
+    recipes that conflict with the user's dietary_type or allergies and
+    keeping the total cooking time within max_total_time.
+
+    Returns the planned 'recipes' (each with 'uses_pantry'), the combined
+    'to_buy' list, 'total_time', and 'complete' (False if the search hit
+    its time limit and returned the best plan found so far).
+    """
+    try:
+        liked_ids = db.execute(
+            select(UserRecipeInteraction.recipe_id).where(
+                UserRecipeInteraction.user_id == current_user.id,
+                UserRecipeInteraction.liked.is_(True)
+            )
+        ).scalars().all()
+        pantry = db.execute(
+            select(PantryItem.ingredient_name).where(PantryItem.user_id == current_user.id)
+        ).scalars().all()
+
+        ingredient_index.refresh_if_stale(db)
+        recipe_catalog.refresh_if_stale(db)
+        excluded_mask = ingredient_index.terms_mask(
+            excluded_ingredients(current_user.dietary_type, current_user.allergies)
+        )
+        pantry_mask = ingredient_index.terms_mask(pantry)
+        # Allergies are also matched against the raw ingredient text, since
+        # canonical terms miss allergens inside compounds ("peanut butter")
+        phrases = allergen_phrases(current_user.allergies)
+        unsafe_ids = set()
+        if phrases and liked_ids:
+            unsafe_ids = {
+                recipe_id
+                for recipe_id, ingredients in db.execute(
+                    select(Recipe.id, Recipe.ingredients).where(Recipe.id.in_(liked_ids))
+                )
+                if mentions_any(ingredients, phrases)
+            }
+
+        # Candidates come from precomputed bitsets and in-memory cards only
+        candidates = []
+        for card in recipe_catalog.cards(db, liked_ids):
+            mask = ingredient_index.mask(card["id"])
+            total_time = card["prep_time"] + card["cook_time"]
+            if mask is None or mask & excluded_mask or card["id"] in unsafe_ids:
+                continue
+            if max_total_time is not None and total_time > max_total_time:
+                continue
+            candidates.append(MealCandidate(card["id"], mask, total_time))
+        candidates = heapq.nlargest(
+            Config.MEAL_PLAN_MAX_CANDIDATES, candidates,
+            key=lambda candidate: (candidate.mask & pantry_mask).bit_count(),
+        )
+
+        solver = MealPlanSolver(candidates, pantry_mask, meals, max_total_time)
+        plan = solver.solve(Config.MEAL_PLAN_TIME_BUDGET_MS / 1000)
+
+        recipes = recipe_catalog.cards(db, plan.recipe_ids)
+        to_buy = 0
+        for card in recipes:
+            mask = ingredient_index.mask(card["id"])
+            card["uses_pantry"] = ingredient_index.mask_terms(mask & pantry_mask)
+            to_buy |= mask & ~pantry_mask
+
+        return {
+            "recipes": recipes,
+            "to_buy": sorted(ingredient_index.mask_terms(to_buy)),
+            "total_time": sum(card["prep_time"] + card["cook_time"] for card in recipes),
+            "complete": plan.complete,
+        }
+
+    except Exception as e:
+        logger.error("Error planning meals for user %s: %s", current_user.id, e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -184,14 +471,21 @@ async def get_recipe_feed(
 async def like_recipe(
     recipe_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
-    db: db_dependency
+    db: db_dependency,
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
     """
     Like a recipe (right swipe)
     
     Creates a permanent like record and increments recipe like_count.
     Relies on database unique constraint to prevent duplicate likes.
+    A retry carrying the same Idempotency-Key header replays the first response
+    (409 while the first request is still running).
     """
+    replay = idempotency_store.begin(current_user.id, "like_recipe", idempotency_key, recipe_id)
+    if replay is not None:
+        return replay
+    
     try:
         # Check if recipe exists first
         recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
@@ -207,119 +501,163 @@ async def like_recipe(
         )
         db.add(interaction)
         db.flush()  # Flush to check for unique constraint violation
+        bump_likes_version(db, current_user.id)
         
         # Atomically increment like count to prevent race conditions
         db.execute(
             update(Recipe)
             .where(Recipe.id == recipe_id)
-            .values(like_count=Recipe.like_count + 1)
+            # Keep updated_at: cached cards would otherwise reload on every like
+            .values(like_count=Recipe.like_count + 1, updated_at=Recipe.updated_at)
         )
         
         db.commit()
         
         # Fetch updated like count
         db.refresh(recipe)
+        recipe_catalog.set_like_count(recipe_id, recipe.like_count)
         
-        logger.info(f"User {current_user.id} liked recipe {recipe_id}")
-        return {
+        logger.info("User %s liked recipe %s", current_user.id, recipe_id)
+        result = {
             "message": "Recipe liked successfully",
             "recipe_id": recipe_id,
             "like_count": recipe.like_count
         }
+        idempotency_store.remember(current_user.id, "like_recipe", idempotency_key, recipe_id, body=result)
+        return result
         
     except IntegrityError as e:
         db.rollback()
         # Check if it's the specific unique constraint violation we expect
         error_msg = str(e.orig) if hasattr(e, 'orig') else str(e)
+        lowered = error_msg.lower()
         
-        if 'uq_user_recipe' in error_msg.lower() or 'duplicate' in error_msg.lower():
+        # MySQL names the constraint / "Duplicate entry"; SQLite says "UNIQUE constraint failed"
+        if 'uq_user_recipe' in lowered or 'duplicate' in lowered or 'unique constraint failed' in lowered:
             # Unique constraint violation - duplicate like attempt (race condition)
-            logger.warning(f"Duplicate like attempt by user {current_user.id} for recipe {recipe_id}")
+            logger.warning("Duplicate like attempt by user %s for recipe %s", current_user.id, recipe_id)
             raise HTTPException(status_code=400, detail="Recipe already liked")
         else:
             # Other integrity error (foreign key, null constraint, etc.)
-            logger.error(f"Integrity error while liking recipe {recipe_id} by user {current_user.id}: {error_msg}")
+            logger.error("Integrity error while liking recipe %s by user %s: %s", recipe_id, current_user.id, error_msg)
             raise HTTPException(status_code=500, detail="Database integrity error")
     except HTTPException:
         raise
     except Exception as e:
         # Catch any other database exceptions (connection issues, etc.) to ensure rollback
-        logger.error(f"Error liking recipe {recipe_id}: {e}")
+        logger.error("Error liking recipe %s: %s", recipe_id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        # No-op once the response was remembered
+        idempotency_store.release(current_user.id, "like_recipe", idempotency_key)
 
 
 @router.get("/liked", tags=["Recipes"])
 async def get_liked_recipes(
+    request: Request,
+    response: Response,
     current_user: Annotated[User, Depends(get_current_user)],
     db: db_dependency,
     limit: int = Query(20, ge=1, le=100),
-    cursor: Optional[str] = Query(None, description="Cursor for pagination (ISO timestamp from previous response)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor for pagination (next_cursor from previous response)"),
 ):
     """
     Get user's liked recipes collection with cursor-based pagination
     
-    Uses cursor-based pagination (via created_at timestamp) for better performance
-    with large datasets compared to offset-based pagination.
+    Uses keyset pagination on (created_at, id), so likes sharing the same
+    timestamp are neither skipped nor duplicated, and deep pages stay an
+    index range scan.
     
     Returns recipes with minimal data plus liked_at timestamp.
     Pass the 'next_cursor' from the response to get the next page.
+    Supports conditional GET via ETag / If-None-Match (304 when the page,
+    like counts included, is unchanged).
     """
     try:
-        # Base query
-        query = db.query(UserRecipeInteraction, Recipe).join(
-            Recipe, UserRecipeInteraction.recipe_id == Recipe.id
-        ).filter(
+        # Base query: recipe id plus the keyset (created_at, id); served
+        # from the interactions index alone, cards come from the catalog
+        query = select(
+            UserRecipeInteraction.recipe_id,
+            UserRecipeInteraction.created_at,
+            UserRecipeInteraction.id
+        ).where(
             UserRecipeInteraction.user_id == current_user.id,
             UserRecipeInteraction.liked.is_(True)
         )
         
-        # Apply cursor if provided (fetch records older than cursor timestamp)
+        # Apply cursor if provided (fetch records after the cursor position)
         if cursor:
             try:
-                # Use consistent timestamp format: YYYY-MM-DDTHH:MM:SS.ffffff
-                # This handles 'Z' suffix and various ISO formats more reliably
-                cursor = cursor.replace('Z', '+00:00')  # Handle UTC 'Z' notation
-                cursor_dt = datetime.fromisoformat(cursor)
-                query = query.filter(UserRecipeInteraction.created_at < cursor_dt)
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Invalid cursor format: {cursor}, error: {e}")
+                cursor_dt, cursor_id = decode_liked_cursor(cursor)
+            except ValueError as e:
+                logger.warning("Invalid cursor: %s, error: %s", cursor, e)
                 raise HTTPException(
                     status_code=400, 
-                    detail="Invalid cursor format. Expected ISO 8601 timestamp (YYYY-MM-DDTHH:MM:SS.ffffff)."
+                    detail="Invalid cursor. Use the next_cursor value from a previous response."
                 )
-        
-        # Order by created_at descending and limit
-        interactions = query.order_by(
-            UserRecipeInteraction.created_at.desc()
-        ).limit(limit + 1).all()  # Fetch one extra to determine if there's a next page
+            # Equivalent to (created_at, id) < (cursor_dt, cursor_id), written so
+            # the created_at bound is usable as an index range
+            query = query.where(
+                UserRecipeInteraction.created_at <= cursor_dt,
+                or_(
+                    UserRecipeInteraction.created_at < cursor_dt,
+                    and_(
+                        UserRecipeInteraction.created_at == cursor_dt,
+                        UserRecipeInteraction.id < cursor_id
+                    )
+                )
+            )
+        
+        # Order by (created_at, id) descending and limit
+        rows = db.execute(
+            query.order_by(
+                UserRecipeInteraction.created_at.desc(),
+                UserRecipeInteraction.id.desc()
+            ).limit(limit + 1)  # Fetch one extra to determine if there's a next page
+        ).all()
         
         # Check if there are more results
-        has_more = len(interactions) > limit
+        has_more = len(rows) > limit
         if has_more:
-            interactions = interactions[:limit]  # Remove the extra item
+            rows = rows[:limit]  # Remove the extra item
         
         # Build response with consistent timestamp format
+        recipe_catalog.refresh_if_stale(db)
+        cards = {card["id"]: card for card in recipe_catalog.cards(db, [row[0] for row in rows])}
         recipes = []
+        for recipe_id, liked_at, _ in rows:
+            recipe_data = cards.get(recipe_id)
+            if recipe_data is None:
+                continue  # Recipe no longer exists
+            recipe_data["liked_at"] = liked_at.strftime('%Y-%m-%dT%H:%M:%S.%f')
+            recipes.append(recipe_data)
+        
         next_cursor = None
-        for interaction, recipe in interactions:
-            recipe_data = create_minimal_recipe_response(recipe)
-            # Use consistent format for cursor (includes microseconds for precision)
-            timestamp = interaction.created_at.strftime('%Y-%m-%dT%H:%M:%S.%f')
-            recipe_data["liked_at"] = timestamp
-            recipes.append(recipe_data)  # Add to the list!
-            next_cursor = timestamp  # Last item's timestamp
+        if has_more:
+            _, last_liked_at, last_interaction_id = rows[-1]
+            next_cursor = encode_liked_cursor(last_liked_at, last_interaction_id)
+        
+        # ETags are per URL; the likes version covers this user's likes and
+        # the digest covers like counts, which other users' likes change
+        etag = weak_etag(
+            "liked", current_user.id, current_user.likes_version,
+            content_digest((recipe["id"], recipe["like_count"]) for recipe in recipes),
+        )
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        set_cache_headers(response, etag)
         
         return {
             "recipes": recipes,
-            "next_cursor": next_cursor if has_more else None,
+            "next_cursor": next_cursor,
             "has_more": has_more
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting liked recipes: {e}")
+        logger.error("Error getting liked recipes: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -327,13 +665,20 @@ async def get_liked_recipes(
 async def unlike_recipe(
     recipe_id: int,
     current_user: Annotated[User, Depends(get_current_user)],
-    db: db_dependency
+    db: db_dependency,
+    idempotency_key: Optional[str] = Header(None, max_length=255)
 ):
     """
     Unlike a recipe (remove from liked collection)
     
     Deletes the like record and decrements recipe like_count.
+    A retry carrying the same Idempotency-Key header replays the first response
+    (409 while the first request is still running).
     """
+    replay = idempotency_store.begin(current_user.id, "unlike_recipe", idempotency_key, recipe_id)
+    if replay is not None:
+        return replay
+    
     try:
         # Find the like interaction
         interaction = db.query(UserRecipeInteraction).filter(
@@ -348,13 +693,14 @@ async def unlike_recipe(
         # Delete the interaction
         db.delete(interaction)
         db.flush()  # Flush to ensure interaction is deleted before updating counter
+        bump_likes_version(db, current_user.id)
         
         # Atomically decrement like count to prevent race conditions
         # Use CASE to ensure count doesn't go below 0
         db.execute(
             update(Recipe)
             .where(Recipe.id == recipe_id)
-            .values(like_count=func.greatest(0, Recipe.like_count - 1))
+            .values(like_count=func.greatest(0, Recipe.like_count - 1), updated_at=Recipe.updated_at)
         )
         
         db.commit()
@@ -362,37 +708,82 @@ async def unlike_recipe(
         # Fetch updated like count
         recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
         updated_like_count = recipe.like_count if recipe else 0
+        recipe_catalog.set_like_count(recipe_id, updated_like_count)
         
-        logger.info(f"User {current_user.id} unliked recipe {recipe_id}")
-        return {
+        logger.info("User %s unliked recipe %s", current_user.id, recipe_id)
+        result = {
             "message": "Recipe unliked successfully",
             "recipe_id": recipe_id,
             "like_count": updated_like_count
         }
+        idempotency_store.remember(current_user.id, "unlike_recipe", idempotency_key, recipe_id, body=result)
+        return result
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error unliking recipe {recipe_id}: {e}")
+        logger.error("Error unliking recipe %s: %s", recipe_id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        # No-op once the response was remembered
+        idempotency_store.release(current_user.id, "unlike_recipe", idempotency_key)
 
 
-@router.get("/{recipe_id}", response_model=RecipeResponse, tags=["Recipes"])
-async def get_recipe_details(recipe_id: int, db: db_dependency):
+@router.get("/{recipe_id}/similar", tags=["Recipes"])
+async def get_similar_recipes(
+    recipe_id: int,
+    db: db_dependency,
+    limit: int = Query(10, ge=1, le=50),
+):
     """
-    Get full recipe details
-    
-    Returns complete recipe information including description,
-    ingredients, and cooking instructions.
-    
+    Recipes with ingredient sets similar to the given recipe
+
+    Meant for "more like this" after a right swipe. Similarity is the
+    estimated Jaccard similarity of canonical ingredient sets (0-1),
+    returned per recipe as 'similarity', best first.
+
     This endpoint is public (no authentication required).
     """
     try:
-        recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
+        similarity_index.refresh_if_stale(db)
+        signature = similarity_index.signature(recipe_id)
+        if signature is None:
+            # Not indexed yet (or no ingredients): hash it on the fly
+            ingredients = db.scalar(select(Recipe.ingredients).where(Recipe.id == recipe_id))
+            if ingredients is None:
+                raise HTTPException(status_code=404, detail="Recipe not found")
+            signature = minhash(parse_ingredients(ingredients))
+
+        matches = similarity_index.query(signature, limit, exclude=recipe_id) if signature else []
+
+        recipe_catalog.refresh_if_stale(db)
+        similarity_by_id = dict(matches)
+        recipes = recipe_catalog.cards(db, similarity_by_id)
+        for card in recipes:
+            card["similarity"] = round(similarity_by_id[card["id"]], 3)
+
+        return {"recipe_id": recipe_id, "recipes": recipes}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Error finding recipes similar to %s: %s", recipe_id, e)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+def load_recipe_details(app, recipe_id: int) -> RecipeResponse:
+    """
+    Load and serialize one recipe (blocking; run in the threadpool)
+
+    Opens its own session: the result is shared by every request waiting
+    on the flight and may outlive the request that started it.
+    """
+    with detached_session(app, read_only=True) as db:
+        recipe = db.query(Recipe).options(undefer_group("body")).filter(Recipe.id == recipe_id).first()
         if not recipe:
             raise HTTPException(status_code=404, detail="Recipe not found")
-        
+
         return RecipeResponse(
             id=recipe.id,
             name=recipe.name,
@@ -406,9 +797,27 @@ async def get_recipe_details(recipe_id: int, db: db_dependency):
             ingredients=json.loads(recipe.ingredients),
             like_count=recipe.like_count,
         )
+
+
+@router.get("/{recipe_id}", response_model=RecipeResponse, tags=["Recipes"])
+async def get_recipe_details(recipe_id: int, request: Request):
+    """
+    Get full recipe details
+    
+    Returns complete recipe information including description,
+    ingredients, and cooking instructions.
+    
+    This endpoint is public (no authentication required).
+    Concurrent requests for the same recipe share a single query.
+    """
+    try:
+        return await recipe_detail_flight.do(
+            make_key("recipe_detail", recipe_id=recipe_id),
+            lambda: run_in_threadpool(load_recipe_details, request.app, recipe_id),
+        )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting recipe {recipe_id}: {e}")
+        logger.error("Error getting recipe %s: %s", recipe_id, e)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -6,11 +6,10 @@ Handles user profile operations and preferences
 from datetime import datetime, timezone
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException
-import bcrypt
 
 from app.db.database import db_dependency
 from app.models.models import User, Recipe, UserRecipeInteraction, PantryItem
-from app.api.auth import get_current_user, token_blacklist, oauth2_scheme
+from app.api.auth import get_current_user, token_blacklist, token_claims_cache, oauth2_scheme
 from app.schemas.schemas import (
     UserResponse,
     UserUpdateRequest,
@@ -67,14 +66,14 @@ async def update_user_profile(
         db.commit()
         db.refresh(current_user)
         
-        logger.info(f"User {current_user.id} updated profile")
+        logger.info("User %s updated profile", current_user.id)
         return current_user
         
     except HTTPException:
         db.rollback()
         raise
     except Exception as e:
-        logger.error(f"Error updating profile for user {current_user.id}: {e}")
+        logger.error("Error updating profile for user %s: %s", current_user.id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -99,6 +98,8 @@ async def delete_user_account(
     
     The current JWT token will be blacklisted.
     """
+    import bcrypt
+
     try:
         # Verify password
         if not bcrypt.checkpw(request.password.encode('utf-8'), current_user.hashed_password.encode('utf-8')):
@@ -122,7 +123,7 @@ async def delete_user_account(
             db.execute(
                 update(Recipe)
                 .where(Recipe.id.in_(liked_recipe_ids))
-                .values(like_count=func.greatest(0, Recipe.like_count - 1))
+                .values(like_count=func.greatest(0, Recipe.like_count - 1), updated_at=Recipe.updated_at)
             )
                 
         # Delete user interactions (no cascade configured, so explicit deletion required)
@@ -142,8 +143,9 @@ async def delete_user_account(
         
         # Blacklist current token (after successful commit)
         token_blacklist.add(token)
+        token_claims_cache.discard(token)
         
-        logger.info(f"User {user_id} account deleted (liked: {len(liked_recipe_ids)} recipes)")
+        logger.info("User %s account deleted (liked: %s recipes)", user_id, len(liked_recipe_ids))
         
         return {
             "message": "Account deleted successfully",
@@ -154,7 +156,7 @@ async def delete_user_account(
         db.rollback()
         raise
     except Exception as e:
-        logger.error(f"Error deleting account for user {current_user.id}: {e}")
+        logger.error("Error deleting account for user %s: %s", current_user.id, e)
         db.rollback()
         raise HTTPException(status_code=500, detail="Internal server error")
 
@@ -202,5 +204,5 @@ async def get_user_stats(
         )
         
     except Exception as e:
-        logger.error(f"Error getting stats for user {current_user.id}: {e}")
+        logger.error("Error getting stats for user %s: %s", current_user.id, e)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -1,14 +1,123 @@
 """
 Application configuration settings.
 Centralizes logging, timezone, and other app-wide configurations.
+Settings are read on first access, so importing the app reads neither
+.env nor the environment.
 """
 
 import logging
-import pytz
+import threading
+from functools import lru_cache, wraps
 from typing import Optional
-from dotenv import load_dotenv
 import os
-load_dotenv()
+
+_env_lock = threading.Lock()
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load .env into the environment once (variables already set win)"""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _env_loaded = True
+
+
+def getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    """os.getenv after loading .env"""
+    load_env()
+    return os.getenv(name, default)
+
+
+def _jwt_secret_key() -> str:
+    secret_key = getenv("JWT_SECRET_KEY")
+    if secret_key:
+        return secret_key
+    # Use a test default for CI/testing environments
+    # In production, this should always be set via environment variable
+    import sys
+    if 'pytest' in sys.modules or getenv('CI') == 'true':
+        return "test-secret-key-for-testing-only-not-for-production"
+    raise RuntimeError("JWT_SECRET_KEY environment variable must be set and non-empty.")
+
+
+_UNSET = object()
+
+
+class _LazySetting:
+    """Class attribute computed on first access, so importing Config needs no live configuration"""
+
+    def __init__(self, resolve):
+        self.resolve = resolve
+        self.value = _UNSET
+
+    def __get__(self, instance, owner=None):
+        if self.value is _UNSET:
+            self.value = self.resolve()
+        return self.value
+
+
+class ConfigDefault:
+    """
+    Instance attribute falling back to a Config setting while it is None.
+
+    Lets process-wide singletons be created at import time and read their
+    settings on first use instead.
+    """
+
+    def __init__(self, setting: str, scale: float = 1):
+        self.setting = setting
+        self.scale = scale
+
+    def __set_name__(self, owner, name):
+        self.attribute = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = instance.__dict__.get(self.attribute)
+        return getattr(Config, self.setting) * self.scale if value is None else value
+
+    def __set__(self, instance, value):
+        instance.__dict__[self.attribute] = value
+
+
+def config_lru_cache(setting: str):
+    """lru_cache sized by a Config setting, read on the first call"""
+    def decorate(func):
+        cached = None
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal cached
+            if cached is None:
+                cached = lru_cache(maxsize=getattr(Config, setting))(func)
+            return cached(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _env(name: str, default: str, cast=str) -> _LazySetting:
+    """Setting read from the environment (or .env) on first access"""
+    return _LazySetting(lambda: cast(getenv(name, default)))
+
+
+def _flag(value: str) -> bool:
+    return value.lower() == "true"
+
+
+def _emails(value: str) -> frozenset:
+    return frozenset(email.strip().lower() for email in value.split(",") if email.strip())
+
+
+def _log_level(value: str) -> int:
+    return logging.getLevelName(value.upper())
 
 
 class Config:
@@ -18,30 +127,123 @@ class Config:
     TIMEZONE = "Asia/Baku"
 
     # Logging configuration
-    LOG_LEVEL = logging.INFO
+    LOG_LEVEL = _env("LOG_LEVEL", "INFO", _log_level)
     LOG_FORMAT = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
     LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    # One JSON object per line instead of LOG_FORMAT
+    LOG_JSON = _env("LOG_JSON", "false", _flag)
+    # Write logs from a background thread (records are only enqueued on the request path)
+    LOG_ASYNC = _env("LOG_ASYNC", "true", _flag)
+    LOG_QUEUE_SIZE = _env("LOG_QUEUE_SIZE", "10000", int)
+    # Per-logger limits for records below WARNING, e.g. "uvicorn.access=50,app.api=20":
+    # records per second per message template, and fraction of records kept
+    LOG_RATE_LIMITS = _env("LOG_RATE_LIMITS", "uvicorn.access=100")
+    LOG_SAMPLE_RATES = _env("LOG_SAMPLE_RATES", "")
 
     # API configuration
     API_V1_PREFIX = "/api/v1"
 
-    # JWT Authentication configuration
-    SECRET_KEY = os.getenv("JWT_SECRET_KEY")
-    if not SECRET_KEY:
-        # Use a test default for CI/testing environments
-        # In production, this should always be set via environment variable
-        import sys
-        if 'pytest' in sys.modules or os.getenv('CI') == 'true':
-            SECRET_KEY = "test-secret-key-for-testing-only-not-for-production"
-        else:
-            raise RuntimeError("JWT_SECRET_KEY environment variable must be set and non-empty.")
-    ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
-    ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
-    REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
+    # JWT Authentication configuration (checked on first use, not at import)
+    SECRET_KEY = _LazySetting(_jwt_secret_key)
+    ALGORITHM = _env("JWT_ALGORITHM", "HS256")
+    ACCESS_TOKEN_EXPIRE_MINUTES = _env("ACCESS_TOKEN_EXPIRE_MINUTES", "30", int)
+    REFRESH_TOKEN_EXPIRE_DAYS = _env("REFRESH_TOKEN_EXPIRE_DAYS", "7", int)
+
+    # Accounts allowed to use admin endpoints (comma-separated emails)
+    ADMIN_EMAILS = _env("ADMIN_EMAILS", "", _emails)
+
+    # Response compression (bodies smaller than this are sent uncompressed)
+    GZIP_MINIMUM_SIZE = _env("GZIP_MINIMUM_SIZE", "1000", int)
+    GZIP_COMPRESS_LEVEL = _env("GZIP_COMPRESS_LEVEL", "6", int)
+
+    # Instrumentation: statements slower than this are logged with their route
+    SLOW_QUERY_MS = _env("SLOW_QUERY_MS", "200", float)
+
+    # In-memory recipe card catalog: seconds between incremental refreshes
+    CATALOG_REFRESH_SECONDS = _env("CATALOG_REFRESH_SECONDS", "30", float)
+    # Incremental refreshes re-read this far behind the newest updated_at seen,
+    # so rows committed late with an older timestamp are still picked up
+    CATALOG_REFRESH_OVERLAP_SECONDS = _env("CATALOG_REFRESH_OVERLAP_SECONDS", "60", float)
+    # Seconds between full reloads, which evict deleted recipes and pick up
+    # like counts changed by other workers (likes do not move updated_at)
+    CATALOG_FULL_RELOAD_SECONDS = _env("CATALOG_FULL_RELOAD_SECONDS", "600", float)
+
+    # Guest feed pool: cards shared by all guests, reshuffled in the background
+    GUEST_FEED_POOL_SIZE = _env("GUEST_FEED_POOL_SIZE", "2000", int)
+    GUEST_FEED_REFRESH_SECONDS = _env("GUEST_FEED_REFRESH_SECONDS", "300", float)
+
+    # Read replicas: after a write, the client's reads stay on the primary this long
+    # (carried in the dadly_last_write cookie / X-Last-Write header, so it holds across workers)
+    REPLICA_STICKY_SECONDS = _env("REPLICA_STICKY_SECONDS", "5", float)
+
+    # Verified JWT claims cache (entries also expire at the token's exp)
+    TOKEN_CACHE_SIZE = _env("TOKEN_CACHE_SIZE", "10000", int)
+    TOKEN_CACHE_MAX_TTL_SECONDS = _env("TOKEN_CACHE_MAX_TTL_SECONDS", "300", float)
+
+    # Adaptive concurrency limits per route class (auth, feed, writes)
+    LOAD_SHED_ENABLED = _env("LOAD_SHED_ENABLED", "true", _flag)
+    LOAD_SHED_INITIAL_LIMIT = _env("LOAD_SHED_INITIAL_LIMIT", "20", float)
+    LOAD_SHED_MIN_LIMIT = _env("LOAD_SHED_MIN_LIMIT", "2", float)
+    LOAD_SHED_MAX_LIMIT = _env("LOAD_SHED_MAX_LIMIT", "200", float)
+    LOAD_SHED_TARGET_LATENCY_MS = _env("LOAD_SHED_TARGET_LATENCY_MS", "500", float)
+    LOAD_SHED_AUTH_TARGET_LATENCY_MS = _env("LOAD_SHED_AUTH_TARGET_LATENCY_MS", "1500", float)
+    LOAD_SHED_MAX_QUEUE_MS = _env("LOAD_SHED_MAX_QUEUE_MS", "100", float)
+    LOAD_SHED_LOW_PRIORITY_SHARE = _env("LOAD_SHED_LOW_PRIORITY_SHARE", "0.5", float)
+    LOAD_SHED_CRITICAL_HEADROOM = _env("LOAD_SHED_CRITICAL_HEADROOM", "1.5", float)
+    LOAD_SHED_RETRY_AFTER_SECONDS = _env("LOAD_SHED_RETRY_AFTER_SECONDS", "1", int)
+
+    # Idempotency-Key response store for retried writes
+    IDEMPOTENCY_TTL_SECONDS = _env("IDEMPOTENCY_TTL_SECONDS", "3600", float)
+    IDEMPOTENCY_MAX_ENTRIES = _env("IDEMPOTENCY_MAX_ENTRIES", "50000", int)
+
+    # LRU size for ingredient canonicalization results
+    INGREDIENT_CACHE_SIZE = _env("INGREDIENT_CACHE_SIZE", "4096", int)
+
+    # LRU size for parsed quantity strings ("2 cups", "500g")
+    QUANTITY_CACHE_SIZE = _env("QUANTITY_CACHE_SIZE", "4096", int)
+
+    # Estimated ingredient-set similarity at which imported recipes are flagged as near-duplicates
+    NEAR_DUPLICATE_THRESHOLD = _env("NEAR_DUPLICATE_THRESHOLD", "0.9", float)
+
+    # Meal-plan solver: search deadline and number of liked recipes considered
+    MEAL_PLAN_TIME_BUDGET_MS = _env("MEAL_PLAN_TIME_BUDGET_MS", "40", float)
+    MEAL_PLAN_MAX_CANDIDATES = _env("MEAL_PLAN_MAX_CANDIDATES", "150", int)
+
+    # Sampling profiler (admin endpoint): longest capture and default sampling interval
+    PROFILER_MAX_SECONDS = _env("PROFILER_MAX_SECONDS", "60", float)
+    PROFILER_INTERVAL_MS = _env("PROFILER_INTERVAL_MS", "10", float)
+
+    # Event-loop lag monitor: timer interval, and loop stalls longer than this
+    # are logged with the blocking stack and route
+    LOOP_MONITOR_ENABLED = _env("LOOP_MONITOR_ENABLED", "true", _flag)
+    LOOP_MONITOR_INTERVAL_MS = _env("LOOP_MONITOR_INTERVAL_MS", "50", float)
+    LOOP_STALL_THRESHOLD_MS = _env("LOOP_STALL_THRESHOLD_MS", "100", float)
+
+    # Readiness probe: seconds between background DB/pool checks, and the
+    # share of pool connections in use at which a worker reports not ready
+    READINESS_INTERVAL_SECONDS = _env("READINESS_INTERVAL_SECONDS", "5", float)
+    READINESS_MAX_POOL_USAGE = _env("READINESS_MAX_POOL_USAGE", "0.9", float)
+
+    # Production server (python -m app.serve): WEB_CONCURRENCY=0 means one worker per CPU.
+    # Defaults to 1: revoked tokens and Idempotency-Key responses are still
+    # kept per process, so with more workers a logout or a retried write is
+    # only seen by the worker that handled it
+    SERVER_HOST = _env("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT = _env("SERVER_PORT", "8000", int)
+    WEB_CONCURRENCY = _env("WEB_CONCURRENCY", "1", int)
+    SERVER_BACKLOG = _env("SERVER_BACKLOG", "2048", int)
+    # Recycle a worker after this many requests (0 = never), plus random jitter
+    # so workers do not restart together
+    SERVER_MAX_REQUESTS = _env("SERVER_MAX_REQUESTS", "10000", int)
+    SERVER_MAX_REQUESTS_JITTER = _env("SERVER_MAX_REQUESTS_JITTER", "1000", int)
+    # Time in-flight requests get to finish after SIGTERM
+    SERVER_GRACEFUL_TIMEOUT_SECONDS = _env("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30", int)
+    SERVER_KEEPALIVE_SECONDS = _env("SERVER_KEEPALIVE_SECONDS", "5", int)
 
     @classmethod
     def get_timezone(cls):
         """Get the configured timezone object."""
+        import pytz
         return pytz.timezone(cls.TIMEZONE)
 
 
@@ -53,16 +255,25 @@ def setup_logging(
     """
     Configure application-wide logging.
 
+    Replaces any existing root handlers with the queue-based pipeline in
+    app.core.log_pipeline (see the LOG_* settings).
+
     Args:
         level: Logging level (defaults to Config.LOG_LEVEL)
         format_str: Log format string (defaults to Config.LOG_FORMAT)
         date_format: Date format string (defaults to Config.LOG_DATE_FORMAT)
     """
-    logging.basicConfig(
+    from app.core import log_pipeline
+
+    log_pipeline.configure(
         level=level or Config.LOG_LEVEL,
-        format=format_str or Config.LOG_FORMAT,
-        datefmt=date_format or Config.LOG_DATE_FORMAT,
-        force=True,  # Override any existing configuration
+        format_str=format_str or Config.LOG_FORMAT,
+        date_format=date_format or Config.LOG_DATE_FORMAT,
+        json_output=Config.LOG_JSON,
+        async_output=Config.LOG_ASYNC,
+        queue_size=Config.LOG_QUEUE_SIZE,
+        rate_limits=log_pipeline.parse_rules(Config.LOG_RATE_LIMITS),
+        sample_rates=log_pipeline.parse_rules(Config.LOG_SAMPLE_RATES),
     )
 
 
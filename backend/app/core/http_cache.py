@@ -0,0 +1,71 @@
+"""
+Conditional GET helpers for DADLY list endpoints
+Builds weak ETags from per-user version counters bumped by writes
+"""
+
+import hashlib
+from typing import Iterable, Optional
+from fastapi import Request, Response
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.models import User
+
+# Clients must revalidate, but may keep the body and send If-None-Match
+CACHE_CONTROL = "private, no-cache"
+
+
+def weak_etag(scope: str, user_id: int, version: Optional[int], content: Optional[str] = None) -> str:
+    """Build a weak ETag for a per-user list, e.g. W/"pantry-12-3" or W/"liked-12-3-9f2c..." """
+    tag = f"{scope}-{user_id}-{version or 0}"
+    return f'W/"{tag}-{content}"' if content else f'W/"{tag}"'
+
+
+def content_digest(values: Iterable) -> str:
+    """
+    Short digest of the parts of a list that change without the user's
+    version counter moving (e.g. like counts bumped by other users)
+    """
+    return hashlib.blake2b(repr(list(values)).encode(), digest_size=8).hexdigest()
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header matches the ETag"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: ignore W/ prefixes on both sides
+    opaque_tag = etag.removeprefix("W/")
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return opaque_tag in candidates
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    """Attach validator headers to a full (200) response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified_response(etag: str) -> Response:
+    """Build an empty 304 response for a matching If-None-Match"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def bump_pantry_version(db: Session, user_id: int) -> None:
+    """Invalidate pantry ETags for a user (call inside the write transaction)"""
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(pantry_version=User.pantry_version + 1)
+    )
+
+
+def bump_likes_version(db: Session, user_id: int) -> None:
+    """Invalidate liked-recipes ETags for a user (call inside the write transaction)"""
+    db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(likes_version=User.likes_version + 1)
+    )
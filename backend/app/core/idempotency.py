@@ -0,0 +1,133 @@
+"""
+Idempotency-Key support for retried writes in DADLY
+Reserves each key while its request runs and stores the successful
+response, so client retries replay it instead of re-running the transaction
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from app.config.config import ConfigDefault
+from app.core.metrics import registry
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Body of a reserved key whose first request has not finished yet
+PENDING = object()
+
+REPLAYS_TOTAL = registry.counter(
+    "dadly_idempotent_replays_total",
+    "Write requests answered from the idempotency store",
+    ("endpoint",),
+)
+
+
+def request_fingerprint(*parts: Any) -> str:
+    """Digest of the request parameters a key was first used with"""
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """
+    TTL-bounded in-memory store of successful write responses.
+
+    Entries are scoped to (user, endpoint, key), so one user's key can
+    never replay another user's response. begin() reserves the key before
+    the write runs: a retry arriving while it is still in progress gets a
+    409 instead of running the write a second time, and one arriving after
+    it succeeded replays the stored response. Reusing a key with different
+    request parameters is rejected with 422. Failed requests release the
+    key: they rolled back, so retrying them is safe.
+
+    The store is per process; with several workers a retry routed to
+    another worker re-executes, which the write paths tolerate (unique
+    constraints still reject duplicates).
+    """
+
+    ttl = ConfigDefault("IDEMPOTENCY_TTL_SECONDS")
+    maxsize = ConfigDefault("IDEMPOTENCY_MAX_ENTRIES")
+
+    def __init__(self, ttl: Optional[float] = None, maxsize: Optional[int] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[str, Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _expire(self, scope: tuple) -> Optional[tuple[str, Any, float]]:
+        entry = self._entries.get(scope)
+        if entry is not None and time.monotonic() >= entry[2]:
+            del self._entries[scope]
+            entry = None
+        return entry
+
+    def _put(self, scope: tuple, entry: tuple[str, Any, float]) -> None:
+        self._entries[scope] = entry
+        self._entries.move_to_end(scope)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def begin(self, user_id: int, endpoint: str, key: Optional[str], *request: Any) -> Optional[JSONResponse]:
+        """
+        Stored response for a retried request, or None to execute it.
+
+        Returning None reserves the key; the caller must then call
+        remember() on success or release() on failure.
+        """
+        if not key:
+            return None
+        scope = (user_id, endpoint, key)
+        fingerprint = request_fingerprint(*request)
+        with self._lock:
+            entry = self._expire(scope)
+            if entry is None:
+                self._put(scope, (fingerprint, PENDING, time.monotonic() + self.ttl))
+                return None
+
+        stored_fingerprint, body, _ = entry
+        if stored_fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        if body is PENDING:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still in progress",
+                headers={"Retry-After": "1"},
+            )
+        REPLAYS_TOTAL.inc(endpoint)
+        return JSONResponse(content=body, headers={REPLAYED_HEADER: "true"})
+
+    def remember(self, user_id: int, endpoint: str, key: Optional[str], *request: Any, body: Any) -> None:
+        """Store a successful response under the request's key"""
+        if not key:
+            return
+        with self._lock:
+            self._put((user_id, endpoint, key), (request_fingerprint(*request), body, time.monotonic() + self.ttl))
+
+    def release(self, user_id: int, endpoint: str, key: Optional[str]) -> None:
+        """Drop a reservation whose request failed (no-op once remembered)"""
+        if not key:
+            return
+        scope = (user_id, endpoint, key)
+        with self._lock:
+            entry = self._entries.get(scope)
+            if entry is not None and entry[1] is PENDING:
+                del self._entries[scope]
+
+
+idempotency_store = IdempotencyStore()
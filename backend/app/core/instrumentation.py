@@ -0,0 +1,147 @@
+"""
+Request timing and SQL query instrumentation for DADLY
+Records per-request total time, DB time, query count and slowest statement,
+exposed as Server-Timing headers and Prometheus histograms
+"""
+
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import Config, get_logger
+from app.core.metrics import registry
+
+logger = get_logger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUEST_DURATION = registry.histogram(
+    "dadly_http_request_duration_seconds",
+    "Total request handling time per route",
+    ("method", "route"),
+)
+REQUEST_DB_DURATION = registry.histogram(
+    "dadly_http_request_db_seconds",
+    "Time spent executing SQL per request, per route",
+    ("method", "route"),
+)
+REQUEST_QUERY_COUNT = registry.histogram(
+    "dadly_http_request_queries",
+    "Number of SQL statements executed per request, per route",
+    ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUESTS_TOTAL = registry.counter(
+    "dadly_http_requests_total",
+    "Requests handled per route and status code",
+    ("method", "route", "status"),
+)
+
+
+class RequestStats:
+    """Mutable per-request accumulator shared with the SQL hooks"""
+
+    __slots__ = ("start", "db_time", "query_count", "slowest_time", "slowest_statement")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.db_time = 0.0
+        self.query_count = 0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def server_timing(self, total: float) -> str:
+        """Format as a Server-Timing header value (durations in ms)"""
+        return (
+            f"app;dur={total * 1000:.3f}, "
+            f'db;dur={self.db_time * 1000:.3f};desc="{self.query_count} queries", '
+            f"db-slowest;dur={self.slowest_time * 1000:.3f}"
+        )
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request"""
+    return _request_stats.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._dadly_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started = getattr(context, "_dadly_query_start", None)
+    if stats is None or started is None:
+        return
+    elapsed = time.perf_counter() - started
+    stats.db_time += elapsed
+    stats.query_count += 1
+    if elapsed > stats.slowest_time:
+        stats.slowest_time = elapsed
+        stats.slowest_statement = statement
+
+
+def install_sql_hooks() -> None:
+    """Attach the timing hooks to every Engine (idempotent)"""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RequestTimingMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead).
+
+    Adds a Server-Timing header to every response and records per-route
+    histograms. Statements slower than Config.SLOW_QUERY_MS are logged.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing(time.perf_counter() - stats.start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            total = time.perf_counter() - stats.start
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+
+            REQUEST_DURATION.observe(total, method, route)
+            REQUEST_DB_DURATION.observe(stats.db_time, method, route)
+            REQUEST_QUERY_COUNT.observe(stats.query_count, method, route)
+            REQUESTS_TOTAL.inc(method, route, str(status_code))
+
+            if stats.slowest_time * 1000 >= Config.SLOW_QUERY_MS:
+                logger.warning(
+                    "Slow query on %s %s: %.1f ms (%d queries, %.1f ms DB total): %s",
+                    method, route, stats.slowest_time * 1000, stats.query_count,
+                    stats.db_time * 1000, (stats.slowest_statement or "")[:300],
+                )
@@ -0,0 +1,257 @@
+"""
+Adaptive concurrency limiting and load shedding for DADLY
+Caps in-flight requests per route class and fails fast with 503 when
+the backend slows down, shedding low-priority traffic first
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import Config, get_logger
+from app.core.metrics import registry
+
+logger = get_logger(__name__)
+
+# Priorities: low-priority requests are shed first, critical ones last
+LOW = "low"
+NORMAL = "normal"
+CRITICAL = "critical"
+# Order in which queued requests are handed free slots
+WAKE_ORDER = (CRITICAL, NORMAL, LOW)
+
+QUEUE_DELAY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+SHED_TOTAL = registry.counter(
+    "dadly_load_shed_total",
+    "Requests rejected with 503 by the concurrency limiter",
+    ("route_class", "priority"),
+)
+QUEUE_DELAY = registry.histogram(
+    "dadly_load_shed_queue_seconds",
+    "Time admitted requests waited for a concurrency slot",
+    ("route_class",),
+    buckets=QUEUE_DELAY_BUCKETS,
+)
+INFLIGHT = registry.gauge(
+    "dadly_concurrency_inflight",
+    "In-flight requests per route class",
+    ("route_class",),
+)
+LIMIT = registry.gauge(
+    "dadly_concurrency_limit",
+    "Current adaptive concurrency limit per route class",
+    ("route_class",),
+)
+
+LIKE_PATH = re.compile(rf"^{re.escape(Config.API_V1_PREFIX)}/recipes/\d+/like$")
+GUEST_FEED_PATH = f"{Config.API_V1_PREFIX}/recipes/feed"
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def classify(method: str, path: str, headers: Headers) -> Optional[tuple[str, str]]:
+    """
+    Map a request to (route_class, priority), or None if it is never limited.
+
+    Health checks, admin tools, metrics and docs are exempt. Likes are critical (they
+    are the app's core write); the guest feed is low priority because it
+    is cheap to retry and serves unauthenticated traffic.
+    """
+    prefix = Config.API_V1_PREFIX
+    if not path.startswith(prefix + "/") or path.startswith((f"{prefix}/health", f"{prefix}/admin/")):
+        return None
+    if path.startswith(f"{prefix}/auth/"):
+        return "auth", NORMAL
+    if method in WRITE_METHODS:
+        return "writes", CRITICAL if LIKE_PATH.match(path) else NORMAL
+    if path == GUEST_FEED_PATH and "authorization" not in headers:
+        return "feed", LOW
+    return "feed", NORMAL
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one route class.
+
+    Every completion faster than target_latency grows the limit by
+    1/limit (about +1 per limit's worth of requests); a slow or failed
+    completion multiplies it by `backoff`, at most once per target_latency
+    so one burst of slow responses does not collapse the limit.
+
+    Low-priority requests may only use `low_priority_share` of the limit
+    and never wait; normal requests wait up to max_queue_delay for a
+    slot; critical requests also get `critical_headroom` above the limit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        target_latency: float,
+        initial_limit: Optional[float] = None,
+        min_limit: Optional[float] = None,
+        max_limit: Optional[float] = None,
+        max_queue_delay: Optional[float] = None,
+        low_priority_share: Optional[float] = None,
+        critical_headroom: Optional[float] = None,
+        backoff: float = 0.9,
+    ):
+        self.name = name
+        self.target_latency = target_latency
+        self.limit = float(Config.LOAD_SHED_INITIAL_LIMIT if initial_limit is None else initial_limit)
+        self.min_limit = Config.LOAD_SHED_MIN_LIMIT if min_limit is None else min_limit
+        self.max_limit = Config.LOAD_SHED_MAX_LIMIT if max_limit is None else max_limit
+        self.max_queue_delay = (Config.LOAD_SHED_MAX_QUEUE_MS / 1000
+                                if max_queue_delay is None else max_queue_delay)
+        self.low_priority_share = (Config.LOAD_SHED_LOW_PRIORITY_SHARE
+                                   if low_priority_share is None else low_priority_share)
+        self.critical_headroom = (Config.LOAD_SHED_CRITICAL_HEADROOM
+                                  if critical_headroom is None else critical_headroom)
+        self.backoff = backoff
+        self.inflight = 0
+        # One FIFO queue per priority
+        self._waiters: dict[str, deque[asyncio.Future]] = {priority: deque() for priority in WAKE_ORDER}
+        self._last_decrease = 0.0
+        LIMIT.set(name, value=self.limit)
+
+    def capacity(self, priority: str) -> float:
+        if priority == LOW:
+            return self.limit * self.low_priority_share
+        if priority == CRITICAL:
+            return self.limit * self.critical_headroom
+        return self.limit
+
+    def try_acquire(self, priority: str) -> bool:
+        if self.inflight < self.capacity(priority):
+            self.inflight += 1
+            INFLIGHT.set(self.name, value=self.inflight)
+            return True
+        return False
+
+    async def acquire(self, priority: str) -> bool:
+        """Take a slot, waiting up to max_queue_delay; False means shed"""
+        started = time.perf_counter()
+        if self.try_acquire(priority):
+            QUEUE_DELAY.observe(0.0, self.name)
+            return True
+        if priority == LOW or self.max_queue_delay <= 0:
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue = self._waiters[priority]
+        queue.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.max_queue_delay)
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # release() handed over a slot but this request was cancelled
+                # before it resumed; nobody will release it, so pass it on
+                self.inflight -= 1
+                self._wake_waiters()
+            raise
+        finally:
+            if not waiter.done():
+                queue.remove(waiter)
+                waiter.cancel()
+        if waiter.cancelled():
+            return False
+        # release() handed its slot straight to this waiter
+        QUEUE_DELAY.observe(time.perf_counter() - started, self.name)
+        return True
+
+    def release(self, latency: float, failed: bool) -> None:
+        self.inflight -= 1
+        now = time.monotonic()
+        if failed or latency > self.target_latency:
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        LIMIT.set(self.name, value=self.limit)
+        self._wake_waiters()
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to queued requests, highest priority first, in arrival order within one"""
+        for priority in WAKE_ORDER:
+            queue = self._waiters[priority]
+            while queue:
+                waiter = queue[0]
+                if waiter.done():
+                    queue.popleft()
+                    continue
+                if self.inflight >= self.capacity(priority):
+                    break
+                queue.popleft()
+                self.inflight += 1
+                waiter.set_result(None)
+        INFLIGHT.set(self.name, value=self.inflight)
+
+
+def default_limiters() -> dict[str, AdaptiveLimiter]:
+    target = Config.LOAD_SHED_TARGET_LATENCY_MS / 1000
+    return {
+        # Login/registration hash passwords with bcrypt, so they are slower by design
+        "auth": AdaptiveLimiter("auth", target_latency=Config.LOAD_SHED_AUTH_TARGET_LATENCY_MS / 1000),
+        "feed": AdaptiveLimiter("feed", target_latency=target),
+        "writes": AdaptiveLimiter("writes", target_latency=target),
+    }
+
+
+class LoadSheddingMiddleware:
+    """
+    Pure ASGI middleware applying an AdaptiveLimiter per route class.
+
+    Rejected requests get 503 with Retry-After immediately instead of
+    piling up on the database pool behind slower requests.
+    """
+
+    def __init__(self, app: ASGIApp, limiters: Optional[dict[str, AdaptiveLimiter]] = None):
+        self.app = app
+        self.limiters = limiters if limiters is not None else default_limiters()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not Config.LOAD_SHED_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        classified = classify(scope["method"], scope["path"], Headers(scope=scope))
+        limiter = self.limiters.get(classified[0]) if classified else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_class, priority = classified
+        if not await limiter.acquire(priority):
+            SHED_TOTAL.inc(route_class, priority)
+            logger.warning(
+                "Shedding %s %s (%s/%s, in flight %d, limit %.1f)",
+                scope["method"], scope["path"], route_class, priority,
+                limiter.inflight, limiter.limit,
+            )
+            response = JSONResponse(
+                {"detail": "Service is overloaded. Please retry shortly."},
+                status_code=503,
+                headers={"Retry-After": str(Config.LOAD_SHED_RETRY_AFTER_SECONDS)},
+            )
+            await response(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            limiter.release(time.perf_counter() - started, failed=status_code >= 500)
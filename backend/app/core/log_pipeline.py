@@ -0,0 +1,247 @@
+"""
+Non-blocking logging pipeline for DADLY
+Request code only enqueues log records; a background listener thread
+formats them (as text or JSON) and writes them out. High-volume loggers
+can be rate-limited or sampled before anything is enqueued.
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, TextIO
+
+from app.core.metrics import registry
+
+# Attributes every LogRecord has; anything else was passed via extra=
+STANDARD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+# Bound on tracked (logger, message template) pairs; f-string messages make every record unique
+MAX_RATE_BUCKETS = 10000
+
+
+def parse_rules(spec: str) -> dict[str, float]:
+    """Parse "uvicorn.access=50,app.api=0.1" into {logger prefix: number}"""
+    rules = {}
+    for entry in spec.split(","):
+        name, _, value = entry.partition("=")
+        if name.strip() and value.strip():
+            rules[name.strip()] = float(value)
+    return rules
+
+
+def rule_for(name: str, rules: dict[str, float]) -> Optional[float]:
+    """Rule of the closest configured ancestor logger ("app.api" covers "app.api.recipes")"""
+    while True:
+        if name in rules:
+            return rules[name]
+        if "." not in name:
+            return rules.get("")
+        name = name.rpartition(".")[0]
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} (+{suppressed} similar suppressed)" if suppressed else text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed with extra= are included"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class VolumeFilter(logging.Filter):
+    """
+    Per-logger rate limiting and sampling of records below WARNING.
+
+    rate_limits: records per second allowed for each (logger, message
+    template) pair, so one chatty call site cannot crowd out the rest.
+    The next record let through reports how many were suppressed.
+    sample_rates: fraction of records kept, e.g. 0.1 for access logs.
+    """
+
+    def __init__(self, rate_limits: Optional[dict[str, float]] = None,
+                 sample_rates: Optional[dict[str, float]] = None):
+        super().__init__()
+        self.rate_limits = rate_limits or {}
+        self.sample_rates = sample_rates or {}
+        self._rules: dict[str, tuple[Optional[float], Optional[float]]] = {}
+        # (logger, template) -> [tokens, last refill, suppressed since last pass]
+        self._buckets: dict[tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def _rules_for(self, name: str) -> tuple[Optional[float], Optional[float]]:
+        rules = self._rules.get(name)
+        if rules is None:
+            rules = (rule_for(name, self.rate_limits), rule_for(name, self.sample_rates))
+            self._rules[name] = rules
+        return rules
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate, sample = self._rules_for(record.name)
+        if sample is not None and random.random() >= sample:
+            return False
+        if rate is None:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= MAX_RATE_BUCKETS:
+                    self._buckets.clear()
+                bucket = self._buckets[key] = [rate, now, 0]
+            bucket[0] = min(rate, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Enqueues records without formatting them; drops when the queue is full.
+
+    QueueHandler.prepare() renders the message in the calling thread so the
+    record can be pickled. The listener runs in this process, so the record
+    is passed as is and %-formatting happens on the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_output_handlers: list[logging.Handler] = []
+_queue_size = 0
+_hooks_registered = False
+_paused_for_fork = False
+_configured = False
+
+
+def _start_listener() -> None:
+    global _listener
+    log_queue = queue.Queue(maxsize=_queue_size)
+    _handler.queue = log_queue
+    _listener = QueueListener(log_queue, *_output_handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def _before_fork() -> None:
+    # Fork with the listener stopped, so the child cannot inherit a lock
+    # (queue or stream) held mid-write by a thread that no longer exists
+    global _paused_for_fork
+    if _listener is not None:
+        stop()
+        _paused_for_fork = True
+
+
+def _after_fork() -> None:
+    # Both parent and child need a running listener again
+    global _paused_for_fork
+    if _paused_for_fork:
+        _paused_for_fork = False
+        _start_listener()
+
+
+def stop() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def configure(level: int, format_str: str, date_format: str, json_output: bool = False,
+              async_output: bool = True, queue_size: int = 10000,
+              rate_limits: Optional[dict[str, float]] = None,
+              sample_rates: Optional[dict[str, float]] = None,
+              stream: Optional[TextIO] = None) -> None:
+    """Replace the root logger's handlers with the pipeline"""
+    global _handler, _output_handlers, _queue_size, _hooks_registered, _configured
+    stop()
+    _configured = True
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if json_output else TextFormatter(format_str, date_format))
+    volume_filter = VolumeFilter(rate_limits, sample_rates)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+        existing.close()
+    root.setLevel(level)
+
+    if not async_output:
+        output.addFilter(volume_filter)
+        root.addHandler(output)
+        _handler = None
+        return
+
+    _output_handlers = [output]
+    _queue_size = queue_size
+    _handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    _handler.addFilter(volume_filter)
+    root.addHandler(_handler)
+    _start_listener()
+
+    if not _hooks_registered:
+        atexit.register(stop)
+        os.register_at_fork(before=_before_fork, after_in_parent=_after_fork, after_in_child=_after_fork)
+        _hooks_registered = True
+
+
+def configured() -> bool:
+    """Whether configure() has run in this process"""
+    return _configured
+
+
+def dropped_records() -> int:
+    """Records dropped because the queue was full"""
+    return _handler.dropped if _handler is not None else 0
+
+
+DROPPED_RECORDS = registry.gauge(
+    "dadly_log_records_dropped",
+    "Log records dropped since startup because the logging queue was full",
+    callback=dropped_records,
+)
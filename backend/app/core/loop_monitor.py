@@ -0,0 +1,143 @@
+"""
+Event-loop lag monitor for DADLY
+Measures how late timers fire on the event loop and, when the loop is
+blocked past a threshold, captures the blocking stack from a watchdog
+thread and attributes it to the route being served
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app.config.config import ConfigDefault, get_logger
+from app.core.metrics import registry
+from app.core.profiler import request_route, short_path
+
+logger = get_logger(__name__)
+
+# Blocking code outside any request (startup, background tasks)
+BACKGROUND_ROUTE = "background"
+# Stall ended before the watchdog saw it, so no stack was captured
+UNKNOWN_ROUTE = "unknown"
+# Innermost frames kept per captured stack
+STALL_STACK_LIMIT = 40
+LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LOOP_LAG = registry.histogram(
+    "dadly_event_loop_lag_seconds",
+    "How late event-loop timers fire; high values mean something blocked the loop",
+    buckets=LAG_BUCKETS,
+)
+LOOP_STALLS = registry.counter(
+    "dadly_event_loop_stalls_total",
+    "Event-loop stalls over LOOP_STALL_THRESHOLD_MS, by the route that blocked the loop",
+    ("route",),
+)
+
+
+@dataclass
+class Stall:
+    """One period the event loop was blocked"""
+
+    started_at: float  # Unix time
+    duration: float
+    route: str
+    stack: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 1),
+            "route": self.route,
+            "stack": self.stack,
+        }
+
+
+def format_stack(frame) -> list[str]:
+    """Frames as "path:line in function", outermost first"""
+    return [
+        f"{short_path(entry.filename)}:{entry.lineno} in {entry.name}"
+        for entry in traceback.extract_stack(frame, limit=STALL_STACK_LIMIT)
+    ]
+
+
+class LoopLagMonitor:
+    """
+    Continuous lag measurement plus blocking-call detection.
+
+    run() sleeps `interval` seconds in a loop and records how late each
+    wake-up was. A watchdog thread checks the time since the last wake-up;
+    once it exceeds the threshold, the loop is still blocked, so the loop
+    thread's current stack is the blocking code. It is captured then, and
+    reported with the stall's full duration once the loop resumes.
+    """
+
+    interval = ConfigDefault("LOOP_MONITOR_INTERVAL_MS", scale=0.001)
+    threshold = ConfigDefault("LOOP_STALL_THRESHOLD_MS", scale=0.001)
+
+    def __init__(self, interval: Optional[float] = None, threshold: Optional[float] = None,
+                 history: int = 50):
+        self.interval = interval
+        self.threshold = threshold
+        self.stalls: deque[Stall] = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self._heartbeat = time.monotonic()
+        self._captured: Optional[tuple[str, list[str]]] = None
+        self._loop_thread: Optional[int] = None
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, stop: threading.Event) -> None:
+        # Poll often enough to catch stalls just over the threshold
+        poll = min(self.interval, self.threshold) / 2
+        while not stop.wait(poll) and not loop.is_closed():
+            with self._lock:
+                blocked_for = time.monotonic() - self._heartbeat - self.interval
+                if blocked_for < self.threshold or self._captured is not None:
+                    continue
+                frame = sys._current_frames().get(self._loop_thread)
+                if frame is not None:
+                    self._captured = (request_route(frame) or BACKGROUND_ROUTE, format_stack(frame))
+                del frame
+
+    def _record(self, lag: float, captured: Optional[tuple[str, list[str]]]) -> None:
+        route, stack = captured or (UNKNOWN_ROUTE, [])
+        stall = Stall(started_at=time.time() - lag, duration=lag, route=route, stack=stack)
+        self.stalls.append(stall)
+        LOOP_STALLS.inc(route)
+        logger.warning(
+            "Event loop blocked for %.0f ms by %s%s", lag * 1000, route,
+            "".join(f"\n    {line}" for line in stack[-10:]),
+        )
+
+    async def run(self) -> None:
+        """Background task: measure lag until cancelled"""
+        loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        stop = threading.Event()
+        threading.Thread(target=self._watch, args=(loop, stop), name="loop-watchdog", daemon=True).start()
+        try:
+            while True:
+                due = loop.time() + self.interval
+                await asyncio.sleep(self.interval)
+                lag = max(loop.time() - due, 0.0)
+                with self._lock:
+                    self._heartbeat = time.monotonic()
+                    captured, self._captured = self._captured, None
+                LOOP_LAG.observe(lag)
+                if lag >= self.threshold:
+                    self._record(lag, captured)
+        finally:
+            stop.set()
+
+    def recent_stalls(self) -> list[dict]:
+        """Recorded stalls, most recent first"""
+        return [stall.as_dict() for stall in reversed(self.stalls)]
+
+
+# Process-wide monitor started with the app
+loop_monitor = LoopLagMonitor()
@@ -0,0 +1,171 @@
+"""
+Statistical sampling profiler for DADLY
+A background thread snapshots every thread's stack with sys._current_frames()
+at a fixed interval; stacks are aggregated and exported as collapsed stacks
+(flamegraph.pl, speedscope) or a speedscope JSON document.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Optional
+
+from app.core.instrumentation import RequestTimingMiddleware
+
+# Stack depth kept per sample (deep recursion is truncated at the root end)
+MAX_STACK_DEPTH = 128
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+# Frame of the outermost middleware; its `scope` identifies the request being run
+_REQUEST_CODE = RequestTimingMiddleware.__call__.__code__
+_APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ProfilerBusy(Exception):
+    """Another profile is already running in this process"""
+
+
+def short_path(filename: str) -> str:
+    if filename.startswith(_APP_ROOT + os.sep):
+        return os.path.relpath(filename, _APP_ROOT)
+    # Library code: the path inside site-packages is enough to identify it
+    _, marker, rest = filename.rpartition("site-packages" + os.sep)
+    return rest if marker else filename
+
+
+def request_route(frame: Optional[FrameType]) -> Optional[str]:
+    """Route template of the request a stack is serving, or None outside a request"""
+    while frame is not None:
+        if frame.f_code is _REQUEST_CODE:
+            route = frame.f_locals.get("scope", {}).get("route")
+            return getattr(route, "path", None)
+        frame = frame.f_back
+    return None
+
+
+class SamplingProfiler:
+    """
+    Samples all threads every `interval` seconds for `duration` seconds.
+
+    With `route` set, only stacks serving that route template (e.g.
+    "/api/v1/recipes/feed") are kept. Requests are identified by the
+    RequestTimingMiddleware frame on the stack, so this covers handler
+    code running on the event loop thread, which is where DADLY's async
+    handlers do their work.
+    """
+
+    def __init__(self, interval: float = 0.01, route: Optional[str] = None):
+        self.interval = interval
+        self.route = route
+        # (thread name, outermost code, ..., innermost code) -> samples
+        self.stacks: Counter[tuple] = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._labels: dict[CodeType, tuple[str, str, int]] = {}
+
+    def _sample(self, own_thread: int, thread_names: dict[int, str]) -> None:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread:
+                continue
+            if self.route is not None and request_route(frame) != self.route:
+                continue
+            codes = []
+            while frame is not None and len(codes) < MAX_STACK_DEPTH:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            codes.reverse()
+            self.stacks[(thread_names.get(thread_id, str(thread_id)), *codes)] += 1
+
+    def run(self, duration: float) -> "SamplingProfiler":
+        """Sample until duration elapses (blocks the calling thread)"""
+        own_thread = threading.get_ident()
+        started = time.monotonic()
+        deadline = started + duration
+        next_sample = started
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            if now < next_sample:
+                time.sleep(next_sample - now)
+                continue
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self._sample(own_thread, thread_names)
+            self.samples += 1
+            # Skip missed ticks rather than bursting to catch up
+            next_sample = max(next_sample + self.interval, time.monotonic())
+        self.duration = time.monotonic() - started
+        return self
+
+    @property
+    def sample_period(self) -> float:
+        """Actual seconds per sample (longer than interval if sampling fell behind)"""
+        return self.duration / self.samples if self.samples else self.interval
+
+    def _label(self, code: CodeType) -> tuple[str, str, int]:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (code.co_qualname, short_path(code.co_filename), code.co_firstlineno)
+        return label
+
+    def collapsed(self) -> str:
+        """One "thread;outer;...;inner count" line per distinct stack"""
+        lines = []
+        for (thread_name, *codes), count in self.stacks.most_common():
+            frames = [thread_name.replace(";", ":")]
+            frames.extend("{} ({}:{})".format(*self._label(code)) for code in codes)
+            lines.append(f"{';'.join(frames)} {count}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def speedscope(self) -> dict:
+        """Sampled profile in speedscope's file format, weights in seconds"""
+        frames: list[dict] = []
+        frame_index: dict[object, int] = {}
+
+        def index_of(key, frame: dict) -> int:
+            if key not in frame_index:
+                frame_index[key] = len(frames)
+                frames.append(frame)
+            return frame_index[key]
+
+        samples, weights = [], []
+        for (thread_name, *codes), count in self.stacks.most_common():
+            stack = [index_of(("thread", thread_name), {"name": thread_name})]
+            for code in codes:
+                name, path, line = self._label(code)
+                stack.append(index_of(code, {"name": name, "file": path, "line": line}))
+            samples.append(stack)
+            weights.append(round(count * self.sample_period, 6))
+
+        name = f"DADLY {self.route or 'all threads'}"
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": name,
+            "exporter": "dadly",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+_profile_lock = threading.Lock()
+
+
+def profile(duration: float, interval: float, route: Optional[str] = None) -> SamplingProfiler:
+    """Run one profile; raises ProfilerBusy if another is in progress"""
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy()
+    try:
+        return SamplingProfiler(interval, route).run(duration)
+    finally:
+        _profile_lock.release()
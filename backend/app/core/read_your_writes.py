@@ -0,0 +1,103 @@
+"""
+Read-your-writes tracking for DADLY
+After a request commits a write, its response carries the time of that
+write (cookie and header). Requests that send it back within
+Config.REPLICA_STICKY_SECONDS read from the primary, whichever worker or
+instance serves them, so a client never reads a replica that has not
+caught up with its own write.
+"""
+
+import math
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config.config import Config
+
+LAST_WRITE_COOKIE = "dadly_last_write"
+# Same value for clients without a cookie jar (e.g. cross-site frontends)
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+def parse_last_write(value: Optional[str]) -> Optional[float]:
+    """Unix time from a cookie or header value; None if missing or invalid"""
+    if not value:
+        return None
+    try:
+        written_at = float(value)
+    except ValueError:
+        return None
+    return written_at if math.isfinite(written_at) else None
+
+
+class WriteTracker:
+    """Per-request state: the client's last write and any write made by this request"""
+
+    __slots__ = ("last_write", "wrote_at")
+
+    def __init__(self, last_write: Optional[float] = None):
+        self.last_write = last_write
+        self.wrote_at: Optional[float] = None
+
+    def is_sticky(self) -> bool:
+        latest = max(filter(None, (self.last_write, self.wrote_at)), default=None)
+        return latest is not None and time.time() - latest < Config.REPLICA_STICKY_SECONDS
+
+
+_write_tracker: ContextVar[Optional[WriteTracker]] = ContextVar("write_tracker", default=None)
+
+
+def is_sticky() -> bool:
+    """Whether the current request's client wrote recently enough that replicas may lag behind"""
+    tracker = _write_tracker.get()
+    return tracker is not None and tracker.is_sticky()
+
+
+def mark_write() -> None:
+    """Record that the current request committed a write"""
+    tracker = _write_tracker.get()
+    if tracker is not None:
+        tracker.wrote_at = time.time()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Pure ASGI middleware carrying the last-write time between requests.
+
+    Reads it from the request cookie or X-Last-Write header and, when the
+    request committed a write, returns the new time in both.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        cookie = cookie_parser(headers.get("cookie", "")).get(LAST_WRITE_COOKIE)
+        tracker = WriteTracker(parse_last_write(headers.get(LAST_WRITE_HEADER) or cookie))
+        token = _write_tracker.set(tracker)
+
+        async def send_with_last_write(message: Message) -> None:
+            if message["type"] == "http.response.start" and tracker.wrote_at is not None:
+                value = f"{tracker.wrote_at:.3f}"
+                response_headers = MutableHeaders(scope=message)
+                response_headers.append(LAST_WRITE_HEADER, value)
+                response_headers.append(
+                    "Set-Cookie",
+                    f"{LAST_WRITE_COOKIE}={value}; Max-Age={math.ceil(Config.REPLICA_STICKY_SECONDS)}; "
+                    "Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_last_write)
+        finally:
+            _write_tracker.reset(token)
@@ -0,0 +1,109 @@
+"""
+Readiness monitoring for DADLY
+Checks the database and connection pool on a background interval so
+readiness probes only read a cached result
+"""
+
+import asyncio
+import time
+from typing import Callable, ContextManager, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config.config import ConfigDefault, get_logger
+
+logger = get_logger(__name__)
+
+
+def pool_status(engine: Engine, max_usage: float) -> dict:
+    """
+    Connection pool usage of an engine.
+
+    Pools without a fixed size (SQLite's StaticPool, unlimited overflow)
+    cannot saturate and always report ok.
+    """
+    pool = engine.pool
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {"ok": True}
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    if max_overflow < 0:
+        return {"ok": True, "in_use": pool.checkedout()}
+    capacity = pool.size() + max_overflow
+    in_use = pool.checkedout()
+    usage = in_use / capacity if capacity else 1.0
+    return {"ok": usage < max_usage, "in_use": in_use, "capacity": capacity}
+
+
+class ReadinessMonitor:
+    """
+    Cached result of the readiness checks.
+
+    check() pings the database and reads pool usage; run() repeats it
+    every interval in a worker thread. A result older than three intervals
+    counts as not ready, since the checker itself is stuck.
+    """
+
+    interval = ConfigDefault("READINESS_INTERVAL_SECONDS")
+    max_pool_usage = ConfigDefault("READINESS_MAX_POOL_USAGE")
+
+    def __init__(self, interval: Optional[float] = None, max_pool_usage: Optional[float] = None):
+        self.interval = interval
+        self.max_pool_usage = max_pool_usage
+        self.clear()
+
+    def clear(self) -> None:
+        self._ready = False
+        self._checks: dict[str, dict] = {}
+        self.checked_at: Optional[float] = None
+
+    def check(self, db: Session) -> bool:
+        # Pool usage is read before the ping checks out a connection of its own
+        checks = {"pool": pool_status(db.get_bind(), self.max_pool_usage)}
+        started = time.perf_counter()
+        try:
+            db.execute(text("SELECT 1"))
+            checks["database"] = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+        except Exception as e:
+            checks["database"] = {"ok": False, "error": type(e).__name__}
+
+        ready = all(check["ok"] for check in checks.values())
+        if ready != self._ready and self.checked_at is not None:
+            logger.warning("Readiness changed to %s: %s", "ready" if ready else "not ready", checks)
+        self._ready, self._checks, self.checked_at = ready, checks, time.monotonic()
+        return ready
+
+    def snapshot(self) -> tuple[bool, dict]:
+        """(ready, response body) from the last check"""
+        if self.checked_at is None:
+            return False, {"status": "starting", "checks": {}}
+        age = time.monotonic() - self.checked_at
+        if age > 3 * self.interval:
+            return False, {"status": "stale", "checks": self._checks, "age_seconds": round(age, 1)}
+        return self._ready, {
+            "status": "ready" if self._ready else "not_ready",
+            "checks": self._checks,
+            "age_seconds": round(age, 1),
+        }
+
+    async def run(self, session_factory: Callable[[], ContextManager[Session]]) -> None:
+        """Background task: re-check every interval seconds"""
+
+        def check_in_thread():
+            with session_factory() as db:
+                return self.check(db)
+
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await asyncio.to_thread(check_in_thread)
+            except Exception as e:
+                # Opening the session failed (e.g. missing configuration)
+                self._ready, self.checked_at = False, time.monotonic()
+                self._checks = {"database": {"ok": False, "error": type(e).__name__}}
+                logger.warning("Readiness check failed: %s", e)
+
+
+# Process-wide monitor behind GET /health/ready
+readiness_monitor = ReadinessMonitor()
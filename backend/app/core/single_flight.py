@@ -0,0 +1,61 @@
+"""
+Request coalescing (single-flight) for identical concurrent reads
+Only one computation per key runs at a time; concurrent callers share its result
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from app.core.metrics import registry
+
+T = TypeVar("T")
+
+COALESCED_TOTAL = registry.counter(
+    "dadly_singleflight_coalesced_total",
+    "Requests served by joining an identical in-flight computation",
+    ("group",),
+)
+
+
+def make_key(name: str, **params: Any) -> tuple:
+    """Normalize request parameters into a hashable key (order-independent)"""
+    return (name, tuple(sorted(params.items())))
+
+
+class SingleFlight:
+    """
+    Per-process single-flight group.
+
+    The first caller for a key starts the computation as a task; callers
+    arriving while it runs await the same task instead of starting their
+    own. The key is released as soon as the task finishes, so this
+    coalesces bursts without caching results.
+
+    Waiters are shielded: a cancelled (disconnected) caller does not
+    cancel the shared computation for the others.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._inflight.get(key)
+        if task is not None:
+            COALESCED_TOTAL.inc(self.name)
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda finished: self._release(key, finished))
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
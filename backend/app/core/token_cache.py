@@ -0,0 +1,85 @@
+"""
+Verified JWT claims cache for DADLY
+Skips signature verification and JSON parsing for tokens seen recently
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.config.config import ConfigDefault
+from app.core.metrics import registry
+
+LOOKUPS_TOTAL = registry.counter(
+    "dadly_token_cache_lookups_total",
+    "Verified-claims cache lookups by result",
+    ("result",),
+)
+
+
+def token_digest(token: str) -> bytes:
+    """Cache key: raw tokens are never kept in memory as keys"""
+    return hashlib.sha256(token.encode()).digest()
+
+
+class TokenClaimsCache:
+    """
+    Bounded LRU of verified token claims.
+
+    Each entry expires at the token's own `exp` (capped at max_ttl), so a
+    cached token is never accepted past the point jwt.decode would reject
+    it. Only successfully verified tokens are stored; revocation must be
+    checked by the caller before consulting the cache.
+    """
+
+    maxsize = ConfigDefault("TOKEN_CACHE_SIZE")
+    max_ttl = ConfigDefault("TOKEN_CACHE_MAX_TTL_SECONDS")
+
+    def __init__(self, maxsize: Optional[int] = None, max_ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        self._entries: OrderedDict[bytes, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, token: str) -> Optional[dict]:
+        key = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                LOOKUPS_TOTAL.inc("miss")
+                return None
+            claims, expires_at = entry
+            if time.time() >= expires_at:
+                del self._entries[key]
+                LOOKUPS_TOTAL.inc("expired")
+                return None
+            self._entries.move_to_end(key)
+        LOOKUPS_TOTAL.inc("hit")
+        return claims
+
+    def put(self, token: str, claims: dict) -> None:
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.max_ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        key = token_digest(token)
+        with self._lock:
+            self._entries[key] = (claims, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token_digest(token), None)
@@ -1,67 +1,208 @@
 """
 Database connection and session management for DADLY
+Engines and the session factory are created on first use, so importing
+this module needs no database configuration
 """
 
-import os
-from typing import Annotated
-from sqlalchemy import create_engine
+import random
+import threading
+from contextlib import contextmanager
+from typing import Annotated, ContextManager, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
-from fastapi import Depends
-from app.config.config import get_logger
+from fastapi import Depends, Request
+from app.config.config import get_logger, getenv, Config
+from app.core.read_your_writes import is_sticky, mark_write
 
-from dotenv import load_dotenv
+logger = get_logger(__name__)
 
-load_dotenv()
+_engine: Optional[Engine] = None
+_replica_engines: Optional[list[Engine]] = None
+_session_factory: Optional[sessionmaker] = None
+_init_lock = threading.Lock()
+
+
+def database_settings() -> dict[str, str]:
+    """Primary database settings from the environment; raises if any are missing"""
+    settings = {
+        "user": getenv('DB_USER'),
+        "password": getenv('DB_PASSWORD'),
+        "host": getenv('DB_HOST', 'db'),
+        "port": getenv('DB_PORT', '3306'),
+        "name": getenv('DB_NAME'),
+    }
+    # Validate required environment variables
+    for key, variable in (("user", "DB_USER"), ("password", "DB_PASSWORD"), ("name", "DB_NAME")):
+        if not settings[key]:
+            raise RuntimeError(f"{variable} environment variable must be set")
+    return settings
+
+
+def database_url() -> str:
+    settings = database_settings()
+    return (
+        f"mysql+pymysql://{settings['user']}:{settings['password']}@"
+        f"{settings['host']}:{settings['port']}/{settings['name']}"
+    )
+
+
+def build_replica_urls() -> list[str]:
+    """
+    Read replica URLs from the environment.
 
-logger = get_logger(__name__)
+    DB_REPLICA_HOSTS is a comma-separated list of host[:port] sharing the
+    primary's credentials and database name. DB_REPLICA_URLS (full URLs)
+    takes precedence, e.g. to point at a second local instance.
+    """
+    explicit_urls = [url.strip() for url in getenv('DB_REPLICA_URLS', '').split(',') if url.strip()]
+    if explicit_urls:
+        return explicit_urls
+
+    hosts = [entry.strip() for entry in getenv('DB_REPLICA_HOSTS', '').split(',') if entry.strip()]
+    if not hosts:
+        return []
+    settings = database_settings()
+    urls = []
+    for entry in hosts:
+        host, _, port = entry.partition(':')
+        urls.append(
+            f"mysql+pymysql://{settings['user']}:{settings['password']}@"
+            f"{host}:{port or settings['port']}/{settings['name']}"
+        )
+    return urls
+
+
+def get_engine() -> Engine:
+    """Primary engine, created on first call"""
+    global _engine
+    if _engine is None:
+        with _init_lock:
+            if _engine is None:
+                settings = database_settings()
+                logger.info("Connecting to database at %s:%s/%s", settings['host'], settings['port'], settings['name'])
+                _engine = create_engine(database_url())
+    return _engine
+
+
+def get_replica_engines() -> list[Engine]:
+    """Optional read replicas (empty list = everything goes to the primary)"""
+    global _replica_engines
+    if _replica_engines is None:
+        with _init_lock:
+            if _replica_engines is None:
+                engines = [create_engine(url, pool_pre_ping=True) for url in build_replica_urls()]
+                if engines:
+                    logger.info("Routing read-only requests to %d replica(s)", len(engines))
+                _replica_engines = engines
+    return _replica_engines
+
+
+def get_session_factory() -> sessionmaker:
+    """Session factory bound to the primary engine, created on first call"""
+    global _session_factory
+    if _session_factory is None:
+        engine = get_engine()
+        with _init_lock:
+            if _session_factory is None:
+                _session_factory = sessionmaker(
+                    autocommit=False, autoflush=False, bind=engine, class_=RoutingSession
+                )
+    return _session_factory
+
+
+def dispose_engines() -> None:
+    """
+    Drop pooled connections without closing them.
+
+    For a forked worker: connections inherited from the parent must not
+    be shared, so the child opens its own on first use.
+    """
+    engines = ([_engine] if _engine is not None else []) + (_replica_engines or [])
+    for engine in engines:
+        engine.dispose(close=False)
 
-# Database URL - use SQLite for development, PostgreSQL for production
-# DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./dadly.db")
 
-# Get database configuration with defaults
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
-DB_HOST = os.getenv('DB_HOST', 'db')
-DB_PORT = os.getenv('DB_PORT', '3306')
-DB_NAME = os.getenv('DB_NAME')
+class RoutingSession(Session):
+    """
+    Session that sends read-only work to a replica.
+
+    Reads go to one randomly chosen replica when the session was opened
+    for a read-only request, the session has not written anything, and the
+    client has not committed a write within the sticky window (see
+    app.core.read_your_writes). Everything else uses the primary.
+    """
 
-# Validate required environment variables
-if not DB_USER:
-    raise RuntimeError("DB_USER environment variable must be set")
-if not DB_PASSWORD:
-    raise RuntimeError("DB_PASSWORD environment variable must be set")
-if not DB_NAME:
-    raise RuntimeError("DB_NAME environment variable must be set")
+    def __init__(self, *args, read_only: bool = False, primary=None, replicas=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_only = read_only
+        self.primary = primary if primary is not None else get_engine()
+        replicas = get_replica_engines() if replicas is None else replicas
+        self.replica = random.choice(replicas) if replicas else None
 
-DATABASE_URL = (
-    f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@"
-    f"{DB_HOST}:{DB_PORT}/{DB_NAME}"
-)
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if clause is not None and getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+        if (
+            self.replica is not None
+            and self.read_only
+            and not self._flushing
+            and not self.info.get("wrote")
+            and not is_sticky()
+        ):
+            return self.replica
+        return self.primary
 
-logger.info(f"Connecting to database at {DB_HOST}:{DB_PORT}/{DB_NAME}")
 
-# Create engine
-engine = create_engine(DATABASE_URL)
+@event.listens_for(RoutingSession, "after_flush")
+def _record_session_write(session, flush_context):
+    session.info["wrote"] = True
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_client_write(session):
+    if session.info.pop("wrote", False):
+        mark_write()
+
+
+# Methods whose handlers only read and may be served by a replica
+READ_ONLY_METHODS = {"GET", "HEAD"}
 
 # Create base class for models
 Base = declarative_base()
 
 
-def get_db():
+def get_db(request: Request = None):
     """
     Dependency to get database session
+
+    GET/HEAD requests get a session routed to a read replica (if any
+    are configured); all other requests use the primary.
     """
-    db = SessionLocal()
+    read_only = request is not None and request.method in READ_ONLY_METHODS
+    db = get_session_factory()(read_only=read_only)
     try:
         yield db
     finally:
         db.close()
 
 
+def detached_session(app, read_only: bool = False) -> ContextManager[Session]:
+    """
+    Session that is not tied to a request's lifetime.
+
+    For startup, background jobs and work shared between requests (a
+    request's own session is closed when that request ends). Resolves
+    get_db through app.dependency_overrides, so it uses the same database
+    as request handlers (e.g. in tests).
+    """
+    override = app.dependency_overrides.get(get_db)
+    if override is not None:
+        return contextmanager(override)()
+    return get_session_factory()(read_only=read_only)
+
+
 # Database dependency type annotation
 db_dependency = Annotated[Session, Depends(get_db)]
 
@@ -71,5 +212,5 @@ def create_tables():
     Create all database tables
     """
     logger.info("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=get_engine())
     logger.info("Database tables created successfully!")
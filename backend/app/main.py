@@ -1,6 +1,9 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp
 
 from app.config.config import setup_logging, Config, get_logger
 from app.api.health import router as health_router
@@ -8,9 +11,21 @@ from app.api.auth import router as auth_router
 from app.api.users import router as users_router
 from app.api.recipes import router as recipes_router
 from app.api.pantry import router as pantry_router
+from app.api.metrics import router as metrics_router
+from app.api.admin import router as admin_router
+from app.core import log_pipeline
+from app.core.instrumentation import RequestTimingMiddleware, install_sql_hooks
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.loop_monitor import loop_monitor
+from app.core.readiness import readiness_monitor
+from app.core.read_your_writes import LAST_WRITE_HEADER, ReadYourWritesMiddleware
+from app.db.database import detached_session
+from app.services.catalog import recipe_catalog
+from app.services.guest_feed import guest_feed_pool
+from app.services.ingredient_index import ingredient_index
+from app.services.ingredients import ingredient_canonicalizer
+from app.services.similarity import similarity_index
 
-# Initialize logging
-setup_logging()
 logger = get_logger(__name__)
 
 app = FastAPI(
@@ -19,6 +34,12 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Innermost middleware: carries the client's last write time so its reads avoid lagging replicas
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Adaptive concurrency limits (inside CORS so 503s carry CORS headers)
+app.add_middleware(LoadSheddingMiddleware)
+
 # CORS configuration for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -33,14 +54,85 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all HTTP methods
     allow_headers=["*"],  # Allow all headers
+    # Conditional GETs, load-shedding backoff and read-your-writes
+    expose_headers=["ETag", "Retry-After", LAST_WRITE_HEADER],
 )
 
+def gzip_middleware(app: ASGIApp) -> GZipMiddleware:
+    """GZip sized from Config when the middleware stack is built, not at import"""
+    return GZipMiddleware(app, minimum_size=Config.GZIP_MINIMUM_SIZE, compresslevel=Config.GZIP_COMPRESS_LEVEL)
+
+
+# Compress feed and list responses above the configured size threshold
+app.add_middleware(gzip_middleware)
+
+# Outermost middleware: per-request timing, SQL stats and Server-Timing header
+install_sql_hooks()
+app.add_middleware(RequestTimingMiddleware)
+
+
+# Long-running asyncio tasks started at startup, cancelled at shutdown
+background_tasks: list[asyncio.Task] = []
+
+
+def background_session():
+    """Open a database session outside a request (see detached_session)"""
+    return detached_session(app)
+
+
+def preload_caches(persist: bool = False) -> None:
+    """
+    Load the in-memory catalog and indexes.
+
+    python -m app.serve calls this once in the supervisor before forking,
+    so workers inherit the loaded state; a single uvicorn process loads at
+    startup instead. Only the supervisor persists similarity signatures,
+    so workers never race on recipe_signatures.
+    """
+    ingredient_canonicalizer.compile()
+    try:
+        with background_session() as db:
+            loaded = recipe_catalog.refresh(db)
+            pooled = guest_feed_pool.refresh(db)
+            ingredient_index.refresh(db)
+            # Persisting new signatures lets the next start skip hashing them
+            similarity_index.refresh(db, persist=persist)
+        logger.info(
+            "Recipe catalog loaded (%d recipes, %d in guest pool, %d indexed for cook-now)",
+            loaded, pooled, len(ingredient_index),
+        )
+    except Exception as e:
+        # Not fatal: each loads on the first request that needs it instead
+        logger.warning("Could not preload recipe catalog: %s", e)
+
 
 @app.on_event("startup")
 async def startup_event():
+    # serve.py configures logging before importing the app; plain uvicorn does not
+    if not log_pipeline.configured():
+        setup_logging()
     logger.info("Starting up DADLY API...")
+    try:
+        with background_session() as db:
+            readiness_monitor.check(db)
+    except Exception as e:
+        logger.warning("Could not run the first readiness check: %s", e)
+    if recipe_catalog.last_refresh is None:
+        # Cold start hashes the catalog; keep the event loop free meanwhile
+        await asyncio.to_thread(preload_caches)
+    background_tasks.append(asyncio.create_task(guest_feed_pool.run_refresher(background_session)))
+    background_tasks.append(asyncio.create_task(readiness_monitor.run(background_session)))
+    if Config.LOOP_MONITOR_ENABLED:
+        background_tasks.append(asyncio.create_task(loop_monitor.run()))
     logger.info("DADLY API startup complete!")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in background_tasks:
+        task.cancel()
+    background_tasks.clear()
+
 app.include_router(health_router, prefix=Config.API_V1_PREFIX, tags=["Health"])
 
 app.include_router(auth_router, prefix=f"{Config.API_V1_PREFIX}/auth", tags=["Authentication"])
@@ -51,5 +143,12 @@ app.include_router(recipes_router, prefix=f"{Config.API_V1_PREFIX}/recipes", tag
 
 app.include_router(pantry_router, prefix=f"{Config.API_V1_PREFIX}/pantry", tags=["Pantry"])
 
+app.include_router(admin_router, prefix=f"{Config.API_V1_PREFIX}/admin", tags=["Admin"])
+
+# Prometheus scrapes /metrics at the root by convention
+app.include_router(metrics_router, tags=["Monitoring"])
+
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("app.main:app", host="127.0.0.1", port=8000)
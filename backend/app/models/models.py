@@ -10,9 +10,12 @@ from sqlalchemy import (
     Boolean,
     DateTime,
     ForeignKey,
+    Computed,
+    DDL,
+    event,
 )
 import sqlalchemy as sa
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.db.database import Base
 
@@ -28,6 +31,9 @@ class User(Base):
         String(20), default="none"
     )  # none, vegetarian, vegan, gluten_free, keto
     allergies = Column(Text)
+    # Bumped on every pantry / like write; used to build list ETags
+    pantry_version = Column(Integer, nullable=False, default=0, server_default="0")
+    likes_version = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -37,29 +43,87 @@ class User(Base):
 
 class Recipe(Base):
     __tablename__ = "recipes"
+    __table_args__ = (
+        # Full-text index backing GET /recipes/search (MySQL only).
+        # SQLite uses the recipes_fts FTS5 table created below instead.
+        sa.Index(
+            'ix_recipes_fulltext', 'name', 'description', 'ingredients',
+            mysql_prefix='FULLTEXT',
+        ).ddl_if(dialect='mysql'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(200), nullable=False, index=True)
-    description = Column(Text)
+    # Heavy Text columns are deferred (loaded together on first access) so
+    # entity queries that only need card fields don't pull recipe bodies
+    description = deferred(Column(Text), group="body")
     prep_time = Column(Integer, nullable=False)  # minutes
     cook_time = Column(Integer, nullable=False)  # minutes
     difficulty = Column(String(10), nullable=False)  # easy, medium, hard
     image_url = Column(String(500))
-    instructions = Column(Text, nullable=False)
-    ingredients = Column(Text, nullable=False)  # JSON string of ingredients list
+    instructions = deferred(Column(Text, nullable=False), group="body")
+    ingredients = deferred(Column(Text, nullable=False), group="body")  # JSON string of ingredients list
     like_count = Column(Integer, default=0)
+    # Stored generated column so "max total time" filters can use an index
+    total_time = Column(Integer, Computed("prep_time + cook_time", persisted=True), index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Watermark for incremental refresh of the in-memory recipe catalog
+    # (like-count updates set it to itself, so likes do not move it)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
 
     # Relationships
     interactions = relationship("UserRecipeInteraction", back_populates="recipe")
 
 
+# SQLite fallback for the MySQL FULLTEXT index (used by the test suite).
+# An external-content FTS5 table mirrors the searchable recipe columns and
+# is kept in sync with triggers, so search never scans the recipes table.
+RECIPES_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS recipes_fts USING fts5(
+        name, description, ingredients, content='recipes', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_ai AFTER INSERT ON recipes BEGIN
+        INSERT INTO recipes_fts(rowid, name, description, ingredients)
+        VALUES (new.id, new.name, new.description, new.ingredients);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_ad AFTER DELETE ON recipes BEGIN
+        INSERT INTO recipes_fts(recipes_fts, rowid, name, description, ingredients)
+        VALUES ('delete', old.id, old.name, old.description, old.ingredients);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS recipes_fts_au AFTER UPDATE OF name, description, ingredients ON recipes BEGIN
+        INSERT INTO recipes_fts(recipes_fts, rowid, name, description, ingredients)
+        VALUES ('delete', old.id, old.name, old.description, old.ingredients);
+        INSERT INTO recipes_fts(rowid, name, description, ingredients)
+        VALUES (new.id, new.name, new.description, new.ingredients);
+    END
+    """,
+]
+
+for statement in RECIPES_FTS_DDL:
+    event.listen(Recipe.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(
+    Recipe.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS recipes_fts").execute_if(dialect="sqlite"),
+)
+
+
 class UserRecipeInteraction(Base):
     __tablename__ = "user_recipe_interactions"
     __table_args__ = (
         # Prevent duplicate likes: a user can only like a recipe once
         # This is enforced at the database level to prevent race conditions
         sa.UniqueConstraint('user_id', 'recipe_id', name='uq_user_recipe'),
+        # Matches the (created_at, id) keyset used by GET /recipes/liked,
+        # so every page is a single index range scan
+        sa.Index('ix_interactions_user_liked_created', 'user_id', 'liked', 'created_at', 'id'),
     )
 
     id = Column(Integer, primary_key=True, index=True)
@@ -85,7 +149,22 @@ class PantryItem(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     ingredient_name = Column(String(100), nullable=False)
     quantity = Column(String(50))  # "2 cups", "500g", etc.
+    # quantity parsed into canonical units: grams, millilitres, or a count (unit NULL)
+    quantity_value = Column(sa.Float, nullable=True)
+    quantity_unit = Column(String(10), nullable=True)
     added_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
-    user = relationship("User", back_populates="pantry_items")
\ No newline at end of file
+    user = relationship("User", back_populates="pantry_items")
+
+
+# Persisted MinHash signature of a recipe's canonical ingredient set,
+# so the similar-recipes index does not re-hash the catalog on startup
+class RecipeSignature(Base):
+    __tablename__ = "recipe_signatures"
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(sa.LargeBinary, nullable=False)  # NUM_PERM little-endian uint32 minima
+    # ingredients_hash() of the recipe's ingredients when the signature was computed
+    # (recipes.updated_at moves on any edit, so it cannot tell when to re-hash)
+    ingredients_hash = Column(String(32))
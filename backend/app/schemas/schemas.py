@@ -133,6 +133,8 @@ class PantryItemResponse(BaseModel):
     id: int
     ingredient_name: str
     quantity: Optional[str] = None
+    quantity_value: Optional[float] = None
+    quantity_unit: Optional[str] = None
     added_at: datetime
 
     class Config:
@@ -0,0 +1,200 @@
+"""
+Production server entry point for DADLY
+Runs a pre-forked pool of uvicorn workers sharing one listening socket:
+
+    python -m app.serve
+"""
+
+import importlib.util
+import os
+import random
+import signal
+import socket
+import time
+from typing import Callable, Optional
+
+from app.config.config import Config, get_logger, setup_logging
+
+logger = get_logger(__name__)
+
+# Seconds between checks for exited workers
+REAP_INTERVAL = 0.2
+# A worker exiting sooner than this after start counts as a crash
+MIN_WORKER_LIFETIME = 1.0
+# Back-off before respawning after a crash, so a broken deploy does not spin
+CRASH_BACKOFF_SECONDS = 1.0
+
+
+def worker_count(configured: Optional[int] = None) -> int:
+    """WEB_CONCURRENCY, or one worker per CPU available to this process"""
+    configured = Config.WEB_CONCURRENCY if configured is None else configured
+    if configured > 0:
+        return configured
+    try:
+        return max(len(os.sched_getaffinity(0)), 1)
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def event_loop_setting() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_setting() -> str:
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def max_requests(limit: int, jitter: int) -> Optional[int]:
+    """Per-worker request limit; random jitter spreads restarts across workers"""
+    if limit <= 0:
+        return None
+    return limit + random.randint(0, max(jitter, 0))
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Listening socket created once in the supervisor and inherited by every worker"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerSupervisor:
+    """
+    Pre-fork supervisor.
+
+    Each worker is a forked child running target(). Workers that exit
+    (recycling after their request limit, or a crash) are replaced until
+    stop() is called; stop() sends SIGTERM so workers drain in-flight
+    requests, and SIGKILLs those still running after graceful_timeout.
+    """
+
+    def __init__(self, target: Callable[[], None], workers: int, graceful_timeout: float):
+        self.target = target
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.children: dict[int, float] = {}  # pid -> start time
+        self.stopping = False
+        self.kill_deadline: Optional[float] = None
+        self.spawned = 0
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            # The supervisor's handlers must not run in the worker
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            exit_code = 0
+            try:
+                self.target()
+            except BaseException as e:
+                logger.error("Worker %s failed: %s", os.getpid(), e)
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+        self.children[pid] = time.monotonic()
+        self.spawned += 1
+        return pid
+
+    def stop(self, *_args) -> None:
+        if self.stopping:
+            return
+        self.stopping = True
+        self.kill_deadline = time.monotonic() + self.graceful_timeout
+        logger.info("Stopping %d worker(s), waiting up to %gs", len(self.children), self.graceful_timeout)
+        self._signal_children(signal.SIGTERM)
+
+    def _signal_children(self, signum: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                self.children.pop(pid, None)
+
+    def _reap(self) -> None:
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping:
+                continue
+            lifetime = time.monotonic() - started
+            exit_code = os.waitstatus_to_exitcode(status)
+            if exit_code == 0:
+                logger.info("Worker %s exited after %.0fs, replacing it", pid, lifetime)
+            else:
+                logger.warning("Worker %s exited with code %s after %.1fs, replacing it", pid, exit_code, lifetime)
+                if lifetime < MIN_WORKER_LIFETIME:
+                    time.sleep(CRASH_BACKOFF_SECONDS)
+
+    def run(self) -> None:
+        """Keep the pool at size until stopped, then wait for workers to exit"""
+        while True:
+            self._reap()
+            if self.stopping:
+                if not self.children:
+                    return
+                if time.monotonic() >= self.kill_deadline:
+                    logger.warning("Killing %d worker(s) still running", len(self.children))
+                    self._signal_children(signal.SIGKILL)
+                    self.kill_deadline = float("inf")
+            else:
+                while len(self.children) < self.workers:
+                    self.spawn()
+            time.sleep(REAP_INTERVAL)
+
+
+def serve_worker(sock: socket.socket, app) -> None:
+    """Worker body: fresh DB pools, then one uvicorn server on the shared socket"""
+    import uvicorn
+
+    from app.db.database import dispose_engines
+
+    # Connections opened before the fork belong to the supervisor
+    dispose_engines()
+    config = uvicorn.Config(
+        app,
+        loop=event_loop_setting(),
+        http=http_setting(),
+        lifespan="on",
+        log_config=None,
+        limit_max_requests=max_requests(Config.SERVER_MAX_REQUESTS, Config.SERVER_MAX_REQUESTS_JITTER),
+        timeout_graceful_shutdown=Config.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        timeout_keep_alive=Config.SERVER_KEEPALIVE_SECONDS,
+    )
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def main() -> None:
+    setup_logging()
+    # Preload: import the app and load its caches once so workers share
+    # them copy-on-write instead of each rebuilding them at startup
+    from app.main import app, preload_caches
+
+    preload_caches(persist=True)
+
+    sock = bind_socket(Config.SERVER_HOST, Config.SERVER_PORT, Config.SERVER_BACKLOG)
+    workers = worker_count()
+    logger.info(
+        "Serving on %s:%s with %d worker(s) (loop=%s, http=%s)",
+        Config.SERVER_HOST, Config.SERVER_PORT, workers, event_loop_setting(), http_setting(),
+    )
+
+    supervisor = WorkerSupervisor(lambda: serve_worker(sock, app), workers, Config.SERVER_GRACEFUL_TIMEOUT_SECONDS)
+    signal.signal(signal.SIGTERM, supervisor.stop)
+    signal.signal(signal.SIGINT, supervisor.stop)
+    supervisor.run()
+    sock.close()
+    logger.info("All workers stopped")
+
+
+if __name__ == "__main__":
+    main()
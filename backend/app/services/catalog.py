@@ -0,0 +1,248 @@
+"""
+In-process columnar catalog of recipe feed-card fields
+Keeps the seven card fields in typed arrays indexed by recipe id, so list
+endpoints only need recipe ids from the database
+"""
+
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+from typing import Callable, Collection, Iterable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.config.config import ConfigDefault, get_logger
+from app.models.models import Recipe
+
+logger = get_logger(__name__)
+
+CARD_FIELDS = ("id", "name", "image_url", "prep_time", "cook_time", "difficulty", "like_count")
+CARD_COLUMNS = tuple(getattr(Recipe, field) for field in CARD_FIELDS)
+
+# Rows fetched per round trip while streaming the full catalog
+LOAD_BATCH_SIZE = 5000
+
+
+class RecipeWatermark:
+    """
+    Incremental refresh of an in-process recipe cache.
+
+    Deltas read recipes whose updated_at is at or after the newest one
+    seen, minus an overlap window: a transaction that commits after a
+    later one, with an older timestamp, is still read. Deleted recipes
+    leave no row behind, so every full_reload_interval, or as soon as the
+    table's row count differs from the cache's, all recipes are read and
+    the ones not found are evicted.
+    """
+
+    overlap = ConfigDefault("CATALOG_REFRESH_OVERLAP_SECONDS")
+    full_reload_interval = ConfigDefault("CATALOG_FULL_RELOAD_SECONDS")
+
+    def __init__(self, overlap: Optional[float] = None, full_reload_interval: Optional[float] = None):
+        self.overlap = overlap
+        self.full_reload_interval = full_reload_interval
+        self.updated_at = None
+        self.last_full_reload = None
+
+    def _read(self, db: Session, statement, apply: Callable, seen: Optional[set] = None) -> int:
+        count = 0
+        for row in db.execute(statement.execution_options(yield_per=LOAD_BATCH_SIZE)):
+            apply(row)
+            updated_at = row[-1]
+            if updated_at is not None and (self.updated_at is None or updated_at > self.updated_at):
+                self.updated_at = updated_at
+            if seen is not None:
+                seen.add(row[0])
+            count += 1
+        return count
+
+    def refresh(self, db: Session, statement, apply: Callable, cached: Callable[[], Collection[int]],
+                evict: Callable[[int], None]) -> int:
+        """
+        Pass changed rows to apply; returns the number of rows read.
+
+        statement selects Recipe.id first and Recipe.updated_at last;
+        cached() returns the recipe ids the cache holds.
+        """
+        full = (self.last_full_reload is None
+                or time.monotonic() - self.last_full_reload >= self.full_reload_interval)
+        if not full:
+            delta = statement
+            if self.updated_at is not None:
+                delta = statement.where(Recipe.updated_at >= self.updated_at - timedelta(seconds=self.overlap))
+            count = self._read(db, delta, apply)
+            if db.scalar(select(func.count()).select_from(Recipe)) == len(cached()):
+                return count
+
+        seen = set()
+        count = self._read(db, statement, apply, seen)
+        for recipe_id in [recipe_id for recipe_id in cached() if recipe_id not in seen]:
+            evict(recipe_id)
+        self.last_full_reload = time.monotonic()
+        return count
+
+
+class RecipeCatalog:
+    """
+    Array-backed store of feed cards.
+
+    Recipe ids are kept sorted in a typed array and looked up by bisection;
+    every other field lives in a parallel array at the same slot. Times and
+    like counts are machine integers, difficulty is a one-byte code, and
+    names/URLs are interned strings. That is a few dozen bytes per recipe
+    plus the strings, instead of a full ORM entity and dict.
+
+    The catalog is refreshed incrementally (see RecipeWatermark). Likes
+    do not move updated_at: this worker writes like counts through, other
+    workers' likes arrive with the next full reload.
+    """
+
+    refresh_interval = ConfigDefault("CATALOG_REFRESH_SECONDS")
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = refresh_interval
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop all cards and force a full reload on next refresh"""
+        self._ids = array("q")
+        self._like_counts = array("l")
+        self._prep_times = array("i")
+        self._cook_times = array("i")
+        self._difficulties = array("B")
+        self._names: list[str] = []
+        self._image_urls: list[Optional[str]] = []
+        # Small intern table for difficulty codes ("easy", "medium", "hard")
+        self._difficulty_values: list[str] = []
+        self._difficulty_codes: dict[str, int] = {}
+        self.watermark = RecipeWatermark()
+        self.last_refresh = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _slot(self, recipe_id: int) -> int:
+        """Index of recipe_id in the arrays, or -1 if absent"""
+        pos = bisect_left(self._ids, recipe_id)
+        if pos < len(self._ids) and self._ids[pos] == recipe_id:
+            return pos
+        return -1
+
+    def _difficulty_code(self, difficulty: str) -> int:
+        code = self._difficulty_codes.get(difficulty)
+        if code is None:
+            code = len(self._difficulty_values)
+            self._difficulty_values.append(difficulty)
+            self._difficulty_codes[difficulty] = code
+        return code
+
+    def upsert(self, recipe_id, name, image_url, prep_time, cook_time, difficulty, like_count) -> None:
+        """Insert or update one card (arguments in CARD_FIELDS order)"""
+        name = sys.intern(name)
+        image_url = sys.intern(image_url) if image_url is not None else None
+        difficulty_code = self._difficulty_code(difficulty)
+        like_count = like_count or 0
+
+        pos = bisect_left(self._ids, recipe_id)
+        if pos < len(self._ids) and self._ids[pos] == recipe_id:
+            self._names[pos] = name
+            self._image_urls[pos] = image_url
+            self._prep_times[pos] = prep_time
+            self._cook_times[pos] = cook_time
+            self._difficulties[pos] = difficulty_code
+            self._like_counts[pos] = like_count
+            return
+
+        # Ids are auto-increment, so this is almost always an append
+        self._ids.insert(pos, recipe_id)
+        self._names.insert(pos, name)
+        self._image_urls.insert(pos, image_url)
+        self._prep_times.insert(pos, prep_time)
+        self._cook_times.insert(pos, cook_time)
+        self._difficulties.insert(pos, difficulty_code)
+        self._like_counts.insert(pos, like_count)
+
+    def remove(self, recipe_id: int) -> None:
+        """Drop one card (deleted recipes)"""
+        pos = self._slot(recipe_id)
+        if pos < 0:
+            return
+        for column in (self._ids, self._names, self._image_urls, self._prep_times,
+                       self._cook_times, self._difficulties, self._like_counts):
+            del column[pos]
+
+    def set_like_count(self, recipe_id: int, like_count: int) -> None:
+        """Write-through for like/unlike in this worker"""
+        pos = self._slot(recipe_id)
+        if pos >= 0:
+            self._like_counts[pos] = like_count
+
+    def card(self, recipe_id: int) -> Optional[dict]:
+        """Minimal recipe data for one recipe, or None if not loaded"""
+        pos = self._slot(recipe_id)
+        if pos < 0:
+            return None
+        return {
+            "id": recipe_id,
+            "name": self._names[pos],
+            "image_url": self._image_urls[pos],
+            "prep_time": self._prep_times[pos],
+            "cook_time": self._cook_times[pos],
+            "difficulty": self._difficulty_values[self._difficulties[pos]],
+            "like_count": self._like_counts[pos],
+        }
+
+    def cards(self, db: Session, recipe_ids: Iterable[int]) -> list[dict]:
+        """
+        Cards for recipe_ids, in the given order.
+
+        Ids missing from the catalog (recipes created since the last
+        refresh) are fetched in one query and added.
+        """
+        recipe_ids = list(recipe_ids)
+        missing = [recipe_id for recipe_id in recipe_ids if self._slot(recipe_id) < 0]
+        if missing:
+            self._load(db, select(*CARD_COLUMNS).where(Recipe.id.in_(missing)))
+
+        result = []
+        for recipe_id in recipe_ids:
+            card = self.card(recipe_id)
+            if card is not None:
+                result.append(card)
+        return result
+
+    def _load(self, db: Session, statement) -> int:
+        count = 0
+        for row in db.execute(statement.execution_options(yield_per=LOAD_BATCH_SIZE)):
+            self.upsert(*row[:len(CARD_FIELDS)])
+            count += 1
+        return count
+
+    def refresh(self, db: Session) -> int:
+        """
+        Load recipes changed since the watermark (everything on first call
+        and on full reloads). Returns the number of rows read.
+        """
+        count = self.watermark.refresh(
+            db,
+            select(*CARD_COLUMNS, Recipe.updated_at),
+            lambda row: self.upsert(*row[:len(CARD_FIELDS)]),
+            lambda: self._ids,
+            self.remove,
+        )
+        self.last_refresh = time.monotonic()
+        return count
+
+    def refresh_if_stale(self, db: Session) -> None:
+        """Refresh when the last refresh is older than refresh_interval"""
+        if self.last_refresh is None or time.monotonic() - self.last_refresh >= self.refresh_interval:
+            count = self.refresh(db)
+            if count:
+                logger.debug("Recipe catalog refreshed %d rows (%d cards)", count, len(self))
+
+
+# Process-wide catalog used by the recipe list endpoints
+recipe_catalog = RecipeCatalog()
@@ -0,0 +1,98 @@
+"""
+Shared rotating guest feed pool
+Guest feed requests sample pre-serialized recipe cards from memory instead
+of running ORDER BY RAND() per request
+"""
+
+import asyncio
+import json
+import random
+import time
+from typing import Callable, ContextManager, Optional
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.config.config import ConfigDefault, get_logger
+from app.services.catalog import CARD_FIELDS, CARD_COLUMNS
+
+logger = get_logger(__name__)
+
+
+class GuestFeedPool:
+    """
+    A periodically reshuffled set of recipe cards, each stored as JSON bytes.
+
+    Guest feeds are not personalized, so every guest can draw from the same
+    pool: a request picks `limit` distinct cards at random and joins their
+    pre-encoded JSON. No query and no per-card serialization on the request path.
+
+    The pool is replaced wholesale (one attribute assignment), so the
+    background refresher can rebuild it in a worker thread safely.
+    """
+
+    size = ConfigDefault("GUEST_FEED_POOL_SIZE")
+    refresh_interval = ConfigDefault("GUEST_FEED_REFRESH_SECONDS")
+
+    def __init__(self, size: Optional[int] = None, refresh_interval: Optional[float] = None):
+        self.size = size
+        self.refresh_interval = refresh_interval
+        self._rng = random.Random()
+        self.clear()
+
+    def clear(self) -> None:
+        self._payloads: list[bytes] = []
+        self.last_refresh: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def refresh(self, db: Session) -> int:
+        """Draw a new random pool of cards from the database"""
+        rows = db.execute(
+            select(*CARD_COLUMNS).order_by(func.random()).limit(self.size)
+        ).all()
+        payloads = [
+            json.dumps(dict(zip(CARD_FIELDS, row)), separators=(",", ":")).encode("utf-8")
+            for row in rows
+        ]
+        self._payloads = payloads
+        self.last_refresh = time.monotonic()
+        return len(payloads)
+
+    def ensure_loaded(self, db: Session) -> None:
+        """
+        Refresh on the request path only when the pool cannot serve:
+        it is empty, or the background refresher has fallen far behind.
+        """
+        stale = (
+            self.last_refresh is None
+            or time.monotonic() - self.last_refresh > 2 * self.refresh_interval
+        )
+        if not self._payloads or stale:
+            self.refresh(db)
+
+    def sample_json(self, limit: int) -> bytes:
+        """JSON array of up to `limit` distinct random cards"""
+        payloads = self._payloads
+        picked = self._rng.sample(payloads, min(limit, len(payloads)))
+        return b"[" + b",".join(picked) + b"]"
+
+    async def run_refresher(self, session_factory: Callable[[], ContextManager[Session]]) -> None:
+        """Background task: reshuffle the pool every refresh_interval seconds"""
+
+        def refresh_in_thread():
+            with session_factory() as db:
+                return self.refresh(db)
+
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                count = await asyncio.to_thread(refresh_in_thread)
+                logger.debug("Guest feed pool reshuffled (%d cards)", count)
+            except Exception as e:
+                logger.warning("Guest feed pool refresh failed: %s", e)
+
+
+# Process-wide pool used by GET /recipes/feed for guests
+guest_feed_pool = GuestFeedPool()
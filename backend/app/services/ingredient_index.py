@@ -0,0 +1,211 @@
+"""
+Inverted ingredient index for pantry-based recipe matching
+Maps each canonical ingredient to a sorted posting list of recipe ids, so
+"what can I cook" queries touch only the postings of the user's pantry
+"""
+
+import json
+import time
+from array import array
+from bisect import bisect_left
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config.config import ConfigDefault, get_logger
+from app.models.models import Recipe
+from app.services.catalog import RecipeWatermark
+from app.services.ingredients import canonical_ingredient, ingredient_canonicalizer
+
+logger = get_logger(__name__)
+
+
+def parse_ingredients(raw: Optional[str]) -> list[str]:
+    """Distinct canonical ingredients of a recipe's JSON ingredient list"""
+    try:
+        items = json.loads(raw) if raw else []
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(items, list):
+        return []
+    seen = {}
+    for item in items:
+        if isinstance(item, str):
+            for term in ingredient_canonicalizer.terms(item):
+                seen.setdefault(term, None)
+    return list(seen)
+
+
+class IngredientIndex:
+    """
+    Ingredient -> recipe-id postings plus a small forward index.
+
+    Postings are typed arrays kept sorted by recipe id. A query walks the
+    postings of the pantry's ingredients once, counting hits per recipe,
+    and compares each count against the recipe's ingredient total: cost
+    grows with the pantry's postings, not with the catalog.
+
+    Refreshed incrementally from recipes.updated_at like RecipeCatalog;
+    rows re-read with unchanged ingredients are not parsed again.
+    """
+
+    refresh_interval = ConfigDefault("CATALOG_REFRESH_SECONDS")
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = refresh_interval
+        self.clear()
+
+    def clear(self) -> None:
+        self._term_ids: dict[str, int] = {}
+        self._terms: list[str] = []
+        self._postings: list[array] = []
+        # recipe id -> term ids of its distinct ingredients
+        self._recipe_terms: dict[int, array] = {}
+        # recipe id -> the same set as a bitset (bit i = term id i)
+        self._recipe_masks: dict[int, int] = {}
+        # recipe id -> hash of its raw ingredients column, for every recipe read
+        self._sources: dict[int, int] = {}
+        self.watermark = RecipeWatermark()
+        self.last_refresh = None
+
+    def __len__(self) -> int:
+        return len(self._recipe_terms)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = len(self._terms)
+            self._term_ids[term] = term_id
+            self._terms.append(term)
+            self._postings.append(array("q"))
+        return term_id
+
+    def remove(self, recipe_id: int) -> None:
+        term_ids = self._recipe_terms.pop(recipe_id, None)
+        if term_ids is None:
+            return
+        del self._recipe_masks[recipe_id]
+        for term_id in term_ids:
+            postings = self._postings[term_id]
+            pos = bisect_left(postings, recipe_id)
+            if pos < len(postings) and postings[pos] == recipe_id:
+                del postings[pos]
+
+    def add(self, recipe_id: int, ingredients: Iterable[str]) -> None:
+        """Index (or re-index) one recipe's canonical ingredients"""
+        self.remove(recipe_id)
+        term_ids = array("i", sorted({self._term_id(term) for term in ingredients}))
+        if not term_ids:
+            return
+        self._recipe_terms[recipe_id] = term_ids
+        mask = 0
+        for term_id in term_ids:
+            mask |= 1 << term_id
+        self._recipe_masks[recipe_id] = mask
+        for term_id in term_ids:
+            postings = self._postings[term_id]
+            # Ids are auto-increment, so this is almost always an append
+            if not postings or postings[-1] < recipe_id:
+                postings.append(recipe_id)
+            else:
+                postings.insert(bisect_left(postings, recipe_id), recipe_id)
+
+    def mask(self, recipe_id: int) -> Optional[int]:
+        """Ingredient bitset of an indexed recipe"""
+        return self._recipe_masks.get(recipe_id)
+
+    def terms_mask(self, names: Iterable[str]) -> int:
+        """Bitset of the known canonical ingredients among names"""
+        mask = 0
+        for term_id in self._pantry_term_ids(names):
+            mask |= 1 << term_id
+        return mask
+
+    def mask_terms(self, mask: int) -> list[str]:
+        """Canonical ingredient names of a bitset"""
+        names = []
+        while mask:
+            low_bit = mask & -mask
+            names.append(self._terms[low_bit.bit_length() - 1])
+            mask ^= low_bit
+        return names
+
+    def _pantry_term_ids(self, pantry: Iterable[str]) -> set[int]:
+        return {
+            self._term_ids[term]
+            for term in map(canonical_ingredient, pantry)
+            if term in self._term_ids
+        }
+
+    def _count_hits(self, pantry_ids: set[int]) -> dict[int, int]:
+        hits: dict[int, int] = {}
+        for term_id in pantry_ids:
+            for recipe_id in self._postings[term_id]:
+                hits[recipe_id] = hits.get(recipe_id, 0) + 1
+        return hits
+
+    def hit_counts(self, pantry: Iterable[str]) -> dict[int, int]:
+        """Recipe id -> number of its ingredients found in the pantry (hits only)"""
+        return self._count_hits(self._pantry_term_ids(pantry))
+
+    def match(self, pantry: Iterable[str], max_missing: int = 0) -> list[tuple[int, list[str]]]:
+        """
+        Recipes sharing at least one pantry ingredient and missing at most
+        max_missing, as (recipe_id, missing ingredients), fewest missing first.
+        """
+        pantry_ids = self._pantry_term_ids(pantry)
+        hits = self._count_hits(pantry_ids)
+
+        ranked = []
+        for recipe_id, count in hits.items():
+            missing = len(self._recipe_terms[recipe_id]) - count
+            if missing <= max_missing:
+                ranked.append((missing, -recipe_id))
+        ranked.sort()
+
+        results = []
+        for missing, negative_id in ranked:
+            recipe_id = -negative_id
+            missing_terms = []
+            if missing:
+                missing_terms = [
+                    self._terms[term_id]
+                    for term_id in self._recipe_terms[recipe_id]
+                    if term_id not in pantry_ids
+                ]
+            results.append((recipe_id, missing_terms))
+        return results
+
+    def _apply(self, row) -> None:
+        recipe_id, ingredients, _ = row
+        source = hash(ingredients)
+        if self._sources.get(recipe_id) != source:
+            self.add(recipe_id, parse_ingredients(ingredients))
+            self._sources[recipe_id] = source
+
+    def _evict(self, recipe_id: int) -> None:
+        self.remove(recipe_id)
+        del self._sources[recipe_id]
+
+    def refresh(self, db: Session) -> int:
+        """Index recipes changed since the watermark (everything on first call and on full reloads)"""
+        count = self.watermark.refresh(
+            db,
+            select(Recipe.id, Recipe.ingredients, Recipe.updated_at),
+            self._apply,
+            lambda: self._sources,
+            self._evict,
+        )
+        self.last_refresh = time.monotonic()
+        return count
+
+    def refresh_if_stale(self, db: Session) -> None:
+        if self.last_refresh is None or time.monotonic() - self.last_refresh >= self.refresh_interval:
+            count = self.refresh(db)
+            if count:
+                logger.debug("Ingredient index refreshed %d recipes (%d terms)", count, len(self._terms))
+
+
+# Process-wide index used by the cook-now endpoint
+ingredient_index = IngredientIndex()
@@ -0,0 +1,320 @@
+"""
+Ingredient canonicalization for DADLY
+Maps pantry entries and free-text recipe ingredient lines to canonical
+ingredient names using a synonym dictionary compiled into an
+Aho-Corasick automaton
+"""
+
+import re
+import threading
+from collections import deque
+from typing import Optional
+
+from app.config.config import config_lru_cache
+from app.services.quantities import QUANTITY_PATTERN, UNIT_ALIASES
+
+# Canonical name -> synonyms and common variants. Plurals are generated,
+# so only singular forms need to be listed. Products named after another
+# ingredient ("peanut butter", "coconut milk") get entries of their own so
+# the longer match keeps them apart from it.
+SYNONYMS: dict[str, tuple[str, ...]] = {
+    "tomato": ("cherry tomato", "roma tomato", "plum tomato", "grape tomato", "vine tomato"),
+    "onion": ("yellow onion", "white onion", "brown onion"),
+    "red onion": ("purple onion",),
+    "green onion": ("scallion", "spring onion"),
+    "garlic": ("garlic clove", "clove of garlic", "clove garlic"),
+    "garlic powder": ("granulated garlic",),
+    "onion powder": (),
+    "salt": ("sea salt", "kosher salt", "table salt"),
+    "pepper": ("black pepper", "ground black pepper", "ground pepper", "peppercorn"),
+    "bell pepper": ("red bell pepper", "green bell pepper", "yellow bell pepper", "capsicum", "sweet pepper"),
+    "chili": ("chile", "chilli", "chili pepper", "red chili"),
+    "chili powder": ("chilli powder",),
+    "olive oil": ("extra virgin olive oil", "extra-virgin olive oil", "virgin olive oil"),
+    "vegetable oil": ("canola oil", "sunflower oil", "neutral oil"),
+    "butter": ("unsalted butter", "salted butter"),
+    "peanut butter": ("smooth peanut butter", "crunchy peanut butter"),
+    "almond butter": (),
+    "flour": ("all-purpose flour", "all purpose flour", "plain flour", "wheat flour"),
+    "sugar": ("granulated sugar", "white sugar", "caster sugar"),
+    "brown sugar": ("light brown sugar", "dark brown sugar"),
+    "egg": ("large egg", "whole egg"),
+    "milk": ("whole milk", "skim milk"),
+    "almond milk": (),
+    "coconut milk": (),
+    "oat milk": (),
+    "soy milk": ("soya milk",),
+    "cream": ("heavy cream", "whipping cream", "double cream", "single cream"),
+    "sour cream": (),
+    "cream cheese": (),
+    "yogurt": ("yoghurt", "greek yogurt", "plain yogurt"),
+    "cheese": (),
+    "cheddar": ("cheddar cheese",),
+    "parmesan": ("parmesan cheese", "parmigiano reggiano", "parmigiano-reggiano"),
+    "mozzarella": ("mozzarella cheese",),
+    "feta": ("feta cheese",),
+    "rice": ("white rice", "long grain rice", "basmati rice", "jasmine rice"),
+    "pasta": ("spaghetti", "penne", "fusilli", "macaroni", "linguine", "tagliatelle"),
+    "bread": ("white bread", "sourdough bread"),
+    "chicken": ("chicken breast", "chicken thigh", "whole chicken", "chicken drumstick"),
+    "beef": ("ground beef", "minced beef", "beef mince", "stewing beef"),
+    "pork": ("pork shoulder", "pork loin", "ground pork"),
+    "bacon": (),
+    "fish": ("white fish",),
+    "salmon": ("salmon fillet",),
+    "shrimp": ("prawn",),
+    "carrot": (),
+    "potato": ("russet potato", "yukon gold potato", "baby potato"),
+    "sweet potato": ("yam",),
+    "mushroom": ("button mushroom", "cremini mushroom", "champignon"),
+    "spinach": ("baby spinach",),
+    "lettuce": ("romaine", "iceberg lettuce"),
+    "cabbage": (),
+    "broccoli": (),
+    "cauliflower": (),
+    "zucchini": ("courgette",),
+    "eggplant": ("aubergine",),
+    "cucumber": (),
+    "celery": ("celery stalk",),
+    "corn": ("sweetcorn", "sweet corn", "maize"),
+    "pea": ("green pea", "garden pea"),
+    "bean": ("kidney bean", "black bean", "white bean", "cannellini bean"),
+    "green bean": ("string bean",),
+    "chickpea": ("garbanzo bean", "garbanzo"),
+    "lentil": ("red lentil", "green lentil"),
+    "lemon": ("lemon juice",),
+    "lime": ("lime juice",),
+    "apple": (),
+    "banana": (),
+    "honey": (),
+    "ginger": ("fresh ginger", "ginger root"),
+    "cumin": ("ground cumin", "cumin seed"),
+    "paprika": ("smoked paprika", "sweet paprika"),
+    "cinnamon": ("ground cinnamon", "cinnamon stick"),
+    "basil": ("fresh basil", "basil leaf"),
+    "parsley": ("fresh parsley", "flat-leaf parsley"),
+    "cilantro": ("coriander leaf", "fresh coriander"),
+    "oregano": ("dried oregano",),
+    "thyme": ("fresh thyme", "dried thyme"),
+    "bay leaf": (),
+    "soy sauce": ("soya sauce", "light soy sauce", "dark soy sauce"),
+    "vinegar": ("white vinegar",),
+    "rice vinegar": ("rice wine vinegar",),
+    "stock": ("broth", "chicken stock", "vegetable stock", "beef stock", "chicken broth", "vegetable broth"),
+    "tomato paste": ("tomato puree",),
+    "baking powder": (),
+    "baking soda": ("bicarbonate of soda",),
+    "vanilla": ("vanilla extract", "vanilla essence"),
+    "chocolate": ("dark chocolate", "milk chocolate", "chocolate chip"),
+    "oat": ("rolled oat", "oatmeal"),
+    "nut": ("walnut", "almond", "pecan", "hazelnut", "cashew"),
+    "peanut": ("groundnut",),
+    "coconut": ("desiccated coconut", "shredded coconut"),
+}
+
+# Preparation, size and freshness words dropped from ingredients that are
+# not in the dictionary ("2 cups cooked quinoa" -> "quinoa")
+DESCRIPTOR_WORDS = frozenset({
+    "a", "about", "of", "to", "taste", "optional", "fresh", "freshly", "dried", "frozen",
+    "cooked", "uncooked", "raw", "ripe", "large", "medium", "small", "whole", "ground",
+    "chopped", "diced", "minced", "sliced", "grated", "shredded", "crushed", "peeled",
+    "cubed", "halved", "trimmed", "rinsed", "drained", "melted", "softened", "beaten",
+    "finely", "roughly", "coarsely", "thinly", "packed",
+})
+
+NON_WORD = re.compile(r"[\W_]+")
+SIBILANT_ENDINGS = ("s", "x", "z", "ch", "sh")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace to single spaces"""
+    return " ".join(NON_WORD.sub(" ", text.lower()).split())
+
+
+def plural_forms(phrase: str) -> set[str]:
+    """Common English plurals of a phrase's last word"""
+    head, _, last = phrase.rpartition(" ")
+    prefix = f"{head} " if head else ""
+    if last.endswith("leaf"):
+        forms = {last[:-1] + "ves"}
+    elif last.endswith("y") and len(last) > 1 and last[-2] not in "aeiou":
+        forms = {last[:-1] + "ies"}
+    elif last.endswith(SIBILANT_ENDINGS):
+        forms = {last + "es"}
+    elif last.endswith("o"):
+        forms = {last + "es", last + "s"}
+    else:
+        forms = {last + "s"}
+    return {prefix + form for form in forms}
+
+
+def singular_forms(phrase: str) -> set[str]:
+    """
+    Possible singulars of a phrase's last word ("peanuts" -> {"peanut"}).
+
+    English plurals are ambiguous ("tomatoes" vs "cheeses"), so every
+    plausible reading is returned; meant for matching, not for display.
+    """
+    head, _, last = phrase.rpartition(" ")
+    prefix = f"{head} " if head else ""
+    if len(last) < 3 or not last.endswith("s") or last.endswith(("ss", "us", "is")):
+        return set()
+    if last.endswith("leaves"):
+        forms = {last[:-3] + "f"}
+    elif last.endswith("ies"):
+        forms = {last[:-3] + "y"}
+    elif last.endswith("es"):
+        forms = {last[:-2], last[:-1]}
+    else:
+        forms = {last[:-1]}
+    return {prefix + form for form in forms}
+
+
+def strip_amount(line: str) -> str:
+    """Line without its leading amount and unit ("2 cups quinoa" -> "quinoa")"""
+    match = QUANTITY_PATTERN.match(line)
+    if match is None:
+        return line
+    unit = match.group("unit")
+    if unit and unit.lower() not in UNIT_ALIASES:
+        # Not a unit but the ingredient itself ("3 eggs")
+        return line[match.start("unit"):]
+    return line[match.end():]
+
+
+def core_name(line: str) -> str:
+    """
+    Ingredient words of a line the dictionary does not know.
+
+    Drops the amount, unit, anything after a comma (usually preparation)
+    and descriptor words, so "2 cups cooked quinoa, rinsed" and "Quinoa"
+    both give "quinoa". Falls back to the normalized line if nothing is left.
+    """
+    words = normalize_text(strip_amount(line).partition(",")[0]).split()
+    while words and words[0] in UNIT_ALIASES:
+        words.pop(0)
+    return " ".join(word for word in words if word not in DESCRIPTOR_WORDS) or normalize_text(line)
+
+
+class IngredientCanonicalizer:
+    """
+    Multi-pattern matcher over every synonym and plural form.
+
+    All patterns are compiled into one Aho-Corasick automaton, so a string
+    is scanned once regardless of dictionary size. Only matches on word
+    boundaries count ("egg" does not match "eggplant"), and overlapping
+    matches resolve leftmost-longest ("extra virgin olive oil" is one
+    match, not "oil").
+    """
+
+    def __init__(self, synonyms: dict[str, tuple[str, ...]] = SYNONYMS):
+        self.synonyms = synonyms
+        self._automaton = None
+        self._lookup: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def patterns(self) -> dict[str, str]:
+        """Normalized pattern -> canonical name (canonical names win conflicts)"""
+        patterns: dict[str, str] = {}
+        for canonical in self.synonyms:
+            for form in {canonical, *plural_forms(canonical)}:
+                patterns.setdefault(normalize_text(form), canonical)
+        for canonical, variants in self.synonyms.items():
+            for variant in variants:
+                variant = normalize_text(variant)
+                for form in {variant, *plural_forms(variant)}:
+                    patterns.setdefault(form, canonical)
+        return patterns
+
+    def compile(self) -> None:
+        """Build the automaton (idempotent; done at startup or on first use)"""
+        if self._automaton is not None:
+            return
+        with self._lock:
+            if self._automaton is not None:
+                return
+
+            patterns = self.patterns()
+            goto: list[dict[str, int]] = [{}]
+            fail = [0]
+            output: list[tuple[tuple[int, str], ...]] = [()]
+            for pattern, canonical in patterns.items():
+                node = 0
+                for char in pattern:
+                    child = goto[node].get(char)
+                    if child is None:
+                        child = len(goto)
+                        goto[node][char] = child
+                        goto.append({})
+                        fail.append(0)
+                        output.append(())
+                    node = child
+                output[node] += ((len(pattern), canonical),)
+
+            # Breadth-first failure links; outputs inherit their fallback's outputs
+            queue = deque(goto[0].values())
+            while queue:
+                node = queue.popleft()
+                for char, child in goto[node].items():
+                    queue.append(child)
+                    fallback = fail[node]
+                    while fallback and char not in goto[fallback]:
+                        fallback = fail[fallback]
+                    fail[child] = goto[fallback].get(char, 0)
+                    output[child] += output[fail[child]]
+
+            self._lookup = patterns
+            self._automaton = (goto, fail, output)
+
+    def find(self, text: str) -> list[tuple[int, int, str]]:
+        """Non-overlapping (start, end, canonical) matches in normalized text"""
+        self.compile()
+        goto, fail, output = self._automaton
+        candidates = []
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, canonical in output[node]:
+                start = index - length + 1
+                end = index + 1
+                if (start == 0 or text[start - 1] == " ") and (end == len(text) or text[end] == " "):
+                    candidates.append((start, -length, canonical))
+
+        matches = []
+        last_end = 0
+        for start, negative_length, canonical in sorted(candidates):
+            if start >= last_end:
+                last_end = start - negative_length
+                matches.append((start, last_end, canonical))
+        return matches
+
+    def canonicalize(self, name: str) -> str:
+        """
+        Canonical name for a single entry ("2 Cherry Tomatoes" -> "tomato").
+
+        Only a whole-phrase match counts, with or without its amount and
+        descriptors; a dictionary word inside a longer name is not enough
+        ("salt and pepper" and "pumpkin pie spice" stay as they are). Names
+        with no match are reduced to their core words (see core_name).
+        """
+        self.compile()
+        core = core_name(name)
+        return self._lookup.get(normalize_text(name)) or self._lookup.get(core) or core
+
+    def terms(self, line: str) -> list[str]:
+        """All distinct canonical ingredients mentioned in a recipe line"""
+        text = normalize_text(line)
+        found = list(dict.fromkeys(canonical for _, _, canonical in self.find(text)))
+        return found or ([core_name(line)] if text else [])
+
+
+# Process-wide canonicalizer (compiled at startup)
+ingredient_canonicalizer = IngredientCanonicalizer()
+
+
+@config_lru_cache("INGREDIENT_CACHE_SIZE")
+def canonical_ingredient(name: str) -> str:
+    """Cached canonicalization for repeated pantry inputs"""
+    return ingredient_canonicalizer.canonicalize(name)
@@ -0,0 +1,215 @@
+"""
+Weekly meal-plan solver for DADLY
+Picks recipes that use the pantry and share ingredients with each other,
+within dietary restrictions and a cooking-time budget
+"""
+
+import re
+import time
+from dataclasses import dataclass
+from itertools import accumulate
+from typing import Iterable, Optional
+
+from app.services.ingredients import canonical_ingredient, normalize_text, plural_forms, singular_forms
+
+MEAT = {"chicken", "beef", "pork", "bacon", "fish", "salmon", "shrimp"}
+DAIRY = {"milk", "butter", "cream", "sour cream", "cream cheese", "yogurt",
+         "cheese", "cheddar", "parmesan", "mozzarella", "feta"}
+GLUTEN = {"flour", "pasta", "bread", "soy sauce"}
+HIGH_CARB = {"sugar", "brown sugar", "rice", "pasta", "bread", "flour", "potato", "sweet potato",
+             "corn", "banana", "honey", "oat", "bean", "lentil", "chickpea"}
+
+# Canonical ingredients each dietary_type rules out
+DIET_EXCLUSIONS: dict[str, set[str]] = {
+    "none": set(),
+    "vegetarian": MEAT,
+    "vegan": MEAT | DAIRY | {"egg", "honey"},
+    "gluten_free": GLUTEN,
+    "keto": HIGH_CARB,
+}
+
+# Allergy words that stand for a group of ingredients
+ALLERGEN_GROUPS: dict[str, set[str]] = {
+    "dairy": DAIRY,
+    "lactose": DAIRY,
+    "gluten": GLUTEN,
+    "wheat": GLUTEN,
+    "nuts": {"nut"},
+    "tree nuts": {"nut"},
+    "shellfish": {"shrimp"},
+    "seafood": {"fish", "salmon", "shrimp"},
+    "soy": {"soy sauce"},
+}
+
+ALLERGY_SEPARATORS = re.compile(r"[,;/\n]|\band\b")
+
+# Each ingredient that has to be bought costs this much against a pantry hit
+BUY_PENALTY = 0.5
+DEADLINE_CHECK_INTERVAL = 256
+
+
+def allergy_names(allergies: Optional[str]) -> list[str]:
+    """Normalized entries of a free-text allergy list ("Peanuts, shellfish")"""
+    names = (normalize_text(allergy) for allergy in ALLERGY_SEPARATORS.split(allergies or ""))
+    return [name for name in names if name]
+
+
+def allergy_forms(allergy: str) -> set[str]:
+    """An allergy word with its singular and plural forms"""
+    # A word that already looks plural is paired with its singulars only
+    return {allergy, *(singular_forms(allergy) or plural_forms(allergy))}
+
+
+def excluded_ingredients(dietary_type: Optional[str], allergies: Optional[str]) -> set[str]:
+    """Canonical ingredients a user must not be served"""
+    excluded = set(DIET_EXCLUSIONS.get(dietary_type or "none", set()))
+    for allergy in allergy_names(allergies):
+        group = ALLERGEN_GROUPS.get(allergy)
+        if group:
+            excluded |= group
+        else:
+            excluded |= {canonical_ingredient(form) for form in allergy_forms(allergy)}
+    return excluded
+
+
+def allergen_phrases(allergies: Optional[str]) -> set[str]:
+    """
+    Allergy words to look for in a recipe's raw ingredient text.
+
+    Canonical terms name the main ingredient of a line, so "peanut butter"
+    or an unknown "peanut sauce" never yields "peanut"; for allergies the
+    word appearing anywhere in the text is enough to rule a recipe out.
+    """
+    phrases = set()
+    for allergy in allergy_names(allergies):
+        phrases |= allergy_forms(allergy)
+    return phrases
+
+
+def mentions_any(text: Optional[str], phrases: set[str]) -> bool:
+    """Whether normalized text contains any of the phrases as whole words"""
+    padded = f" {normalize_text(text or '')} "
+    return any(f" {phrase} " in padded for phrase in phrases)
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+@dataclass
+class MealCandidate:
+    recipe_id: int
+    mask: int  # ingredient bitset
+    total_time: int
+    pantry_hits: int = 0
+
+
+@dataclass
+class MealPlan:
+    recipe_ids: list[int]
+    score: float
+    complete: bool  # False when the search stopped at the deadline
+
+
+class MealPlanSolver:
+    """
+    Branch-and-bound over ingredient bitsets.
+
+    A plan scores one point per pantry ingredient each meal uses, minus
+    BUY_PENALTY per distinct ingredient to buy, so meals sharing what has
+    to be bought score better. Plans with more meals always win.
+
+    The greedy plan seeds the incumbent; the exact search then explores
+    candidates in order of pantry hits, pruning with the optimistic bound
+    "remaining picks use only pantry ingredients", and returns the best
+    plan found when the deadline passes.
+    """
+
+    def __init__(self, candidates: Iterable[MealCandidate], pantry_mask: int,
+                 meals: int, max_total_time: Optional[int] = None):
+        self.pantry_mask = pantry_mask
+        self.meals = meals
+        self.max_total_time = max_total_time
+        self.candidates = list(candidates)
+        for candidate in self.candidates:
+            candidate.pantry_hits = (candidate.mask & pantry_mask).bit_count()
+        self.candidates.sort(key=lambda c: (-c.pantry_hits, c.recipe_id))
+        self._prefix = [0, *accumulate(c.pantry_hits for c in self.candidates)]
+
+    def gain(self, candidate: MealCandidate, bought: int) -> float:
+        new_purchases = (candidate.mask & ~self.pantry_mask & ~bought).bit_count()
+        return candidate.pantry_hits - BUY_PENALTY * new_purchases
+
+    def fits(self, candidate: MealCandidate, used_time: int) -> bool:
+        return self.max_total_time is None or used_time + candidate.total_time <= self.max_total_time
+
+    def greedy(self) -> tuple[list[int], float]:
+        chosen, bought, used_time, score = [], 0, 0, 0.0
+        remaining = list(range(len(self.candidates)))
+        while len(chosen) < self.meals:
+            best_index, best_gain = None, None
+            for index in remaining:
+                candidate = self.candidates[index]
+                if not self.fits(candidate, used_time):
+                    continue
+                gain = self.gain(candidate, bought)
+                if best_gain is None or gain > best_gain:
+                    best_index, best_gain = index, gain
+            if best_index is None:
+                break
+            candidate = self.candidates[best_index]
+            remaining.remove(best_index)
+            chosen.append(best_index)
+            bought |= candidate.mask & ~self.pantry_mask
+            used_time += candidate.total_time
+            score += best_gain
+        return sorted(chosen), score
+
+    def _bound(self, start: int, picked: int, score: float) -> tuple[int, float]:
+        """Best (meal count, score) reachable from candidates[start:]"""
+        picks = min(self.meals - picked, len(self.candidates) - start)
+        return picked + picks, score + self._prefix[start + picks] - self._prefix[start]
+
+    def solve(self, time_budget: float) -> MealPlan:
+        deadline = time.perf_counter() + time_budget
+        chosen, score = self.greedy()
+        best = [(len(chosen), score), chosen]
+        nodes = 0
+
+        def search(start: int, picked: list[int], bought: int, used_time: int, score: float) -> None:
+            nonlocal nodes
+            nodes += 1
+            if nodes % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+                raise _SearchTimeout
+            if (len(picked), score) > best[0]:
+                best[0], best[1] = (len(picked), score), list(picked)
+            if len(picked) == self.meals:
+                return
+            for index in range(start, len(self.candidates)):
+                # Candidates are sorted by pantry hits, so later ones bound lower
+                if self._bound(index, len(picked), score) <= best[0]:
+                    return
+                candidate = self.candidates[index]
+                if not self.fits(candidate, used_time):
+                    continue
+                picked.append(index)
+                search(
+                    index + 1, picked,
+                    bought | (candidate.mask & ~self.pantry_mask),
+                    used_time + candidate.total_time,
+                    score + self.gain(candidate, bought),
+                )
+                picked.pop()
+
+        complete = True
+        try:
+            search(0, [], 0, 0, 0.0)
+        except _SearchTimeout:
+            complete = False
+
+        (_, best_score), best_indexes = best
+        return MealPlan(
+            recipe_ids=[self.candidates[index].recipe_id for index in best_indexes],
+            score=best_score,
+            complete=complete,
+        )
@@ -0,0 +1,118 @@
+"""
+Ingredient quantity parsing for DADLY
+Extracts the leading amount and unit from free-text quantities
+such as "2 cups", "1 1/2 tbsp", "½ tsp" or "500g", and converts
+them to canonical units (grams, millilitres or counts)
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+from app.config.config import config_lru_cache
+
+VULGAR_FRACTIONS = {
+    "½": 1 / 2, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 1 / 4, "¾": 3 / 4,
+    "⅕": 1 / 5, "⅛": 1 / 8, "⅜": 3 / 8, "⅝": 5 / 8, "⅞": 7 / 8,
+}
+_VULGAR = "".join(VULGAR_FRACTIONS)
+
+# Leading amount: mixed number, fraction, vulgar fraction or decimal (comma or dot),
+# then an optional unit word
+QUANTITY_PATTERN = re.compile(
+    rf"^\s*(?P<value>\d+\s+\d+\s*/\s*\d+|\d+\s*/\s*\d+|\d*\s*[{_VULGAR}]|\d+(?:[.,]\d+)?)"
+    r"\s*(?P<unit>[^\W\d_]+)?\.?",
+)
+
+FRACTION_PATTERN = re.compile(
+    r"^(?:(?P<whole>\d+)\s+)?(?P<numerator>\d+)\s*/\s*(?P<denominator>\d+)$"
+    rf"|^(?P<vulgar_whole>\d+)?\s*(?P<vulgar>[{_VULGAR}])$"
+)
+
+UNIT_ALIASES = {
+    "cup": "cup", "cups": "cup", "c": "cup",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsp": "tbsp", "tbs": "tbsp",
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsp": "tsp",
+    "g": "g", "gram": "g", "grams": "g", "gr": "g",
+    "kg": "kg", "kilogram": "kg", "kilograms": "kg",
+    "ml": "ml", "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "l": "l", "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "oz": "oz", "ounce": "oz", "ounces": "oz",
+    "lb": "lb", "lbs": "lb", "pound": "lb", "pounds": "lb",
+    "pinch": "pinch", "pinches": "pinch",
+    "clove": "clove", "cloves": "clove",
+    "can": "can", "cans": "can",
+    "slice": "slice", "slices": "slice",
+}
+
+# Unit -> (canonical unit, factor). Mass converts to grams and volume to
+# millilitres; counted units (cloves, cans, ...) stay as they are.
+UNIT_CONVERSIONS: dict[Optional[str], tuple[Optional[str], float]] = {
+    "g": ("g", 1.0),
+    "kg": ("g", 1000.0),
+    "oz": ("g", 28.349523125),
+    "lb": ("g", 453.59237),
+    "ml": ("ml", 1.0),
+    "l": ("ml", 1000.0),
+    "cup": ("ml", 236.5882365),
+    "tbsp": ("ml", 14.78676478125),
+    "tsp": ("ml", 4.92892159375),
+}
+
+
+class Quantity(NamedTuple):
+    value: float
+    unit: Optional[str]  # None for plain counts ("3 eggs")
+
+
+def parse_number(text: str) -> float:
+    """Parse "2", "1.5", "1,5", "3/4", "1 1/2" or "1½" """
+    fraction = FRACTION_PATTERN.match(text)
+    if fraction is None:
+        return float(text.replace(",", "."))
+    if fraction.group("vulgar"):
+        return float(fraction.group("vulgar_whole") or 0) + VULGAR_FRACTIONS[fraction.group("vulgar")]
+    whole = float(fraction.group("whole") or 0)
+    return whole + float(fraction.group("numerator")) / float(fraction.group("denominator"))
+
+
+@config_lru_cache("QUANTITY_CACHE_SIZE")
+def parse_quantity(text: Optional[str]) -> Optional[Quantity]:
+    """
+    Leading quantity of a string, or None when it does not start with an amount.
+
+    Cached: pantry entries and recipe lines repeat across requests.
+    """
+    if not text:
+        return None
+    match = QUANTITY_PATTERN.match(text)
+    if match is None:
+        return None
+    try:
+        value = parse_number(match.group("value"))
+    except (ValueError, ZeroDivisionError):
+        return None
+    unit = match.group("unit")
+    # Words that are not units ("3 eggs") make this a plain count
+    return Quantity(value, UNIT_ALIASES.get(unit.lower()) if unit else None)
+
+
+def to_canonical(quantity: Quantity) -> Quantity:
+    """Same amount in the unit's canonical unit ("2 cup" -> "473.18 ml")"""
+    unit, factor = UNIT_CONVERSIONS.get(quantity.unit, (quantity.unit, 1.0))
+    return Quantity(quantity.value * factor, unit)
+
+
+def from_canonical(value: float, unit: Optional[str]) -> float:
+    """Convert a canonical amount back into unit"""
+    return value / UNIT_CONVERSIONS.get(unit, (unit, 1.0))[1]
+
+
+def normalize_quantity(text: Optional[str]) -> Optional[Quantity]:
+    """Parsed quantity in canonical units, as stored on pantry items"""
+    quantity = parse_quantity(text)
+    return to_canonical(quantity) if quantity is not None else None
+
+
+def format_quantity(value: float, unit: Optional[str]) -> str:
+    amount = f"{value:g}" if value == int(value) else f"{round(value, 2):g}"
+    return f"{amount} {unit}" if unit else amount
@@ -0,0 +1,88 @@
+"""
+Shopping-list aggregation for DADLY
+Merges the canonical ingredients of several recipes, minus the pantry,
+summing quantities whose units convert into each other
+"""
+
+import json
+from typing import Iterable, Optional
+
+from app.services.ingredients import canonical_ingredient, ingredient_canonicalizer
+from app.services.quantities import format_quantity, from_canonical, parse_quantity, to_canonical
+
+# Needed amounts at or below this (in canonical units) count as covered
+EPSILON = 1e-9
+
+
+def recipe_lines(raw_ingredients: str) -> list[str]:
+    try:
+        items = json.loads(raw_ingredients) if raw_ingredients else []
+    except (TypeError, ValueError):
+        return []
+    return [item for item in items if isinstance(item, str)] if isinstance(items, list) else []
+
+
+def build_shopping_list(recipes: Iterable[tuple[int, str]],
+                        pantry: Iterable[tuple[str, Optional[float], Optional[str]]]) -> dict:
+    """
+    Aggregate (recipe_id, ingredients JSON) pairs into a shopping list.
+
+    Each ingredient line is mapped to canonical ingredients; lines naming
+    exactly one ingredient also contribute their quantity, summed in
+    canonical units (cups and tablespoons merge; grams and cups do not)
+    and shown in the first unit seen.
+
+    pantry holds (ingredient_name, quantity_value, quantity_unit) rows.
+    A pantry item without an amount covers the ingredient entirely; one
+    with an amount is subtracted from what the recipes need in that unit,
+    and the ingredient stays on the list if anything is left to buy.
+    """
+    stock: dict[str, Optional[dict]] = {}
+    for name, value, unit in pantry:
+        term = canonical_ingredient(name)
+        if value is None:
+            stock[term] = None
+        elif stock.get(term, {}) is not None:
+            stock.setdefault(term, {})[unit] = value
+
+    needed: dict[str, dict] = {}
+    for recipe_id, raw_ingredients in recipes:
+        for line in recipe_lines(raw_ingredients):
+            terms = ingredient_canonicalizer.terms(line)
+            quantity = parse_quantity(line) if len(terms) == 1 else None
+            for term in terms:
+                item = needed.setdefault(term, {"recipe_ids": [], "amounts": {}, "display": {}})
+                if recipe_id not in item["recipe_ids"]:
+                    item["recipe_ids"].append(recipe_id)
+                if quantity is not None:
+                    value, unit = to_canonical(quantity)
+                    item["amounts"][unit] = item["amounts"].get(unit, 0) + value
+                    item["display"].setdefault(unit, quantity.unit)
+
+    items = []
+    in_pantry = []
+    for term, item in sorted(needed.items()):
+        if term in stock:
+            available = stock[term]
+            if available is None or not item["amounts"]:
+                in_pantry.append(term)
+                continue
+            remaining = {
+                unit: value - available.get(unit, 0)
+                for unit, value in item["amounts"].items()
+            }
+            remaining = {unit: value for unit, value in remaining.items() if value > EPSILON}
+            if not remaining:
+                in_pantry.append(term)
+                continue
+            item["amounts"] = remaining
+        items.append({
+            "ingredient": term,
+            "quantities": [
+                format_quantity(from_canonical(value, item["display"][unit]), item["display"][unit])
+                for unit, value in item["amounts"].items()
+            ],
+            "recipe_ids": item["recipe_ids"],
+        })
+
+    return {"items": items, "in_pantry": in_pantry}
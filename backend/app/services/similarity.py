@@ -0,0 +1,242 @@
+"""
+Similar-recipe index for DADLY
+MinHash signatures of canonical ingredient sets with locality-sensitive
+hashing buckets, persisted in recipe_signatures
+"""
+
+import hashlib
+import random
+import time
+from array import array
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.config.config import Config, ConfigDefault, get_logger
+from app.models.models import Recipe, RecipeSignature
+from app.services.catalog import LOAD_BATCH_SIZE, RecipeWatermark
+from app.services.ingredient_index import parse_ingredients
+
+logger = get_logger(__name__)
+
+# 16 bands of 4 rows: recipes with Jaccard similarity around 0.5 or more
+# share at least one bucket with high probability
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Part of ingredients_hash(): bump when canonicalization or hashing changes
+# so persisted signatures are recomputed
+SIGNATURE_VERSION = 2
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = 0xFFFFFFFF
+# Fixed seed: persisted signatures must stay comparable across processes
+_permutation_rng = random.Random(20251124)
+PERMUTATIONS = tuple(
+    (_permutation_rng.randrange(1, MERSENNE_PRIME), _permutation_rng.randrange(0, MERSENNE_PRIME))
+    for _ in range(NUM_PERM)
+)
+
+
+def term_hash(term: str) -> int:
+    """Stable 64-bit hash of an ingredient (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.blake2b(term.encode(), digest_size=8).digest(), "little")
+
+
+def ingredients_hash(ingredients: Optional[str]) -> str:
+    """Digest of a recipe's raw ingredients, used to tell whether its signature is current"""
+    payload = f"{SIGNATURE_VERSION}\0{ingredients or ''}".encode()
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def minhash(terms: Iterable[str]) -> Optional[array]:
+    """MinHash signature of an ingredient set, or None for an empty set"""
+    hashes = [term_hash(term) for term in set(terms)]
+    if not hashes:
+        return None
+    return array("I", (
+        min(((a * value + b) % MERSENNE_PRIME) & MAX_HASH for value in hashes)
+        for a, b in PERMUTATIONS
+    ))
+
+
+def estimate_similarity(left: array, right: array) -> float:
+    """Estimated Jaccard similarity: fraction of equal signature slots"""
+    return sum(1 for x, y in zip(left, right) if x == y) / NUM_PERM
+
+
+def band_keys(signature: array) -> list[int]:
+    return [hash((band, signature[band * ROWS:(band + 1) * ROWS].tobytes())) for band in range(BANDS)]
+
+
+class SimilarityIndex:
+    """
+    In-memory LSH index over persisted MinHash signatures.
+
+    A lookup only compares the recipe against others sharing at least one
+    band bucket, so cost depends on bucket sizes rather than the catalog.
+    The first refresh loads persisted signatures; later refreshes follow
+    the recipes.updated_at watermark like RecipeCatalog. Either way a
+    recipe is only re-hashed when its ingredients_hash() changed, since
+    overlap windows and full reloads re-read unchanged rows.
+    """
+
+    refresh_interval = ConfigDefault("CATALOG_REFRESH_SECONDS")
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = refresh_interval
+        self.clear()
+
+    def clear(self) -> None:
+        self._signatures: dict[int, array] = {}
+        self._hashes: dict[int, str] = {}
+        self._buckets: dict[int, list[int]] = {}
+        self.watermark = RecipeWatermark()
+        self.last_refresh = None
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, recipe_id: int) -> Optional[array]:
+        return self._signatures.get(recipe_id)
+
+    def remove(self, recipe_id: int) -> None:
+        self._hashes.pop(recipe_id, None)
+        signature = self._signatures.pop(recipe_id, None)
+        if signature is None:
+            return
+        for key in band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.remove(recipe_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def add(self, recipe_id: int, signature: Optional[array]) -> None:
+        self.remove(recipe_id)
+        if signature is None:
+            return
+        self._signatures[recipe_id] = signature
+        for key in band_keys(signature):
+            self._buckets.setdefault(key, []).append(recipe_id)
+
+    def query(self, signature: array, limit: int, exclude: Optional[int] = None,
+              threshold: float = 0.0) -> list[tuple[int, float]]:
+        """Most similar indexed recipes as (recipe_id, similarity), best first"""
+        candidates = set()
+        for key in band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        candidates.discard(exclude)
+
+        scored = []
+        for recipe_id in candidates:
+            similarity = estimate_similarity(signature, self._signatures[recipe_id])
+            if similarity >= threshold:
+                scored.append((similarity, recipe_id))
+        scored.sort(reverse=True)
+        return [(recipe_id, similarity) for similarity, recipe_id in scored[:limit]]
+
+    def near_duplicates(self, ingredients: Iterable[str],
+                        threshold: Optional[float] = None) -> list[tuple[int, float]]:
+        """Indexed recipes whose ingredient sets nearly equal the given canonical set"""
+        signature = minhash(ingredients)
+        if signature is None:
+            return []
+        threshold = Config.NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        return self.query(signature, limit=10, threshold=threshold)
+
+    def index_recipes(self, db: Session, recipes: Iterable[Recipe]) -> dict[int, list[tuple[int, float]]]:
+        """
+        Hook for recipe imports: index and persist newly flushed recipes.
+
+        Returns near-duplicates of each recipe among those indexed before it.
+        Rows are added to the caller's transaction; the caller commits.
+        """
+        duplicates = {}
+        rows = []
+        for recipe in recipes:
+            signature = minhash(parse_ingredients(recipe.ingredients))
+            if signature is None:
+                continue
+            threshold = Config.NEAR_DUPLICATE_THRESHOLD
+            found = self.query(signature, limit=10, exclude=recipe.id, threshold=threshold)
+            if found:
+                duplicates[recipe.id] = found
+                logger.warning("Recipe %s looks like a near-duplicate of %s", recipe.id, [rid for rid, _ in found])
+            digest = ingredients_hash(recipe.ingredients)
+            self.add(recipe.id, signature)
+            self._hashes[recipe.id] = digest
+            rows.append((recipe.id, signature, digest))
+        self._persist(db, rows)
+        return duplicates
+
+    def _persist(self, db: Session, rows: list[tuple[int, array, str]]) -> None:
+        for start in range(0, len(rows), LOAD_BATCH_SIZE):
+            batch = rows[start:start + LOAD_BATCH_SIZE]
+            db.execute(delete(RecipeSignature).where(RecipeSignature.recipe_id.in_([row[0] for row in batch])))
+            db.execute(insert(RecipeSignature), [
+                {"recipe_id": recipe_id, "signature": signature.tobytes(), "ingredients_hash": digest}
+                for recipe_id, signature, digest in batch
+            ])
+
+    def _compute(self, db: Session, persist: bool) -> int:
+        rows = []
+
+        def apply(row) -> None:
+            recipe_id, ingredients, _ = row
+            digest = ingredients_hash(ingredients)
+            if self._hashes.get(recipe_id) == digest:
+                return
+            signature = minhash(parse_ingredients(ingredients))
+            self.add(recipe_id, signature)
+            # Kept for recipes without ingredients too: _hashes holds every recipe read
+            self._hashes[recipe_id] = digest
+            if signature is not None:
+                rows.append((recipe_id, signature, digest))
+
+        self.watermark.refresh(
+            db,
+            select(Recipe.id, Recipe.ingredients, Recipe.updated_at),
+            apply,
+            lambda: self._hashes,
+            self.remove,
+        )
+        if persist and rows:
+            self._persist(db, rows)
+            db.commit()
+        return len(rows)
+
+    def _load_persisted(self, db: Session) -> None:
+        for recipe_id, signature, digest in db.execute(
+            select(RecipeSignature.recipe_id, RecipeSignature.signature, RecipeSignature.ingredients_hash)
+            .execution_options(yield_per=LOAD_BATCH_SIZE)
+        ):
+            if digest is not None:
+                self.add(recipe_id, array("I", signature))
+                self._hashes[recipe_id] = digest
+
+    def refresh(self, db: Session, persist: bool = False) -> int:
+        """
+        Bring the index up to date; returns the number of recipes hashed.
+
+        With persist=True new signatures are written to recipe_signatures so
+        the next start skips hashing them. Only one process should persist
+        (the server supervisor before forking, or a recipe import).
+        """
+        if self.last_refresh is None:
+            self._load_persisted(db)
+        count = self._compute(db, persist)
+        self.last_refresh = time.monotonic()
+        return count
+
+    def refresh_if_stale(self, db: Session) -> None:
+        if self.last_refresh is None or time.monotonic() - self.last_refresh >= self.refresh_interval:
+            count = self.refresh(db)
+            if count:
+                logger.debug("Similarity index hashed %d recipes (%d indexed)", count, len(self))
+
+
+# Process-wide index used by the similar-recipes endpoint
+similarity_index = SimilarityIndex()
@@ -0,0 +1,4 @@
+"""
+Load-test and benchmark suite for the DADLY hot endpoints
+Run with: python -m benchmarks --help
+"""
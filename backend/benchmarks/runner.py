@@ -0,0 +1,239 @@
+"""
+Concurrent load generator for the DADLY hot endpoints
+Drives a weighted request mix and reports latency percentiles and throughput
+"""
+
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import httpx
+
+from benchmarks.seed import INGREDIENTS, BENCH_PASSWORD, bench_email
+
+API_PREFIX = "/api/v1"
+
+# Relative weight of each scenario in the request mix
+DEFAULT_MIX = {
+    "feed": 35,
+    "feed_guest": 10,
+    "like": 15,
+    "liked": 25,
+    "pantry_bulk": 10,
+    "auth_token": 5,
+}
+
+
+@dataclass
+class RunConfig:
+    """Load shape for one benchmark run"""
+    concurrency: int = 32
+    duration: float = 30.0
+    warmup: float = 2.0
+    mix: dict = field(default_factory=lambda: dict(DEFAULT_MIX))
+    seed: int = 42
+
+
+@dataclass
+class VirtualUser:
+    """State of one simulated client"""
+    email: str
+    headers: dict
+    rng: random.Random
+    # Recipes the account has liked; shared by virtual users on the same account
+    liked: set = field(default_factory=set)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Build the machine-readable summary for one endpoint (latencies in seconds)"""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": _ms(percentile(ordered, 50)),
+            "p95": _ms(percentile(ordered, 95)),
+            "p99": _ms(percentile(ordered, 99)),
+            "mean": _ms(sum(ordered) / count) if count else 0.0,
+            "max": _ms(ordered[-1]) if count else 0.0,
+        },
+    }
+
+
+async def login(client: httpx.AsyncClient, email: str) -> httpx.Response:
+    return await client.post(
+        f"{API_PREFIX}/auth/token",
+        data={"username": email, "password": BENCH_PASSWORD},
+    )
+
+
+async def scenario_feed(client, user: VirtualUser, seed_info: dict):
+    return await client.get(f"{API_PREFIX}/recipes/feed", params={"limit": 20}, headers=user.headers), {200}
+
+
+async def scenario_feed_guest(client, user: VirtualUser, seed_info: dict):
+    return await client.get(f"{API_PREFIX}/recipes/feed", params={"limit": 20}), {200}
+
+
+def pick_unliked(user: VirtualUser, seed_info: dict) -> Optional[int]:
+    """Random recipe the account has not liked yet, or None if it liked them all"""
+    low, high = seed_info["min_recipe_id"], seed_info["max_recipe_id"]
+    for _ in range(100):
+        recipe_id = user.rng.randint(low, high)
+        if recipe_id not in user.liked:
+            return recipe_id
+    # Nearly everything is liked (tiny catalogs): choose among what is left
+    remaining = sorted(set(range(low, high + 1)) - user.liked)
+    return user.rng.choice(remaining) if remaining else None
+
+
+async def scenario_like(client, user: VirtualUser, seed_info: dict):
+    recipe_id = pick_unliked(user, seed_info)
+    if recipe_id is None:
+        # Nothing left to like: unlike one so later picks have a target
+        recipe_id = user.rng.choice(sorted(user.liked))
+        user.liked.discard(recipe_id)
+        return await client.delete(f"{API_PREFIX}/recipes/{recipe_id}/like", headers=user.headers), {200}
+    # Claimed before the request so concurrent users on the account skip it
+    user.liked.add(recipe_id)
+    return await client.post(f"{API_PREFIX}/recipes/{recipe_id}/like", headers=user.headers), {200}
+
+
+async def scenario_liked(client, user: VirtualUser, seed_info: dict):
+    return await client.get(f"{API_PREFIX}/recipes/liked", params={"limit": 20}, headers=user.headers), {200}
+
+
+async def scenario_pantry_bulk(client, user: VirtualUser, seed_info: dict):
+    names = user.rng.sample(INGREDIENTS, 5)
+    payload = {"ingredients": [{"ingredient_name": name, "quantity": "1"} for name in names]}
+    return await client.post(f"{API_PREFIX}/pantry/bulk", json=payload, headers=user.headers), {200}
+
+
+async def scenario_auth_token(client, user: VirtualUser, seed_info: dict):
+    return await login(client, user.email), {200}
+
+
+SCENARIOS: dict[str, Callable] = {
+    "feed": scenario_feed,
+    "feed_guest": scenario_feed_guest,
+    "like": scenario_like,
+    "liked": scenario_liked,
+    "pantry_bulk": scenario_pantry_bulk,
+    "auth_token": scenario_auth_token,
+}
+
+
+async def _load_liked(client: httpx.AsyncClient, headers: dict, liked: set) -> None:
+    """Fill `liked` with every recipe the account has already liked"""
+    cursor = None
+    while True:
+        params = {"limit": 100}
+        if cursor:
+            params["cursor"] = cursor
+        response = await client.get(f"{API_PREFIX}/recipes/liked", params=params, headers=headers)
+        response.raise_for_status()
+        page = response.json()
+        liked.update(recipe["id"] for recipe in page["recipes"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return
+
+
+async def _create_virtual_user(client: httpx.AsyncClient, index: int, seed: int, liked: set) -> VirtualUser:
+    email = bench_email(index)
+    response = await login(client, email)
+    response.raise_for_status()
+    token = response.json()["access_token"]
+    return VirtualUser(
+        email=email,
+        headers={"Authorization": f"Bearer {token}"},
+        rng=random.Random(seed + index),
+        liked=liked,
+    )
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    seed_info: dict,
+    config: RunConfig,
+    clock: Optional[Callable[[], float]] = None,
+) -> dict:
+    """
+    Run the weighted request mix with `concurrency` workers.
+
+    Requests issued during the warm-up period are not recorded.
+    Returns the report dict (see summarize for the per-endpoint shape).
+    """
+    clock = clock or time.perf_counter
+    names = [name for name, weight in config.mix.items() if weight > 0]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios in mix: {sorted(unknown)}")
+    weights = [config.mix[name] for name in names]
+
+    picker = random.Random(config.seed)
+    user_indexes = [picker.randrange(seed_info["users"]) for _ in range(config.concurrency)]
+    liked_by_account = {index: set() for index in user_indexes}
+    users = await asyncio.gather(
+        *(_create_virtual_user(client, index, config.seed + n, liked_by_account[index])
+          for n, index in enumerate(user_indexes))
+    )
+    if "like" in names:
+        # Likes only target unliked recipes, so any non-200 is a real failure
+        first_user = {id(user.liked): user for user in users}
+        await asyncio.gather(*(_load_liked(client, user.headers, user.liked) for user in first_user.values()))
+
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = {name: 0 for name in names}
+
+    start = clock()
+    measure_from = start + config.warmup
+    stop_at = measure_from + config.duration
+
+    async def worker(user: VirtualUser):
+        while True:
+            now = clock()
+            if now >= stop_at:
+                return
+            name = user.rng.choices(names, weights)[0]
+            began = clock()
+            try:
+                response, expected = await SCENARIOS[name](client, user, seed_info)
+                failed = response.status_code not in expected
+            except httpx.HTTPError:
+                failed = True
+            finished = clock()
+            if began < measure_from:
+                continue
+            if failed:
+                errors[name] += 1
+            else:
+                latencies[name].append(finished - began)
+
+    await asyncio.gather(*(worker(user) for user in users))
+    elapsed = max(clock() - measure_from, 1e-9)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "concurrency": config.concurrency,
+        "duration_s": round(elapsed, 3),
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "endpoints": {name: summarize(latencies[name], errors[name], elapsed) for name in names},
+    }
@@ -12,6 +12,11 @@ from app.main import app
 from app.db.database import get_db
 from app.models.models import Base
 from app.api import auth  # Import auth module to access token_blacklist
+from app.services.catalog import recipe_catalog
+from app.services.guest_feed import guest_feed_pool
+from app.services.ingredient_index import ingredient_index
+from app.services.similarity import similarity_index
+from app.core.idempotency import idempotency_store
 
 
 # Test database setup (SQLite in-memory for fast tests)
@@ -45,9 +50,27 @@ app.dependency_overrides[get_db] = override_get_db
 def clear_token_blacklist():
     """Clear token blacklist before each test to ensure test isolation"""
     auth.token_blacklist.clear()
+    auth.token_claims_cache.clear()
     yield
     # Optionally clear after test as well
     auth.token_blacklist.clear()
+    auth.token_claims_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_recipe_catalog():
+    """Reset in-memory caches and stores (ids are reused across test databases)"""
+    recipe_catalog.clear()
+    guest_feed_pool.clear()
+    ingredient_index.clear()
+    similarity_index.clear()
+    idempotency_store.clear()
+    yield
+    recipe_catalog.clear()
+    guest_feed_pool.clear()
+    ingredient_index.clear()
+    similarity_index.clear()
+    idempotency_store.clear()
 
 
 @pytest.fixture(scope="function")
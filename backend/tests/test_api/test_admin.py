@@ -0,0 +1,76 @@
+"""
+Tests for admin endpoints
+"""
+
+import pytest
+
+from app.config.config import Config
+
+
+@pytest.fixture
+def admin_headers(authenticated_user, sample_user_data, monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_EMAILS", frozenset({sample_user_data["email"]}))
+    return authenticated_user["headers"]
+
+
+class TestProfile:
+    """Test the sampling profiler endpoint"""
+
+    def test_profile_requires_auth(self, client):
+        """Test profiling without authentication"""
+        response = client.get("/api/v1/admin/profile")
+        assert response.status_code == 401
+
+    def test_profile_requires_admin(self, client, authenticated_user):
+        """Test regular users cannot profile"""
+        response = client.get("/api/v1/admin/profile?seconds=0.05", headers=authenticated_user["headers"])
+        assert response.status_code == 403
+
+    def test_profile_collapsed(self, client, admin_headers):
+        """Test collapsed stacks of the worker's threads"""
+        response = client.get("/api/v1/admin/profile?seconds=0.2&interval_ms=5", headers=admin_headers)
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["X-Profile-Samples"]) > 0
+        for line in response.text.splitlines():
+            stack, count = line.rsplit(" ", 1)
+            assert int(count) > 0
+            assert ";" in stack
+
+    def test_profile_speedscope(self, client, admin_headers):
+        """Test speedscope JSON output"""
+        response = client.get(
+            "/api/v1/admin/profile?seconds=0.1&format=speedscope", headers=admin_headers
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        profile = data["profiles"][0]
+        assert profile["type"] == "sampled"
+        assert len(profile["samples"]) == len(profile["weights"])
+
+    def test_profile_duration_limit(self, client, admin_headers):
+        """Test captures longer than the configured maximum are rejected"""
+        response = client.get(
+            f"/api/v1/admin/profile?seconds={Config.PROFILER_MAX_SECONDS + 1}", headers=admin_headers
+        )
+        assert response.status_code == 422
+
+
+class TestLoopStalls:
+    """Test the event-loop stall report"""
+
+    def test_loop_stalls_requires_admin(self, client, authenticated_user):
+        """Test regular users cannot read stalls"""
+        response = client.get("/api/v1/admin/loop-stalls", headers=authenticated_user["headers"])
+        assert response.status_code == 403
+
+    def test_loop_stalls(self, client, admin_headers):
+        """Test the report lists recorded stalls"""
+        response = client.get("/api/v1/admin/loop-stalls", headers=admin_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["threshold_ms"] == Config.LOOP_STALL_THRESHOLD_MS
+        assert isinstance(data["stalls"], list)
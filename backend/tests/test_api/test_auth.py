@@ -163,4 +163,33 @@ class TestLogout:
         """Test logout without authentication"""
         response = client.post("/api/v1/auth/logout")
         
-        assert response.status_code == 401
\ No newline at end of file
+        assert response.status_code == 401
+
+
+class TestTokenClaimsCache:
+    """Test caching of verified access token claims"""
+
+    def test_repeated_requests_skip_verification(self, client, authenticated_user, monkeypatch):
+        """Test that a cached token is not verified again"""
+        from jose import jwt
+
+        calls = []
+        real_decode = jwt.decode
+        monkeypatch.setattr(jwt, "decode", lambda *a, **kw: calls.append(1) or real_decode(*a, **kw))
+
+        for _ in range(3):
+            response = client.get("/api/v1/auth/me", headers=authenticated_user["headers"])
+            assert response.status_code == 200
+
+        assert len(calls) == 1
+
+    def test_revoked_token_rejected_while_cached(self, client, authenticated_user):
+        """Test that the revocation list is checked before the cache"""
+        headers = authenticated_user["headers"]
+        assert client.get("/api/v1/auth/me", headers=headers).status_code == 200
+
+        response = client.post("/api/v1/auth/logout", headers=headers)
+        assert response.status_code == 200
+
+        response = client.get("/api/v1/auth/me", headers=headers)
+        assert response.status_code == 401
@@ -27,4 +27,49 @@ def test_health_check_no_auth_required(client):
     # Should work with invalid Authorization header
     headers = {"Authorization": "Bearer invalid_token"}
     response = client.get("/api/v1/health", headers=headers)
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+
+def test_liveness(client):
+    """Test liveness answers without touching the database"""
+    response = client.get("/api/v1/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "OK"}
+    assert client.head("/api/v1/health/live").status_code == 200
+
+
+def test_readiness_after_startup(client):
+    """Test readiness reports the startup check"""
+    response = client.get("/api/v1/health/ready")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "ready"
+    assert data["checks"]["database"]["ok"] is True
+    assert data["checks"]["pool"]["ok"] is True
+
+
+def test_readiness_before_first_check(client):
+    """Test a worker that has not checked yet is not ready"""
+    from app.core.readiness import readiness_monitor
+
+    readiness_monitor.clear()
+    response = client.get("/api/v1/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+
+def test_health_routes_answer_head_without_duplicate_operations(client):
+    """Test HEAD is served but only GET appears in the OpenAPI schema"""
+    import warnings
+    from fastapi.openapi.utils import get_openapi
+    from app.main import app
+
+    for path in ("/api/v1/health", "/api/v1/health/live", "/api/v1/health/ready"):
+        assert client.head(path).status_code == 200
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        schema = get_openapi(title=app.title, version=app.version, routes=app.routes)
+    assert list(schema["paths"]["/api/v1/health/live"]) == ["get"]
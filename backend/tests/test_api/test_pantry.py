@@ -128,6 +128,27 @@ class TestBulkAddIngredients:
         assert isinstance(data["added"], list)
         assert isinstance(data["skipped"], list)
     
+    def test_bulk_add_parses_quantities(self, client, authenticated_user):
+        """Test quantities are stored with their canonical value and unit"""
+        bulk_data = {
+            "ingredients": [
+                {"ingredient_name": "flour", "quantity": "1.5 kg"},
+                {"ingredient_name": "milk", "quantity": "2 cups"},
+                {"ingredient_name": "egg", "quantity": "6"},
+                {"ingredient_name": "salt", "quantity": "some"}
+            ]
+        }
+        headers = authenticated_user["headers"]
+        client.post("/api/v1/pantry/bulk", json=bulk_data, headers=headers)
+
+        items = {item["ingredient_name"]: item for item in client.get("/api/v1/pantry/", headers=headers).json()}
+        assert (items["flour"]["quantity_value"], items["flour"]["quantity_unit"]) == (1500.0, "g")
+        assert items["milk"]["quantity_unit"] == "ml"
+        assert round(items["milk"]["quantity_value"], 2) == 473.18
+        assert (items["egg"]["quantity_value"], items["egg"]["quantity_unit"]) == (6.0, None)
+        assert items["salt"]["quantity"] == "some"
+        assert items["salt"]["quantity_value"] is None
+    
     def test_bulk_add_empty_list(self, client, authenticated_user):
         """Test bulk add with empty ingredients list"""
         bulk_data = {"ingredients": []}
@@ -138,8 +159,45 @@ class TestBulkAddIngredients:
         )
         
         assert response.status_code == 400
-
-
+    
+    def test_bulk_add_dedupes_by_canonical_key(self, client, authenticated_user):
+        """Test plural and synonym forms are stored once, under the name given first"""
+        bulk_data = {
+            "ingredients": [
+                {"ingredient_name": "Tomatoes"},
+                {"ingredient_name": "cherry tomatoes"},
+                {"ingredient_name": "Scallions"}
+            ]
+        }
+        response = client.post("/api/v1/pantry/bulk", json=bulk_data, headers=authenticated_user["headers"])
+        
+        assert response.status_code == 200
+        assert response.json()["added"] == ["tomatoes", "scallions"]
+        
+        retry = client.post("/api/v1/pantry/bulk", json={"ingredients": [{"ingredient_name": "tomato"}]},
+                            headers=authenticated_user["headers"])
+        assert retry.json()["skipped"] == ["tomato"]
+    
+    def test_compound_names_are_kept(self, client, authenticated_user):
+        """Test products named after another ingredient neither collide nor get renamed"""
+        headers = authenticated_user["headers"]
+        for name in ("Coconut milk", "milk", "Peanut Butter", "butter"):
+            response = client.post("/api/v1/pantry/", json={"ingredient_name": name}, headers=headers)
+            assert response.status_code == 200
+            assert response.json()["ingredient"]["ingredient_name"] == name.lower()
+    
+    def test_bulk_add_retry_with_idempotency_key(self, client, authenticated_user):
+        """Test a retried bulk add replays the original summary"""
+        bulk_data = {"ingredients": [{"ingredient_name": "garlic", "quantity": "2"}]}
+        headers = {**authenticated_user["headers"], "Idempotency-Key": "bulk-1"}
+        
+        first = client.post("/api/v1/pantry/bulk", json=bulk_data, headers=headers)
+        retry = client.post("/api/v1/pantry/bulk", json=bulk_data, headers=headers)
+        
+        assert first.status_code == 200
+        assert retry.json() == first.json()
+        assert retry.json()["added"] == ["garlic"]
+        assert retry.headers["Idempotent-Replayed"] == "true"
 
 
 class TestDeleteIngredient:
@@ -177,4 +235,34 @@ class TestClearPantry:
         assert response.status_code == 200
         data = response.json()
         
-        assert "deleted_count" in data
\ No newline at end of file
+        assert "deleted_count" in data
+
+
+class TestPantryConditionalGet:
+    """Test ETag / If-None-Match support on pantry listing"""
+
+    def test_unchanged_pantry_returns_304(self, client, authenticated_user):
+        """Test repeated GET with matching ETag returns 304"""
+        response = client.get("/api/v1/pantry/", headers=authenticated_user["headers"])
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+
+        headers = {**authenticated_user["headers"], "If-None-Match": etag}
+        response = client.get("/api/v1/pantry/", headers=headers)
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_write_changes_etag(self, client, authenticated_user):
+        """Test adding an ingredient invalidates the previous ETag"""
+        etag = client.get("/api/v1/pantry/", headers=authenticated_user["headers"]).headers["etag"]
+        client.post(
+            "/api/v1/pantry/",
+            json={"ingredient_name": "tomato"},
+            headers=authenticated_user["headers"]
+        )
+
+        headers = {**authenticated_user["headers"], "If-None-Match": etag}
+        response = client.get("/api/v1/pantry/", headers=headers)
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert len(response.json()) == 1
@@ -96,6 +96,24 @@ class TestRecipeLikes:
         
         assert response.status_code == 404
 
+    def test_like_keeps_updated_at(self, client, db_session, authenticated_user):
+        """Test likes do not move updated_at, so cached cards are not reloaded for them"""
+        from datetime import datetime
+        from app.models.models import Recipe
+
+        updated_at = datetime(2024, 1, 1, 12, 0, 0)
+        recipe = Recipe(name="Stable", prep_time=1, cook_time=2, difficulty="easy",
+                        instructions="Steps", ingredients='["salt"]', updated_at=updated_at)
+        db_session.add(recipe)
+        db_session.commit()
+
+        response = client.post(f"/api/v1/recipes/{recipe.id}/like", headers=authenticated_user["headers"])
+        assert response.status_code == 200
+        assert response.json()["like_count"] == 1
+
+        db_session.expire_all()
+        assert db_session.get(Recipe, recipe.id).updated_at.replace(tzinfo=None) == updated_at
+
 
 class TestLikedRecipes:
     """Test liked recipes collection"""
@@ -135,4 +153,443 @@ class TestLikedRecipes:
         )
         
         assert response.status_code == 400
-        assert "cursor" in response.json()["detail"].lower()
\ No newline at end of file
+        assert "cursor" in response.json()["detail"].lower()
+
+
+class TestRecipeSearch:
+    """Test recipe browse and search endpoint"""
+
+    @staticmethod
+    def _add_recipes(db_session):
+        from app.models.models import Recipe
+
+        recipes = [
+            Recipe(name="Tomato Soup", description="Warm soup", prep_time=10, cook_time=20,
+                   difficulty="easy", instructions="Cook", ingredients='["tomato", "salt"]'),
+            Recipe(name="Beef Stew", description="Hearty stew", prep_time=30, cook_time=120,
+                   difficulty="hard", instructions="Simmer", ingredients='["beef", "carrot"]'),
+            Recipe(name="Tomato Pasta", description="Quick pasta", prep_time=5, cook_time=15,
+                   difficulty="easy", instructions="Boil", ingredients='["pasta", "tomato"]'),
+        ]
+        db_session.add_all(recipes)
+        db_session.commit()
+        return [recipe.id for recipe in recipes]
+
+    def test_search_by_text(self, client, db_session):
+        """Test full-text search matches name and ingredients"""
+        self._add_recipes(db_session)
+        response = client.get("/api/v1/recipes/search?q=tomat")
+
+        assert response.status_code == 200
+        names = {recipe["name"] for recipe in response.json()["recipes"]}
+        assert names == {"Tomato Soup", "Tomato Pasta"}
+
+    def test_search_filters(self, client, db_session):
+        """Test difficulty and max total time filters"""
+        self._add_recipes(db_session)
+        response = client.get("/api/v1/recipes/search?difficulty=easy&max_total_time=20")
+
+        assert response.status_code == 200
+        names = [recipe["name"] for recipe in response.json()["recipes"]]
+        assert names == ["Tomato Pasta"]
+
+    def test_search_keyset_pagination(self, client, db_session):
+        """Test pages follow each other without gaps or duplicates"""
+        ids = self._add_recipes(db_session)
+
+        first = client.get("/api/v1/recipes/search?limit=2").json()
+        assert first["has_more"] is True
+        second = client.get(f"/api/v1/recipes/search?limit=2&cursor={first['next_cursor']}").json()
+        assert second["has_more"] is False
+
+        seen = [recipe["id"] for recipe in first["recipes"] + second["recipes"]]
+        assert seen == sorted(ids, reverse=True)
+
+    def test_search_no_searchable_words(self, client):
+        """Test query without words returns an empty page"""
+        response = client.get("/api/v1/recipes/search?q=%25%25")
+
+        assert response.status_code == 200
+        assert response.json()["recipes"] == []
+
+
+class TestLikedRecipesPagination:
+    """Test keyset pagination of liked recipes"""
+
+    def test_liked_pagination_with_timestamp_ties(self, client, db_session, authenticated_user):
+        """Test likes sharing a timestamp are neither skipped nor duplicated"""
+        from datetime import datetime
+        from app.models.models import Recipe, UserRecipeInteraction
+
+        user_id = client.get("/api/v1/auth/me", headers=authenticated_user["headers"]).json()["id"]
+        liked_at = datetime(2025, 11, 1, 12, 0, 0)
+        recipes = [
+            Recipe(name=f"Recipe {i}", prep_time=5, cook_time=5, difficulty="easy",
+                   instructions="Cook", ingredients='["salt"]')
+            for i in range(5)
+        ]
+        db_session.add_all(recipes)
+        db_session.flush()
+        db_session.add_all([
+            UserRecipeInteraction(user_id=user_id, recipe_id=recipe.id, liked=True, created_at=liked_at)
+            for recipe in recipes
+        ])
+        db_session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/api/v1/recipes/liked?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            data = client.get(url, headers=authenticated_user["headers"]).json()
+            seen.extend(recipe["id"] for recipe in data["recipes"])
+            cursor = data["next_cursor"]
+            if not data["has_more"]:
+                assert cursor is None
+                break
+
+        assert sorted(seen) == sorted(recipe.id for recipe in recipes)
+        assert len(seen) == len(set(seen))
+
+
+class TestLikedRecipesEtag:
+    """Test conditional GET on liked recipes"""
+
+    def test_other_users_like_changes_etag(self, client, db_session, authenticated_user, sample_user_data):
+        """Test a like count changed by another user invalidates the ETag"""
+        from app.models.models import Recipe
+
+        recipe = Recipe(name="Shared", prep_time=1, cook_time=2, difficulty="easy",
+                        instructions="Steps", ingredients='["salt"]')
+        db_session.add(recipe)
+        db_session.commit()
+        headers = authenticated_user["headers"]
+        assert client.post(f"/api/v1/recipes/{recipe.id}/like", headers=headers).status_code == 200
+
+        etag = client.get("/api/v1/recipes/liked", headers=headers).headers["etag"]
+        assert client.get("/api/v1/recipes/liked",
+                          headers={**headers, "If-None-Match": etag}).status_code == 304
+
+        other = {**sample_user_data, "email": "other@example.com"}
+        assert client.post("/api/v1/auth/register", json=other).status_code == 200
+        token = client.post("/api/v1/auth/token", data={"username": other["email"],
+                                                       "password": other["password"]}).json()["access_token"]
+        assert client.post(f"/api/v1/recipes/{recipe.id}/like",
+                           headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+        response = client.get("/api/v1/recipes/liked", headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()["recipes"][0]["like_count"] == 2
+
+
+class TestRecipeColumnProjection:
+    """Test list endpoints return cards without loading recipe bodies"""
+
+    def test_feed_returns_card_fields_only(self, client, db_session):
+        """Test feed items contain exactly the minimal card fields"""
+        from app.models.models import Recipe
+
+        db_session.add(Recipe(name="Card", description="Long text", prep_time=1, cook_time=2,
+                              difficulty="easy", instructions="Long steps", ingredients='["salt"]'))
+        db_session.commit()
+
+        data = client.get("/api/v1/recipes/feed").json()
+        assert set(data[0]) == {"id", "name", "image_url", "prep_time", "cook_time", "difficulty", "like_count"}
+
+    def test_details_still_include_body(self, client, db_session):
+        """Test deferred columns are loaded for the details endpoint"""
+        from app.models.models import Recipe
+
+        recipe = Recipe(name="Body", description="Desc", prep_time=1, cook_time=2,
+                        difficulty="easy", instructions="Steps", ingredients='["salt", "egg"]')
+        db_session.add(recipe)
+        db_session.commit()
+
+        data = client.get(f"/api/v1/recipes/{recipe.id}").json()
+        assert data["description"] == "Desc"
+        assert data["instructions"] == "Steps"
+        assert data["ingredients"] == ["salt", "egg"]
+
+
+class TestLikeIdempotency:
+    """Test Idempotency-Key handling on likes"""
+
+    def make_recipe(self, db_session, name="Retry"):
+        from app.models.models import Recipe
+
+        recipe = Recipe(name=name, prep_time=1, cook_time=2, difficulty="easy",
+                        instructions="Steps", ingredients='["salt"]')
+        db_session.add(recipe)
+        db_session.commit()
+        return recipe.id
+
+    def test_retry_replays_first_response(self, client, db_session, authenticated_user):
+        """Test a retried like returns the stored response instead of a duplicate error"""
+        recipe_id = self.make_recipe(db_session)
+        headers = {**authenticated_user["headers"], "Idempotency-Key": "like-1"}
+
+        first = client.post(f"/api/v1/recipes/{recipe_id}/like", headers=headers)
+        retry = client.post(f"/api/v1/recipes/{recipe_id}/like", headers=headers)
+
+        assert first.status_code == 200
+        assert retry.status_code == 200
+        assert retry.json() == first.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert retry.json()["like_count"] == 1
+
+    def test_retry_during_first_request_does_not_like_twice(self, client, db_session, authenticated_user):
+        """Test a retry sent while the original is still running gets 409, then the replay"""
+        from app.core.idempotency import idempotency_store
+
+        recipe_id = self.make_recipe(db_session)
+        headers = {**authenticated_user["headers"], "Idempotency-Key": "like-concurrent"}
+        user_id = client.get("/api/v1/auth/me", headers=authenticated_user["headers"]).json()["id"]
+        # The original request has reserved the key and not finished yet
+        assert idempotency_store.begin(user_id, "like_recipe", "like-concurrent", recipe_id) is None
+
+        retry = client.post(f"/api/v1/recipes/{recipe_id}/like", headers=headers)
+        assert retry.status_code == 409
+        assert retry.headers["retry-after"] == "1"
+        assert client.get(f"/api/v1/recipes/{recipe_id}").json()["like_count"] == 0
+
+        body = {"message": "Recipe liked successfully", "recipe_id": recipe_id, "like_count": 1}
+        idempotency_store.remember(user_id, "like_recipe", "like-concurrent", recipe_id, body=body)
+        replay = client.post(f"/api/v1/recipes/{recipe_id}/like", headers=headers)
+        assert replay.status_code == 200
+        assert replay.json() == body
+
+    def test_without_key_duplicate_like_fails(self, client, db_session, authenticated_user):
+        """Test requests without a key still hit the write path"""
+        recipe_id = self.make_recipe(db_session)
+        headers = authenticated_user["headers"]
+
+        assert client.post(f"/api/v1/recipes/{recipe_id}/like", headers=headers).status_code == 200
+        # Rejected by the unique constraint
+        response = client.post(f"/api/v1/recipes/{recipe_id}/like", headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Recipe already liked"
+
+    def test_key_reused_for_different_request(self, client, db_session, authenticated_user):
+        """Test reusing a key with other parameters is rejected"""
+        first_id = self.make_recipe(db_session, "First")
+        second_id = self.make_recipe(db_session, "Second")
+        headers = {**authenticated_user["headers"], "Idempotency-Key": "like-2"}
+
+        assert client.post(f"/api/v1/recipes/{first_id}/like", headers=headers).status_code == 200
+        response = client.post(f"/api/v1/recipes/{second_id}/like", headers=headers)
+
+        assert response.status_code == 422
+
+
+class TestCookNow:
+    """Test pantry-covered recipe matching"""
+
+    def test_cook_now_no_auth(self, client):
+        """Test cook-now requires authentication"""
+        response = client.get("/api/v1/recipes/cook-now")
+        assert response.status_code == 401
+
+    def test_cook_now_matches_pantry(self, client, db_session, authenticated_user):
+        """Test fully covered recipes and recipes missing one ingredient"""
+        from app.models.models import Recipe
+
+        covered = Recipe(name="Omelette", prep_time=1, cook_time=2, difficulty="easy",
+                         instructions="Cook", ingredients='["egg", "salt"]')
+        almost = Recipe(name="Cake", prep_time=1, cook_time=2, difficulty="easy",
+                        instructions="Bake", ingredients='["egg", "flour", "sugar"]')
+        db_session.add_all([covered, almost])
+        db_session.commit()
+        # The index was preloaded at startup, before these recipes existed
+        from app.services.ingredient_index import ingredient_index
+        ingredient_index.clear()
+
+        bulk_data = {"ingredients": [{"ingredient_name": name} for name in ("Egg", "salt", "flour")]}
+        client.post("/api/v1/pantry/bulk", json=bulk_data, headers=authenticated_user["headers"])
+
+        data = client.get("/api/v1/recipes/cook-now", headers=authenticated_user["headers"]).json()
+        assert [recipe["name"] for recipe in data["recipes"]] == ["Omelette"]
+        assert data["recipes"][0]["missing"] == []
+
+        data = client.get(
+            "/api/v1/recipes/cook-now?max_missing=1", headers=authenticated_user["headers"]
+        ).json()
+        assert [recipe["name"] for recipe in data["recipes"]] == ["Omelette", "Cake"]
+        assert data["recipes"][1]["missing"] == ["sugar"]
+
+
+class TestFeedPantryRanking:
+    """Test authenticated feed ranking by pantry overlap"""
+
+    def test_pantry_matches_come_first(self, client, db_session, authenticated_user):
+        """Test recipes sharing canonical ingredients with the pantry rank first"""
+        from app.models.models import Recipe
+        from app.services.ingredient_index import ingredient_index
+
+        for index in range(5):
+            db_session.add(Recipe(name=f"Other {index}", prep_time=1, cook_time=2, difficulty="easy",
+                                  instructions="Cook", ingredients='["rice"]'))
+        db_session.add(Recipe(name="Salad", prep_time=1, cook_time=2, difficulty="easy",
+                              instructions="Toss", ingredients='["2 cherry tomatoes", "Salt"]'))
+        db_session.commit()
+        ingredient_index.clear()
+
+        bulk_data = {"ingredients": [{"ingredient_name": "Tomatoes"}]}
+        client.post("/api/v1/pantry/bulk", json=bulk_data, headers=authenticated_user["headers"])
+
+        data = client.get("/api/v1/recipes/feed?limit=6", headers=authenticated_user["headers"]).json()
+        assert data[0]["name"] == "Salad"
+        assert len(data) == 6
+
+
+class TestSimilarRecipes:
+    """Test the similar-recipes endpoint"""
+
+    def test_similar_recipes(self, client, db_session):
+        """Test recipes with overlapping ingredients are returned with a score"""
+        from app.models.models import Recipe
+
+        ingredients = '["egg", "flour", "sugar", "butter", "milk", "salt"]'
+        first = Recipe(name="Pancakes", prep_time=1, cook_time=2, difficulty="easy",
+                       instructions="Fry", ingredients=ingredients)
+        second = Recipe(name="Crepes", prep_time=1, cook_time=2, difficulty="easy",
+                        instructions="Fry", ingredients=ingredients)
+        other = Recipe(name="Fried rice", prep_time=1, cook_time=2, difficulty="easy",
+                       instructions="Fry", ingredients='["rice", "soy sauce", "green onion"]')
+        db_session.add_all([first, second, other])
+        db_session.commit()
+        # The index was preloaded at startup, before these recipes existed
+        from app.services.similarity import similarity_index
+        similarity_index.clear()
+
+        data = client.get(f"/api/v1/recipes/{first.id}/similar").json()
+        assert data["recipe_id"] == first.id
+        assert [recipe["name"] for recipe in data["recipes"]] == ["Crepes"]
+        assert data["recipes"][0]["similarity"] == 1.0
+
+    def test_similar_recipes_not_found(self, client):
+        """Test unknown recipes return 404"""
+        response = client.get("/api/v1/recipes/99999/similar")
+        assert response.status_code == 404
+
+
+class TestShoppingList:
+    """Test the shopping-list endpoint"""
+
+    def test_shopping_list_no_auth(self, client):
+        """Test shopping list requires authentication"""
+        assert client.get("/api/v1/recipes/shopping-list").status_code == 401
+
+    def test_shopping_list_from_liked_recipes(self, client, db_session, authenticated_user):
+        """Test liked recipes are combined and pantry items removed"""
+        from app.models.models import Recipe
+
+        headers = authenticated_user["headers"]
+        liked = Recipe(name="Bread", prep_time=1, cook_time=2, difficulty="easy",
+                       instructions="Bake", ingredients='["500 g flour", "1 tsp salt"]')
+        not_liked = Recipe(name="Soup", prep_time=1, cook_time=2, difficulty="easy",
+                           instructions="Boil", ingredients='["2 carrots"]')
+        db_session.add_all([liked, not_liked])
+        db_session.commit()
+        client.post(f"/api/v1/recipes/{liked.id}/like", headers=headers)
+        client.post("/api/v1/pantry/bulk", json={"ingredients": [{"ingredient_name": "salt"}]}, headers=headers)
+
+        response = client.get(
+            f"/api/v1/recipes/shopping-list?recipe_ids={liked.id}&recipe_ids={not_liked.id}",
+            headers=headers,
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["recipe_ids"] == [liked.id]
+        assert data["items"] == [{"ingredient": "flour", "quantities": ["500 g"], "recipe_ids": [liked.id]}]
+        assert data["in_pantry"] == ["salt"]
+
+    def test_shopping_list_too_many_recipes(self, client, authenticated_user):
+        """Test the number of recipes is capped"""
+        query = "&".join(f"recipe_ids={recipe_id}" for recipe_id in range(1, 60))
+        response = client.get(f"/api/v1/recipes/shopping-list?{query}", headers=authenticated_user["headers"])
+        assert response.status_code == 400
+
+
+class TestMealPlan:
+    """Test the meal-plan endpoint"""
+
+    def test_meal_plan_no_auth(self, client):
+        """Test meal plan requires authentication"""
+        assert client.get("/api/v1/recipes/meal-plan").status_code == 401
+
+    def test_meal_plan_uses_pantry_and_diet(self, client, db_session, authenticated_user):
+        """Test liked recipes are planned by pantry use, skipping excluded ingredients"""
+        from app.models.models import Recipe, User
+
+        headers = authenticated_user["headers"]
+        omelette = Recipe(name="Omelette", prep_time=5, cook_time=5, difficulty="easy",
+                          instructions="Cook", ingredients='["3 eggs", "1 tbsp butter", "salt"]')
+        rice = Recipe(name="Fried rice", prep_time=10, cook_time=10, difficulty="easy",
+                      instructions="Fry", ingredients='["rice", "2 eggs", "soy sauce"]')
+        steak = Recipe(name="Steak", prep_time=5, cook_time=15, difficulty="easy",
+                       instructions="Grill", ingredients='["beef", "salt"]')
+        db_session.add_all([omelette, rice, steak])
+        db_session.commit()
+        # The index was preloaded at startup, before these recipes existed
+        from app.services.ingredient_index import ingredient_index
+        ingredient_index.clear()
+
+        for recipe in (omelette, rice, steak):
+            client.post(f"/api/v1/recipes/{recipe.id}/like", headers=headers)
+        bulk_data = {"ingredients": [{"ingredient_name": name} for name in ("egg", "salt", "butter")]}
+        client.post("/api/v1/pantry/bulk", json=bulk_data, headers=headers)
+        user = db_session.query(User).filter(User.email == "test@example.com").first()
+        user.dietary_type = "vegetarian"
+        db_session.commit()
+
+        response = client.get("/api/v1/recipes/meal-plan?meals=2", headers=headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [recipe["id"] for recipe in data["recipes"]] == [omelette.id, rice.id]
+        assert sorted(data["recipes"][0]["uses_pantry"]) == ["butter", "egg", "salt"]
+        assert sorted(data["to_buy"]) == ["rice", "soy sauce"]
+        assert data["total_time"] == 30
+        assert data["complete"] is True
+
+    def test_meal_plan_skips_allergens_in_compounds(self, client, db_session, authenticated_user):
+        """Test a peanut allergy keeps peanut butter recipes out of the plan"""
+        from app.models.models import Recipe, User
+
+        headers = authenticated_user["headers"]
+        toast = Recipe(name="PB toast", prep_time=2, cook_time=3, difficulty="easy",
+                       instructions="Spread", ingredients='["2 tbsp peanut butter", "bread"]')
+        sandwich = Recipe(name="Jam sandwich", prep_time=2, cook_time=0, difficulty="easy",
+                          instructions="Spread", ingredients='["bread", "jam"]')
+        db_session.add_all([toast, sandwich])
+        db_session.commit()
+        from app.services.ingredient_index import ingredient_index
+        ingredient_index.clear()
+
+        for recipe in (toast, sandwich):
+            client.post(f"/api/v1/recipes/{recipe.id}/like", headers=headers)
+        user = db_session.query(User).filter(User.email == "test@example.com").first()
+        user.allergies = "Peanuts"
+        db_session.commit()
+
+        response = client.get("/api/v1/recipes/meal-plan?meals=2", headers=headers)
+
+        assert response.status_code == 200
+        assert [recipe["id"] for recipe in response.json()["recipes"]] == [sandwich.id]
+
+    def test_meal_plan_time_budget(self, client, db_session, authenticated_user):
+        """Test recipes longer than max_total_time are left out"""
+        from app.models.models import Recipe
+
+        headers = authenticated_user["headers"]
+        slow = Recipe(name="Stew", prep_time=30, cook_time=120, difficulty="medium",
+                      instructions="Simmer", ingredients='["beef", "carrot"]')
+        db_session.add(slow)
+        db_session.commit()
+        client.post(f"/api/v1/recipes/{slow.id}/like", headers=headers)
+
+        response = client.get("/api/v1/recipes/meal-plan?max_total_time=60", headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["recipes"] == []
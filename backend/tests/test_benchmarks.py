@@ -0,0 +1,46 @@
+"""
+Tests for the benchmark report helpers
+"""
+
+import random
+
+import pytest
+
+from benchmarks.runner import VirtualUser, percentile, pick_unliked, summarize
+from benchmarks.__main__ import parse_mix
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles on a known distribution"""
+    values = [float(v) for v in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 99) == 0.0
+
+
+def test_summarize_report_shape():
+    """Test summary is machine-readable with latencies in milliseconds"""
+    report = summarize([0.010, 0.020, 0.030], errors=1, elapsed=2.0)
+
+    assert report["requests"] == 3
+    assert report["errors"] == 1
+    assert report["rps"] == 1.5
+    assert report["latency_ms"]["p50"] == 20.0
+    assert report["latency_ms"]["max"] == 30.0
+
+
+def test_parse_mix():
+    """Test scenario weight parsing"""
+    assert parse_mix("feed=40, like=10") == {"feed": 40, "like": 10}
+
+
+def test_pick_unliked_skips_liked_recipes():
+    """Test like picks never target a recipe the account already liked"""
+    user = VirtualUser(email="u@example.com", headers={}, rng=random.Random(0), liked={1, 2, 3, 4})
+    seed_info = {"min_recipe_id": 1, "max_recipe_id": 5}
+
+    assert {pick_unliked(user, seed_info) for _ in range(20)} == {5}
+    user.liked.add(5)
+    assert pick_unliked(user, seed_info) is None
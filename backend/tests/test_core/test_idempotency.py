@@ -0,0 +1,46 @@
+"""
+Tests for Idempotency-Key reservation and replay
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.idempotency import REPLAYED_HEADER, IdempotencyStore
+
+
+def test_retry_while_in_flight_is_rejected():
+    """Test a retry that arrives before the first request finishes does not run the write"""
+    store = IdempotencyStore(ttl=60, maxsize=10)
+
+    assert store.begin(1, "like", "key-1", 7) is None
+    with pytest.raises(HTTPException) as exc_info:
+        store.begin(1, "like", "key-1", 7)
+    assert exc_info.value.status_code == 409
+
+    store.remember(1, "like", "key-1", 7, body={"like_count": 1})
+    store.release(1, "like", "key-1")
+    replay = store.begin(1, "like", "key-1", 7)
+    assert replay.headers[REPLAYED_HEADER] == "true"
+    assert replay.body == b'{"like_count":1}'
+
+
+def test_failed_request_releases_key():
+    """Test a key whose request failed can be retried"""
+    store = IdempotencyStore(ttl=60, maxsize=10)
+
+    assert store.begin(1, "like", "key-1", 7) is None
+    store.release(1, "like", "key-1")
+
+    assert store.begin(1, "like", "key-1", 7) is None
+
+
+def test_key_reuse_with_other_request_while_in_flight():
+    """Test a different request under a reserved key is rejected as a mismatch"""
+    store = IdempotencyStore(ttl=60, maxsize=10)
+    store.begin(1, "like", "key-1", 7)
+
+    with pytest.raises(HTTPException) as exc_info:
+        store.begin(1, "like", "key-1", 8)
+    assert exc_info.value.status_code == 422
+    # Scoped per user: another user's identical key is independent
+    assert store.begin(2, "like", "key-1", 7) is None
@@ -0,0 +1,179 @@
+"""
+Tests for adaptive concurrency limiting and load shedding
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.load_shedding import (
+    CRITICAL, LOW, NORMAL, AdaptiveLimiter, LoadSheddingMiddleware, classify,
+)
+
+
+def make_limiter(**overrides):
+    options = dict(
+        target_latency=0.5, initial_limit=2, min_limit=1, max_limit=10,
+        max_queue_delay=0.2, low_priority_share=0.5, critical_headroom=1.5,
+    )
+    options.update(overrides)
+    return AdaptiveLimiter("test", **options)
+
+
+def test_classify_route_classes():
+    """Test route classes and priorities"""
+    guest = Headers({})
+    user = Headers({"authorization": "Bearer x"})
+
+    assert classify("GET", "/api/v1/recipes/feed", guest) == ("feed", LOW)
+    assert classify("GET", "/api/v1/recipes/feed", user) == ("feed", NORMAL)
+    assert classify("POST", "/api/v1/recipes/5/like", user) == ("writes", CRITICAL)
+    assert classify("DELETE", "/api/v1/recipes/5/like", user) == ("writes", CRITICAL)
+    assert classify("POST", "/api/v1/pantry/bulk", user) == ("writes", NORMAL)
+    assert classify("POST", "/api/v1/auth/token", guest) == ("auth", NORMAL)
+    assert classify("GET", "/api/v1/health", guest) is None
+    assert classify("GET", "/metrics", guest) is None
+
+
+def test_low_priority_shed_before_critical():
+    """Test low priority uses a share of the limit and critical gets headroom"""
+    limiter = make_limiter(initial_limit=2)
+
+    async def run():
+        assert await limiter.acquire(LOW)
+        assert not await limiter.acquire(LOW)
+        assert await limiter.acquire(NORMAL)
+        assert await limiter.acquire(CRITICAL)
+        assert limiter.inflight == 3
+
+    asyncio.run(run())
+
+
+def test_aimd_limit_adjustment():
+    """Test fast completions grow the limit and slow ones shrink it"""
+    limiter = make_limiter(initial_limit=4)
+    limiter.inflight = 2
+    limiter.release(latency=0.01, failed=False)
+    assert limiter.limit == 4.25
+
+    limiter.release(latency=2.0, failed=False)
+    assert limiter.limit == 4.25 * 0.9
+
+    # A second slow completion right away does not compound the decrease
+    limiter.inflight = 1
+    limiter.release(latency=2.0, failed=False)
+    assert limiter.limit == 4.25 * 0.9
+
+
+def test_waiter_receives_released_slot():
+    """Test a queued request is admitted when a slot frees up"""
+    limiter = make_limiter(initial_limit=1)
+
+    async def run():
+        assert await limiter.acquire(NORMAL)
+        waiting = asyncio.ensure_future(limiter.acquire(NORMAL))
+        await asyncio.sleep(0.01)
+        limiter.release(latency=0.01, failed=False)
+        assert await waiting
+        assert limiter.inflight == 1
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_passes_slot_on():
+    """Test a slot handed to a request cancelled before resuming is not leaked"""
+    limiter = make_limiter(initial_limit=1)
+
+    async def run():
+        assert await limiter.acquire(NORMAL)
+        first = asyncio.ensure_future(limiter.acquire(NORMAL))
+        second = asyncio.ensure_future(limiter.acquire(NORMAL))
+        await asyncio.sleep(0.01)
+        # A failed completion keeps the limit at 1, so only one waiter is admitted
+        limiter.release(latency=0.01, failed=True)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second
+        assert limiter.inflight == 1
+
+        limiter.release(latency=0.01, failed=True)
+        assert limiter.inflight == 0
+
+    asyncio.run(run())
+
+
+def test_waiters_woken_by_priority():
+    """Test a freed slot goes to the highest-priority waiter, in arrival order within a priority"""
+    limiter = make_limiter(initial_limit=2, critical_headroom=1.0, max_queue_delay=1.0)
+
+    async def run():
+        assert await limiter.acquire(NORMAL)
+        assert await limiter.acquire(NORMAL)
+        admitted = []
+
+        async def wait(name, priority):
+            assert await limiter.acquire(priority)
+            admitted.append(name)
+
+        tasks = []
+        for name, priority in (("normal-1", NORMAL), ("critical-1", CRITICAL),
+                               ("normal-2", NORMAL), ("critical-2", CRITICAL)):
+            tasks.append(asyncio.ensure_future(wait(name, priority)))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        for _ in tasks:
+            limiter.release(latency=0.01, failed=True)
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        assert admitted == ["critical-1", "critical-2", "normal-1", "normal-2"]
+
+    asyncio.run(run())
+
+
+def test_waiter_times_out():
+    """Test a queued request is shed after max_queue_delay"""
+    limiter = make_limiter(initial_limit=1, max_queue_delay=0.01)
+
+    async def run():
+        assert await limiter.acquire(NORMAL)
+        assert not await limiter.acquire(NORMAL)
+        assert limiter.inflight == 1
+        assert not any(limiter._waiters.values())
+
+    asyncio.run(run())
+
+
+def test_middleware_returns_503_with_retry_after():
+    """Test overloaded requests fail fast with Retry-After"""
+    release = asyncio.Event()
+
+    async def feed(request):
+        await release.wait()
+        return JSONResponse({"ok": True})
+
+    app = Starlette(routes=[Route("/api/v1/recipes/feed", feed)])
+    limiter = make_limiter(initial_limit=2, max_queue_delay=0)
+    shedding_app = LoadSheddingMiddleware(app, limiters={"feed": limiter})
+
+    async def run():
+        transport = httpx.ASGITransport(app=shedding_app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.ensure_future(client.get("/api/v1/recipes/feed"))
+            await asyncio.sleep(0.05)
+            shed = await client.get("/api/v1/recipes/feed")
+            release.set()
+            return await first, shed
+
+    first, shed = asyncio.run(run())
+
+    assert first.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "1"
+    assert limiter.inflight == 0
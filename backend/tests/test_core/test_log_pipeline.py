@@ -0,0 +1,111 @@
+"""
+Tests for the queue-based logging pipeline
+"""
+
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from app.config.config import Config, setup_logging
+from app.core import log_pipeline
+from app.core.log_pipeline import NonBlockingQueueHandler, VolumeFilter, parse_rules, rule_for
+
+
+def make_record(name="app.api.recipes", level=logging.INFO, msg="User %s liked recipe %s", args=(1, 2)):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.fixture
+def pipeline_output():
+    """Route logging through the pipeline into a buffer; restore the app's setup afterwards"""
+    stream = io.StringIO()
+
+    def configure(**kwargs):
+        log_pipeline.configure(
+            level=logging.INFO, format_str="%(levelname)s %(name)s: %(message)s",
+            date_format=Config.LOG_DATE_FORMAT, stream=stream, **kwargs,
+        )
+        return stream
+
+    yield configure
+    log_pipeline.stop()
+    setup_logging()
+
+
+def test_parse_rules_and_ancestors():
+    """Test rule specs and ancestor matching"""
+    rules = parse_rules(" uvicorn.access=50, app.api=0.5,bad,=3")
+    assert rules == {"uvicorn.access": 50.0, "app.api": 0.5}
+    assert rule_for("app.api.recipes", rules) == 0.5
+    assert rule_for("app.services.catalog", rules) is None
+    assert rule_for("anything", {"": 2.0}) == 2.0
+
+
+def test_rate_limit_suppresses_and_reports():
+    """Test each message template gets its own budget and suppressed records are counted"""
+    volume_filter = VolumeFilter(rate_limits={"app.api": 2})
+
+    passed = [volume_filter.filter(make_record()) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    # A different call site has its own bucket
+    assert volume_filter.filter(make_record(msg="User %s unliked recipe %s"))
+    # Warnings are never limited
+    assert volume_filter.filter(make_record(level=logging.WARNING))
+
+    bucket = volume_filter._buckets[("app.api.recipes", "User %s liked recipe %s")]
+    bucket[0] = 1  # refilled
+    record = make_record()
+    assert volume_filter.filter(record)
+    assert record.suppressed == 3
+
+
+def test_sampling():
+    """Test sample rates keep none, all, or some records"""
+    assert not VolumeFilter(sample_rates={"uvicorn.access": 0}).filter(make_record("uvicorn.access"))
+    assert VolumeFilter(sample_rates={"uvicorn.access": 1}).filter(make_record("uvicorn.access"))
+    kept = sum(VolumeFilter(sample_rates={"": 0.5}).filter(make_record()) for _ in range(2000))
+    assert 800 < kept < 1200
+
+
+def test_queue_handler_is_lazy_and_non_blocking():
+    """Test records are enqueued unformatted and dropped when the queue is full"""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    record = make_record()
+
+    handler.handle(record)
+    handler.handle(make_record())
+
+    queued = handler.queue.get_nowait()
+    assert queued is record
+    assert queued.args == (1, 2)  # not formatted on the caller's thread
+    assert handler.dropped == 1
+
+
+def test_pipeline_writes_text(pipeline_output):
+    """Test records reach the output through the background listener"""
+    stream = pipeline_output()
+    logging.getLogger("app.test").info("Planned %d meals", 7)
+    logging.getLogger("app.test").debug("Not shown")
+    log_pipeline.stop()
+
+    assert stream.getvalue() == "INFO app.test: Planned 7 meals\n"
+
+
+def test_pipeline_writes_json(pipeline_output):
+    """Test JSON lines include extra fields and exceptions"""
+    stream = pipeline_output(json_output=True)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("app.test").exception("Failed for user %s", 3, extra={"route": "/feed"})
+    log_pipeline.stop()
+
+    entry = json.loads(stream.getvalue())
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "app.test"
+    assert entry["message"] == "Failed for user 3"
+    assert entry["route"] == "/feed"
+    assert "ValueError: boom" in entry["exception"]
@@ -0,0 +1,80 @@
+"""
+Tests for the event-loop lag monitor
+"""
+
+import asyncio
+import time
+
+from app.core.instrumentation import RequestTimingMiddleware
+from app.core.loop_monitor import BACKGROUND_ROUTE, LOOP_LAG, LOOP_STALLS, LoopLagMonitor
+
+
+class FeedRoute:
+    path = "/api/v1/recipes/feed"
+
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+
+async def blocking_endpoint(scope, receive, send):
+    scope["route"] = FeedRoute()
+    block_the_loop(0.3)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def ignore(message):
+    pass
+
+
+def run_with_monitor(monitor: LoopLagMonitor, work):
+    async def main():
+        task = asyncio.create_task(monitor.run())
+        await asyncio.sleep(0.05)
+        await work()
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(main())
+
+
+def test_lag_is_measured():
+    """Test every timer tick is recorded in the lag histogram"""
+    before = LOOP_LAG.count()
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.5)
+
+    run_with_monitor(monitor, lambda: asyncio.sleep(0.1))
+
+    assert LOOP_LAG.count() - before >= 5
+    assert list(monitor.stalls) == []
+
+
+def test_stall_attributed_to_route():
+    """Test a handler blocking the loop is reported with its route and stack"""
+    before = LOOP_STALLS.value("/api/v1/recipes/feed")
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1)
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/recipes/feed", "headers": []}
+
+    run_with_monitor(monitor, lambda: RequestTimingMiddleware(blocking_endpoint)(scope, None, ignore))
+
+    [stall] = monitor.recent_stalls()
+    assert stall["route"] == "/api/v1/recipes/feed"
+    assert stall["duration_ms"] >= 250
+    assert any("in block_the_loop" in frame for frame in stall["stack"])
+    assert any("in blocking_endpoint" in frame for frame in stall["stack"])
+    assert LOOP_STALLS.value("/api/v1/recipes/feed") == before + 1
+
+
+def test_stall_outside_request():
+    """Test blocking code outside a request counts as background"""
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1)
+
+    async def blocking_job():
+        block_the_loop(0.3)
+
+    run_with_monitor(monitor, blocking_job)
+
+    [stall] = monitor.recent_stalls()
+    assert stall["route"] == BACKGROUND_ROUTE
+    assert any("in blocking_job" in frame for frame in stall["stack"])
@@ -0,0 +1,93 @@
+"""
+Tests for the sampling profiler
+"""
+
+import asyncio
+import sys
+import threading
+
+import pytest
+
+from app.core import profiler
+from app.core.instrumentation import RequestTimingMiddleware
+from app.core.profiler import ProfilerBusy, SamplingProfiler, request_route
+
+
+def spin_for_profile(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@pytest.fixture
+def busy_thread():
+    stop = threading.Event()
+    thread = threading.Thread(target=spin_for_profile, args=(stop,), name="busy")
+    thread.start()
+    yield thread
+    stop.set()
+    thread.join()
+
+
+def test_collapsed_stacks(busy_thread):
+    """Test a busy thread shows up with its frames, outermost first"""
+    result = SamplingProfiler(interval=0.002).run(0.2)
+
+    assert result.samples > 10
+    busy_lines = [line for line in result.collapsed().splitlines() if line.startswith("busy;")]
+    assert busy_lines
+    stack, count = busy_lines[0].rsplit(" ", 1)
+    frames = stack.split(";")
+    assert frames[1].startswith("Thread._bootstrap")
+    assert any(frame.startswith("spin_for_profile (tests/test_core/test_profiler.py:") for frame in frames)
+    assert int(count) > 0
+
+
+def test_speedscope_document(busy_thread):
+    """Test the speedscope document references valid frames"""
+    result = SamplingProfiler(interval=0.002).run(0.1)
+    document = result.speedscope()
+
+    frames = document["shared"]["frames"]
+    profile = document["profiles"][0]
+    assert profile["unit"] == "seconds"
+    assert len(profile["samples"]) == len(profile["weights"])
+    assert all(0 <= index < len(frames) for stack in profile["samples"] for index in stack)
+    assert any(frame["name"] == "spin_for_profile" for frame in frames)
+    assert profile["endValue"] == pytest.approx(sum(profile["weights"]))
+
+
+def test_request_route():
+    """Test stacks are attributed to the route being served"""
+    class Route:
+        path = "/api/v1/recipes/feed"
+
+    seen = []
+
+    async def endpoint(scope, receive, send):
+        scope["route"] = Route()
+        seen.append(request_route(sys._getframe()))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/api/v1/recipes/feed", "headers": []}
+    asyncio.run(RequestTimingMiddleware(endpoint)(scope, None, send))
+
+    assert seen == ["/api/v1/recipes/feed"]
+    assert request_route(sys._getframe()) is None
+
+
+def test_route_filter_skips_other_stacks(busy_thread):
+    """Test only stacks serving the requested route are kept"""
+    result = SamplingProfiler(interval=0.002, route="/api/v1/recipes/feed").run(0.05)
+    assert result.samples > 0
+    assert result.stacks == {}
+
+
+def test_one_profile_at_a_time():
+    """Test a second profile is refused while one is running"""
+    with profiler._profile_lock:
+        with pytest.raises(ProfilerBusy):
+            profiler.profile(0.01, 0.005)
@@ -0,0 +1,70 @@
+"""
+Tests for read-your-writes tracking across requests
+"""
+
+import asyncio
+import time
+
+import httpx
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.read_your_writes import (
+    LAST_WRITE_COOKIE, LAST_WRITE_HEADER, ReadYourWritesMiddleware, is_sticky, mark_write, parse_last_write,
+)
+
+
+async def write(request):
+    mark_write()
+    return JSONResponse({"sticky": is_sticky()})
+
+
+async def read(request):
+    return JSONResponse({"sticky": is_sticky()})
+
+
+app = ReadYourWritesMiddleware(Starlette(routes=[Route("/write", write, methods=["POST"]), Route("/read", read)]))
+
+
+def run(requests):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return [await request(client) for request in requests]
+
+    return asyncio.run(main())
+
+
+def test_write_response_carries_last_write():
+    """Test a write sets the cookie and header, and the next read is sticky"""
+    written, after = run([
+        lambda client: client.post("/write"),
+        lambda client: client.get("/read"),
+    ])
+    [other] = run([lambda client: client.get("/read")])  # new client, no cookie
+
+    assert written.json() == {"sticky": True}
+    assert abs(float(written.headers[LAST_WRITE_HEADER]) - time.time()) < 5
+    assert f"{LAST_WRITE_COOKIE}=" in written.headers["set-cookie"]
+    assert after.json() == {"sticky": True}
+    assert LAST_WRITE_HEADER not in after.headers
+    assert other.json() == {"sticky": False}
+
+
+def test_header_without_cookie():
+    """Test clients without a cookie jar can send the header back"""
+    recent, stale = run([
+        lambda client: client.get("/read", headers={LAST_WRITE_HEADER: str(time.time())}),
+        lambda client: client.get("/read", headers={LAST_WRITE_HEADER: str(time.time() - 3600)}),
+    ])
+    assert recent.json() == {"sticky": True}
+    assert stale.json() == {"sticky": False}
+
+
+def test_parse_last_write():
+    """Test invalid values are ignored"""
+    assert parse_last_write("12.5") == 12.5
+    assert parse_last_write("nan") is None
+    assert parse_last_write("later") is None
+    assert parse_last_write(None) is None
@@ -0,0 +1,103 @@
+"""
+Tests for the readiness monitor
+"""
+
+import asyncio
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from app.core.readiness import ReadinessMonitor, pool_status
+
+
+@pytest.fixture
+def small_pool_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'ready.db'}", poolclass=QueuePool, pool_size=1, max_overflow=1,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_pool_status(small_pool_engine):
+    """Test pool usage against the limit"""
+    assert pool_status(small_pool_engine, 0.9) == {"ok": True, "in_use": 0, "capacity": 2}
+
+    held = [small_pool_engine.connect(), small_pool_engine.connect()]
+    assert pool_status(small_pool_engine, 0.9)["ok"] is False
+    assert pool_status(small_pool_engine, 1.5)["ok"] is True
+    for connection in held:
+        connection.close()
+
+
+def test_check_ready(small_pool_engine):
+    """Test a reachable database with spare connections is ready"""
+    monitor = ReadinessMonitor(interval=5, max_pool_usage=0.9)
+    with Session(small_pool_engine) as db:
+        assert monitor.check(db)
+
+    ready, body = monitor.snapshot()
+    assert ready
+    assert body["status"] == "ready"
+    assert body["checks"]["database"]["ok"] is True
+
+
+def test_check_saturated_pool(small_pool_engine):
+    """Test a pool at capacity makes the worker not ready"""
+    monitor = ReadinessMonitor(interval=5, max_pool_usage=0.5)
+    held = small_pool_engine.connect()
+    with Session(small_pool_engine) as db:
+        assert not monitor.check(db)
+    held.close()
+
+    ready, body = monitor.snapshot()
+    assert not ready
+    assert body["status"] == "not_ready"
+    assert body["checks"]["pool"] == {"ok": False, "in_use": 1, "capacity": 2}
+
+
+def test_check_failed_ping(small_pool_engine):
+    """Test a failing database ping makes the worker not ready"""
+    db = MagicMock()
+    db.get_bind.return_value = small_pool_engine
+    db.execute.side_effect = OperationalError("SELECT 1", {}, Exception("gone"))
+
+    monitor = ReadinessMonitor(interval=5)
+    assert not monitor.check(db)
+    assert monitor.snapshot()[1]["checks"]["database"] == {"ok": False, "error": "OperationalError"}
+
+
+def test_stale_result(small_pool_engine):
+    """Test a result older than three intervals is not trusted"""
+    monitor = ReadinessMonitor(interval=5)
+    with Session(small_pool_engine) as db:
+        monitor.check(db)
+    monitor.checked_at -= 16
+
+    ready, body = monitor.snapshot()
+    assert not ready
+    assert body["status"] == "stale"
+
+
+def test_run_rechecks_in_background(small_pool_engine):
+    """Test the background task refreshes the result"""
+    monitor = ReadinessMonitor(interval=0.01)
+
+    @contextmanager
+    def session_factory():
+        with Session(small_pool_engine) as db:
+            yield db
+
+    async def run_briefly():
+        task = asyncio.create_task(monitor.run(session_factory))
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(run_briefly())
+    assert monitor.checked_at is not None
+    assert monitor._ready
@@ -0,0 +1,59 @@
+"""
+Tests for request coalescing (single-flight)
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.single_flight import SingleFlight, make_key
+
+
+def test_concurrent_callers_share_one_computation():
+    """Test identical concurrent calls run the computation once"""
+    flight = SingleFlight("test")
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": 42}
+
+    async def run():
+        key = make_key("item", item_id=1)
+        return await asyncio.gather(*(flight.do(key, compute) for _ in range(10)))
+
+    results = asyncio.run(run())
+
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert len(flight) == 0
+
+
+def test_errors_propagate_and_key_is_released():
+    """Test waiters see the leader's exception and later calls run again"""
+    flight = SingleFlight("test")
+    attempts = 0
+
+    async def failing():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def run():
+        outcomes = await asyncio.gather(
+            *(flight.do("key", failing) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+        with pytest.raises(ValueError):
+            await flight.do("key", failing)
+
+    asyncio.run(run())
+    assert attempts == 2
+
+
+def test_make_key_ignores_parameter_order():
+    """Test keys are normalized"""
+    assert make_key("search", q="pasta", limit=20) == make_key("search", limit=20, q="pasta")
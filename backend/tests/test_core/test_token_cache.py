@@ -0,0 +1,43 @@
+"""
+Tests for the verified JWT claims cache
+"""
+
+import time
+
+from app.core.token_cache import TokenClaimsCache
+
+
+class TestTokenClaimsCache:
+    """Test expiry and eviction of cached claims"""
+
+    def test_hit_returns_claims(self):
+        cache = TokenClaimsCache(maxsize=10, max_ttl=60)
+        cache.put("token", {"id": 1, "exp": time.time() + 60})
+        assert cache.get("token")["id"] == 1
+
+    def test_entry_expires_at_token_exp(self):
+        cache = TokenClaimsCache(maxsize=10, max_ttl=60)
+        cache.put("token", {"id": 1, "exp": time.time() - 1})
+        assert cache.get("token") is None
+        assert len(cache) == 0
+
+    def test_entry_expires_at_max_ttl(self):
+        cache = TokenClaimsCache(maxsize=10, max_ttl=0)
+        cache.put("token", {"id": 1, "exp": time.time() + 60})
+        assert cache.get("token") is None
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TokenClaimsCache(maxsize=2, max_ttl=60)
+        cache.put("a", {"id": 1})
+        cache.put("b", {"id": 2})
+        cache.get("a")
+        cache.put("c", {"id": 3})
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_discard(self):
+        cache = TokenClaimsCache(maxsize=10, max_ttl=60)
+        cache.put("token", {"id": 1})
+        cache.discard("token")
+        assert cache.get("token") is None
@@ -0,0 +1,196 @@
+"""
+Tests for read-replica session routing
+"""
+
+import time
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, select, update
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config.config import Config
+from app.db import database
+from app.core import read_your_writes
+from app.core.read_your_writes import WriteTracker
+from app.db.database import RoutingSession
+
+MarkerBase = declarative_base()
+
+
+class Marker(MarkerBase):
+    __tablename__ = "marker"
+    id = Column(Integer, primary_key=True)
+    source = Column(String(20))
+
+
+def make_engine(source):
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    MarkerBase.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(Marker.__table__.insert().values(id=1, source=source))
+    return engine
+
+
+@pytest.fixture
+def make_session():
+    primary = make_engine("primary")
+    replica = make_engine("replica")
+    factory = sessionmaker(class_=RoutingSession, primary=primary, replicas=[replica])
+    sessions = []
+
+    def _make(read_only=True):
+        session = factory(read_only=read_only)
+        sessions.append(session)
+        return session
+
+    yield _make
+    for session in sessions:
+        session.close()
+
+
+@pytest.fixture
+def client_request():
+    """Run as a request from a client that last wrote at `last_write`"""
+    tokens = []
+
+    def _start(last_write=None):
+        tracker = WriteTracker(last_write)
+        tokens.append(read_your_writes._write_tracker.set(tracker))
+        return tracker
+
+    yield _start
+    for token in reversed(tokens):
+        read_your_writes._write_tracker.reset(token)
+
+
+def read_source(session):
+    return session.scalar(select(Marker.source).where(Marker.id == 1))
+
+
+class TestReplicaRouting:
+    """Test routing between primary and replica engines"""
+
+    def test_read_only_session_uses_replica(self, make_session):
+        assert read_source(make_session(read_only=True)) == "replica"
+
+    def test_write_request_uses_primary(self, make_session):
+        assert read_source(make_session(read_only=False)) == "primary"
+
+    def test_no_replicas_falls_back_to_primary(self):
+        primary = make_engine("primary")
+        session = RoutingSession(read_only=True, primary=primary, replicas=[])
+        try:
+            assert read_source(session) == "primary"
+        finally:
+            session.close()
+
+    def test_dml_in_read_only_session_goes_to_primary(self, make_session):
+        session = make_session(read_only=True)
+        session.execute(update(Marker).where(Marker.id == 1).values(source="written"))
+        # Subsequent reads in the same session must see the write
+        assert read_source(session) == "written"
+
+    def test_orm_flush_pins_session_to_primary(self, make_session):
+        session = make_session(read_only=True)
+        session.add(Marker(id=2, source="new"))
+        session.flush()
+        assert read_source(session) == "primary"
+
+
+class TestReadYourWrites:
+    """Test that a client's reads stick to the primary after its write"""
+
+    def test_commit_makes_request_sticky(self, make_session, client_request):
+        tracker = client_request()
+        writer = make_session(read_only=False)
+        writer.execute(update(Marker).where(Marker.id == 1).values(source="fresh"))
+        writer.commit()
+
+        assert tracker.wrote_at is not None
+        assert read_source(make_session(read_only=True)) == "fresh"
+
+    def test_recent_write_from_client_is_sticky(self, make_session, client_request):
+        client_request(last_write=time.time() - 1)
+        assert read_source(make_session(read_only=True)) == "primary"
+
+    def test_other_clients_use_replica(self, make_session, client_request):
+        client_request(last_write=None)
+        assert read_source(make_session(read_only=True)) == "replica"
+
+    def test_commit_without_writes_is_not_sticky(self, make_session, client_request):
+        tracker = client_request()
+        session = make_session(read_only=False)
+        read_source(session)
+        session.commit()
+        assert tracker.wrote_at is None
+
+    def test_stickiness_expires(self, make_session, client_request, monkeypatch):
+        client_request(last_write=time.time())
+        monkeypatch.setattr(Config, "REPLICA_STICKY_SECONDS", 0)
+        assert read_source(make_session(read_only=True)) == "replica"
+
+
+class TestGetDb:
+    """Test the request-aware database dependency"""
+
+    def test_session_is_routing_session(self, monkeypatch):
+        monkeypatch.setattr(database, "_engine", make_engine("primary"))
+        monkeypatch.setattr(database, "_replica_engines", [])
+        monkeypatch.setattr(database, "_session_factory", None)
+        generator = database.get_db()
+        session = next(generator)
+        try:
+            assert isinstance(session, RoutingSession)
+            assert session.read_only is False
+        finally:
+            generator.close()
+
+    def test_detached_session(self, monkeypatch):
+        """Test sessions opened outside a request honour overrides and read-only routing"""
+        monkeypatch.setattr(database, "_engine", make_engine("primary"))
+        monkeypatch.setattr(database, "_replica_engines", [make_engine("replica")])
+        monkeypatch.setattr(database, "_session_factory", None)
+
+        class App:
+            dependency_overrides = {}
+
+        with database.detached_session(App, read_only=True) as session:
+            assert read_source(session) == "replica"
+
+        override_engine = make_engine("override")
+        override_factory = sessionmaker(bind=override_engine)
+
+        def override():
+            with override_factory() as session:
+                yield session
+
+        App.dependency_overrides = {database.get_db: override}
+        with database.detached_session(App) as session:
+            assert read_source(session) == "override"
+
+
+class TestLazyEngine:
+    """Test engines are only created on first use"""
+
+    def test_missing_settings_fail_on_first_use(self, monkeypatch):
+        monkeypatch.setattr(database, "_engine", None)
+        monkeypatch.delenv("DB_USER", raising=False)
+        with pytest.raises(RuntimeError, match="DB_USER"):
+            database.get_engine()
+
+    def test_engine_is_created_once(self, monkeypatch):
+        for key, value in (("DB_USER", "dadly"), ("DB_PASSWORD", "secret"), ("DB_NAME", "dadly")):
+            monkeypatch.setenv(key, value)
+        monkeypatch.delenv("DB_HOST", raising=False)
+        monkeypatch.delenv("DB_PORT", raising=False)
+        monkeypatch.setattr(database, "_engine", None)
+
+        engine = database.get_engine()
+
+        assert database.get_engine() is engine
+        assert engine.url.render_as_string(hide_password=False) == "mysql+pymysql://dadly:secret@db:3306/dadly"
@@ -2,9 +2,22 @@
 Tests for main FastAPI app and general functionality
 """
 
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 from fastapi.testclient import TestClient
 
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+# Cumulative import time of app.main; generous so slow CI machines pass,
+# but a heavy eager import (or connecting at import) blows through it
+IMPORT_TIME_BUDGET_MS = 3000
+# Imported on first use instead of at startup
+DEFERRED_MODULES = ("jose", "bcrypt", "pymysql", "uvicorn", "dotenv", "pytz")
+
 
 def test_app_startup(client):
     """Test that the app starts up correctly"""
@@ -13,6 +26,23 @@ def test_app_startup(client):
     assert response.status_code == 200
 
 
+def test_startup_skips_preloaded_caches(db_session, monkeypatch):
+    """Test workers forked after the supervisor preloaded do not load again"""
+    from app import main
+    from app.services.catalog import recipe_catalog
+
+    calls = []
+    monkeypatch.setattr(main, "preload_caches", lambda: calls.append("preload"))
+    with TestClient(main.app):
+        pass
+    assert calls == ["preload"]
+
+    monkeypatch.setattr(recipe_catalog, "last_refresh", 1.0)
+    with TestClient(main.app):
+        pass
+    assert calls == ["preload"]
+
+
 def test_cors_headers(client):
     """Test that CORS headers can be verified on actual requests"""
     # In TestClient, we can't test CORS preflight (OPTIONS) the same way browsers do
@@ -32,4 +62,61 @@ def test_api_prefix(client):
     
     # Should not work without prefix
     response = client.get("/health")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+
+def test_large_responses_are_compressed(client):
+    """Test that responses above the size threshold are gzip-compressed"""
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == "gzip"
+
+    # Small responses stay uncompressed
+    response = client.get("/api/v1/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_server_timing_header(client, authenticated_user):
+    """Test that responses carry total and DB timings"""
+    response = client.get("/api/v1/pantry/", headers=authenticated_user["headers"])
+
+    server_timing = response.headers["server-timing"]
+    assert "app;dur=" in server_timing
+    assert "db;dur=" in server_timing
+    # Authenticated request loads at least the user row
+    assert '"0 queries"' not in server_timing
+
+
+def test_metrics_endpoint(client):
+    """Test Prometheus metrics include per-route histograms"""
+    client.get("/api/v1/health")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert "# TYPE dadly_http_request_duration_seconds histogram" in body
+    assert 'dadly_http_request_duration_seconds_count{method="GET",route="/api/v1/health"}' in body
+    assert "dadly_http_request_db_seconds_bucket" in body
+
+
+def test_import_time_budget():
+    """Test app.main imports fast, without configuration or deferred dependencies"""
+    env = {
+        key: value for key, value in os.environ.items()
+        if not key.startswith(("DB_", "JWT_")) and key != "CI"
+    }
+    check = (
+        "import sys, app.main; from app.config import config; "
+        f"print([m for m in {DEFERRED_MODULES!r} if m in sys.modules], config._env_loaded)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", check],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+    assert result.returncode == 0, result.stderr[-2000:]
+    # Neither .env nor pytz is touched until a setting is read
+    assert result.stdout.strip() == "[] False"
+    cumulative_us = int(re.search(r"\|\s*(\d+) \| app\.main$", result.stderr, re.MULTILINE).group(1))
+    assert cumulative_us / 1000 < IMPORT_TIME_BUDGET_MS
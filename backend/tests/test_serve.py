@@ -0,0 +1,70 @@
+"""
+Tests for the production server entry point
+"""
+
+import os
+import signal
+import time
+
+import pytest
+
+from app import serve
+from app.serve import WorkerSupervisor, max_requests, worker_count
+
+
+def test_worker_count():
+    """Test explicit WEB_CONCURRENCY wins, otherwise one worker per CPU"""
+    assert worker_count(3) == 3
+    assert worker_count(0) == len(os.sched_getaffinity(0))
+
+
+def test_max_requests_jitter():
+    """Test recycling is off at 0 and jittered within range otherwise"""
+    assert max_requests(0, 100) is None
+    limits = {max_requests(1000, 50) for _ in range(200)}
+    assert min(limits) >= 1000 and max(limits) <= 1050
+    assert len(limits) > 1
+
+
+@pytest.fixture
+def stop_after(monkeypatch):
+    """Call supervisor.stop() from SIGALRM (forking with a timer thread alive could deadlock)"""
+    monkeypatch.setattr(serve, "REAP_INTERVAL", 0.02)
+    previous = signal.getsignal(signal.SIGALRM)
+
+    def schedule(supervisor, seconds):
+        signal.signal(signal.SIGALRM, supervisor.stop)
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+
+    yield schedule
+    signal.setitimer(signal.ITIMER_REAL, 0)
+    signal.signal(signal.SIGALRM, previous)
+
+
+def test_supervisor_replaces_exited_workers_and_stops(stop_after):
+    """Test workers that exit are replaced and stop() terminates the rest"""
+    supervisor = WorkerSupervisor(lambda: time.sleep(0.1), workers=2, graceful_timeout=5)
+    stop_after(supervisor, 0.6)
+
+    started = time.monotonic()
+    supervisor.run()
+
+    assert supervisor.spawned > 2
+    assert supervisor.children == {}
+    assert time.monotonic() - started < 5
+
+
+def test_supervisor_kills_workers_after_graceful_timeout(stop_after):
+    """Test workers ignoring SIGTERM are killed once the drain period ends"""
+    def stubborn():
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        time.sleep(30)
+
+    supervisor = WorkerSupervisor(stubborn, workers=1, graceful_timeout=0.3)
+    stop_after(supervisor, 0.3)
+
+    started = time.monotonic()
+    supervisor.run()
+
+    assert supervisor.children == {}
+    assert time.monotonic() - started < 5
@@ -0,0 +1,118 @@
+"""
+Tests for the in-memory recipe catalog
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models.models import Recipe
+from app.services.catalog import RecipeCatalog
+
+
+def make_recipe(name, **overrides):
+    data = dict(name=name, prep_time=5, cook_time=10, difficulty="easy",
+                instructions="Cook", ingredients='["salt"]', image_url=f"https://img/{name}.jpg")
+    data.update(overrides)
+    return Recipe(**data)
+
+
+def test_full_load_and_card_lookup(db_session):
+    """Test first refresh loads every recipe into the catalog"""
+    recipes = [make_recipe("A"), make_recipe("B", difficulty="hard", like_count=3)]
+    db_session.add_all(recipes)
+    db_session.commit()
+
+    catalog = RecipeCatalog(refresh_interval=60)
+    assert catalog.refresh(db_session) == 2
+    assert len(catalog) == 2
+
+    card = catalog.card(recipes[1].id)
+    assert card == {
+        "id": recipes[1].id, "name": "B", "image_url": "https://img/B.jpg",
+        "prep_time": 5, "cook_time": 10, "difficulty": "hard", "like_count": 3,
+    }
+    assert catalog.card(9999) is None
+
+
+def test_cards_fetches_missing_ids_in_order(db_session):
+    """Test recipes created after the last refresh are loaded on demand"""
+    catalog = RecipeCatalog(refresh_interval=60)
+    catalog.refresh(db_session)
+
+    recipes = [make_recipe("New1"), make_recipe("New2")]
+    db_session.add_all(recipes)
+    db_session.commit()
+
+    ids = [recipes[1].id, recipes[0].id]
+    assert [card["id"] for card in catalog.cards(db_session, ids)] == ids
+
+
+def test_like_count_write_through(db_session):
+    """Test like counts can be updated without a refresh"""
+    recipe = make_recipe("Liked")
+    db_session.add(recipe)
+    db_session.commit()
+
+    catalog = RecipeCatalog(refresh_interval=60)
+    catalog.refresh(db_session)
+    catalog.set_like_count(recipe.id, 7)
+
+    assert catalog.card(recipe.id)["like_count"] == 7
+
+
+def test_refresh_reads_rows_committed_late(db_session):
+    """Test a row committed after the watermark moved past its timestamp is read by the delta"""
+    db_session.add(make_recipe("Early"))
+    db_session.commit()
+    catalog = RecipeCatalog(refresh_interval=60)
+    catalog.refresh(db_session)
+    last_full_reload = catalog.watermark.last_full_reload
+
+    late = make_recipe("Late", updated_at=catalog.watermark.updated_at - timedelta(seconds=10))
+    db_session.add(late)
+    db_session.commit()
+    catalog.refresh(db_session)
+
+    assert catalog.card(late.id)["name"] == "Late"
+    assert catalog.watermark.last_full_reload == last_full_reload
+
+
+def test_refresh_evicts_deleted_recipes(db_session):
+    """Test a deleted recipe is dropped once the row count no longer matches"""
+    recipes = [make_recipe("Kept"), make_recipe("Deleted")]
+    db_session.add_all(recipes)
+    db_session.commit()
+    catalog = RecipeCatalog(refresh_interval=60)
+    catalog.refresh(db_session)
+    kept_id, deleted_id = recipes[0].id, recipes[1].id
+
+    db_session.delete(recipes[1])
+    db_session.commit()
+    catalog.refresh(db_session)
+
+    assert catalog.card(deleted_id) is None
+    assert catalog.card(kept_id) is not None
+    assert len(catalog) == 1
+
+
+def test_full_reload_picks_up_changes_outside_the_window(db_session):
+    """Test the periodic full reload reads changes that kept an old updated_at"""
+    recipe = make_recipe("Popular", updated_at=datetime.now() - timedelta(days=1))
+    db_session.add_all([recipe, make_recipe("Fresh")])
+    db_session.commit()
+    catalog = RecipeCatalog(refresh_interval=60)
+    catalog.refresh(db_session)
+
+    # Another worker's like leaves updated_at alone
+    db_session.execute(update(Recipe).where(Recipe.id == recipe.id).values(
+        like_count=5, updated_at=Recipe.updated_at
+    ))
+    db_session.commit()
+    catalog.refresh(db_session)
+    assert catalog.card(recipe.id)["like_count"] == 0
+
+    catalog.watermark.full_reload_interval = 0
+    catalog.refresh(db_session)
+    assert catalog.card(recipe.id)["like_count"] == 5
@@ -0,0 +1,41 @@
+"""
+Tests for the shared guest feed pool
+"""
+
+import json
+
+import pytest
+
+from app.models.models import Recipe
+from app.services.guest_feed import GuestFeedPool
+
+
+def test_sample_is_distinct_and_capped(db_session):
+    """Test samples contain distinct cards and never exceed the pool"""
+    db_session.add_all([
+        Recipe(name=f"R{i}", prep_time=1, cook_time=1, difficulty="easy",
+               instructions="Cook", ingredients='["salt"]')
+        for i in range(5)
+    ])
+    db_session.commit()
+
+    pool = GuestFeedPool(size=4, refresh_interval=60)
+    assert pool.refresh(db_session) == 4
+
+    cards = json.loads(pool.sample_json(3))
+    assert len(cards) == 3
+    assert len({card["id"] for card in cards}) == 3
+    assert len(json.loads(pool.sample_json(50))) == 4
+
+
+def test_empty_pool_loads_on_demand(db_session):
+    """Test an empty pool refreshes on the request path"""
+    pool = GuestFeedPool(size=10, refresh_interval=60)
+    assert json.loads(pool.sample_json(5)) == []
+
+    db_session.add(Recipe(name="Late", prep_time=1, cook_time=1, difficulty="easy",
+                          instructions="Cook", ingredients='["salt"]'))
+    db_session.commit()
+    pool.ensure_loaded(db_session)
+
+    assert [card["name"] for card in json.loads(pool.sample_json(5))] == ["Late"]
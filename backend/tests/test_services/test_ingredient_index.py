@@ -0,0 +1,68 @@
+"""
+Tests for the inverted ingredient index
+"""
+
+from app.models.models import Recipe
+from app.services.ingredient_index import IngredientIndex, parse_ingredients
+
+
+def test_parse_ingredients_canonicalizes_and_dedupes():
+    """Test ingredient lists are lowercased, stripped and deduplicated"""
+    assert parse_ingredients('[" Salt", "egg", "salt", 3, ""]') == ["salt", "egg"]
+    assert parse_ingredients("not json") == []
+    assert parse_ingredients(None) == []
+
+
+def test_full_coverage_and_missing_k():
+    """Test exact coverage and recipes missing at most k ingredients"""
+    index = IngredientIndex(refresh_interval=60)
+    index.add(1, ["egg", "salt"])
+    index.add(2, ["egg", "salt", "butter"])
+    index.add(3, ["flour", "sugar", "butter"])
+
+    assert index.match(["Egg", "salt", "milk"]) == [(1, [])]
+    assert index.match(["egg", "salt"], max_missing=1) == [(1, []), (2, ["butter"])]
+    # Recipes sharing nothing with the pantry are never returned
+    assert index.match(["milk"], max_missing=3) == []
+
+
+def test_reindex_replaces_postings():
+    """Test re-adding a recipe drops its old ingredients"""
+    index = IngredientIndex(refresh_interval=60)
+    index.add(1, ["egg", "salt"])
+    index.add(1, ["rice"])
+
+    assert index.match(["egg", "salt"]) == []
+    assert index.match(["rice"]) == [(1, [])]
+    assert len(index) == 1
+
+
+def test_refresh_from_database(db_session):
+    """Test recipes are indexed from the database"""
+    recipe = Recipe(name="Omelette", prep_time=1, cook_time=2, difficulty="easy",
+                    instructions="Cook", ingredients='["egg", "salt"]')
+    db_session.add(recipe)
+    db_session.commit()
+
+    index = IngredientIndex(refresh_interval=60)
+    assert index.refresh(db_session) == 1
+    assert index.match(["egg", "salt"]) == [(recipe.id, [])]
+
+
+def test_refresh_evicts_deleted_recipes(db_session):
+    """Test a deleted recipe stops matching after the next refresh"""
+    recipes = [
+        Recipe(name=name, prep_time=1, cook_time=2, difficulty="easy", instructions="Cook", ingredients='["rice"]')
+        for name in ("Kept", "Deleted")
+    ]
+    db_session.add_all(recipes)
+    db_session.commit()
+    index = IngredientIndex(refresh_interval=60)
+    index.refresh(db_session)
+    kept_id = recipes[0].id
+
+    db_session.delete(recipes[1])
+    db_session.commit()
+    index.refresh(db_session)
+
+    assert index.match(["rice"]) == [(kept_id, [])]
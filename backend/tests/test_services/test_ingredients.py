@@ -0,0 +1,78 @@
+"""
+Tests for ingredient canonicalization
+"""
+
+from app.services.ingredients import (
+    IngredientCanonicalizer,
+    core_name,
+    normalize_text,
+    plural_forms,
+    singular_forms,
+)
+
+
+def test_plurals_and_synonyms_unify():
+    """Test plural and synonym forms map to one canonical name"""
+    canonicalizer = IngredientCanonicalizer()
+
+    for name in ("Tomatoes", "tomato", "cherry tomatoes", "2 Roma Tomatoes"):
+        assert canonicalizer.canonicalize(name) == "tomato"
+    assert canonicalizer.canonicalize("Scallions") == "green onion"
+    assert canonicalizer.canonicalize("bay leaves") == "bay leaf"
+
+
+def test_word_boundaries_and_longest_match():
+    """Test matches respect word boundaries and prefer the longest pattern"""
+    canonicalizer = IngredientCanonicalizer()
+
+    assert canonicalizer.canonicalize("eggplant") == "eggplant"
+    assert canonicalizer.canonicalize("Extra-virgin olive oil") == "olive oil"
+    assert canonicalizer.canonicalize("red bell peppers, diced") == "bell pepper"
+
+
+def test_canonicalize_needs_whole_phrase():
+    """Test a dictionary word inside a longer name does not rename it"""
+    canonicalizer = IngredientCanonicalizer()
+
+    assert canonicalizer.canonicalize("Almond milk") == "almond milk"
+    assert canonicalizer.canonicalize("Peanut Butter") == "peanut butter"
+    assert canonicalizer.canonicalize("coconut milk") == "coconut milk"
+    assert canonicalizer.canonicalize("Garlic powder") == "garlic powder"
+    assert canonicalizer.canonicalize("salt and pepper") == "salt and pepper"
+    assert canonicalizer.terms("2 tbsp peanut butter") == ["peanut butter"]
+
+
+def test_recipe_line_terms():
+    """Test a recipe line yields every ingredient it mentions"""
+    canonicalizer = IngredientCanonicalizer()
+
+    assert canonicalizer.terms("Salt and black pepper to taste") == ["salt", "pepper"]
+    assert canonicalizer.terms("3 large eggs, beaten") == ["egg"]
+    # Unknown ingredients fall back to their normalized text
+    assert canonicalizer.terms("  Dragon Fruit ") == ["dragon fruit"]
+    assert canonicalizer.terms("") == []
+
+
+def test_unknown_ingredient_core_name():
+    """Test out-of-vocabulary lines drop amount, unit and descriptors"""
+    canonicalizer = IngredientCanonicalizer()
+
+    for line in ("2 cups quinoa", "1½ cups cooked quinoa, rinsed", "500g Quinoa", "Quinoa"):
+        assert canonicalizer.terms(line) == ["quinoa"]
+        assert canonicalizer.canonicalize(line) == "quinoa"
+    assert core_name("3 dragon fruits") == "dragon fruits"
+    assert core_name("1 pinch of saffron") == "saffron"
+    # Nothing but an amount: keep the line rather than an empty name
+    assert core_name("2 cups") == "2 cups"
+
+
+def test_helpers():
+    """Test text normalization and plural generation"""
+    assert normalize_text("  All-Purpose   FLOUR ") == "all purpose flour"
+    assert plural_forms("potato") == {"potatoes", "potatos"}
+    assert plural_forms("red cherry") == {"red cherries"}
+    assert plural_forms("peach") == {"peaches"}
+    assert singular_forms("peanuts") == {"peanut"}
+    assert singular_forms("bay leaves") == {"bay leaf"}
+    assert "cheese" in singular_forms("cheeses")
+    assert singular_forms("hummus") == set()
@@ -0,0 +1,107 @@
+"""
+Tests for the meal-plan solver and dietary exclusions
+"""
+
+import itertools
+import random
+
+from app.services.meal_plan import (
+    BUY_PENALTY,
+    MealCandidate,
+    MealPlanSolver,
+    allergen_phrases,
+    excluded_ingredients,
+    mentions_any,
+)
+
+
+def bits(*positions):
+    return sum(1 << position for position in positions)
+
+
+def plan_score(candidates, pantry_mask):
+    hits = sum((c.mask & pantry_mask).bit_count() for c in candidates)
+    bought = 0
+    for candidate in candidates:
+        bought |= candidate.mask & ~pantry_mask
+    return hits - BUY_PENALTY * bought.bit_count()
+
+
+def test_excluded_ingredients():
+    """Test diets and allergies map to canonical ingredients"""
+    assert excluded_ingredients("none", None) == set()
+    assert "chicken" in excluded_ingredients("vegetarian", None)
+    assert {"egg", "milk", "beef"} <= excluded_ingredients("vegan", "")
+    assert {"flour", "nut", "butter"} <= excluded_ingredients("gluten_free", "Nuts, dairy")
+    assert "mushroom" in excluded_ingredients(None, "mushrooms and shellfish")
+    assert "shrimp" in excluded_ingredients(None, "mushrooms and shellfish")
+
+
+def test_peanut_allergy_matches_raw_text():
+    """Test a peanut allergy rules out peanut butter, in singular or plural"""
+    for allergies in ("peanut", "Peanuts"):
+        assert excluded_ingredients(None, allergies) == {"peanut"}
+        phrases = allergen_phrases(allergies)
+        assert mentions_any('["2 tbsp peanut butter", "bread"]', phrases)
+        assert mentions_any('["Crushed peanuts"]', phrases)
+        assert not mentions_any('["walnuts", "butter"]', phrases)
+
+
+def test_prefers_pantry_and_shared_purchases():
+    """Test meals that share what has to be bought beat separate purchases"""
+    pantry = bits(0, 1)
+    candidates = [
+        MealCandidate(1, bits(0, 1, 5), 30),
+        MealCandidate(2, bits(0, 6), 30),
+        MealCandidate(3, bits(1, 5), 30),
+    ]
+    plan = MealPlanSolver(candidates, pantry, meals=2).solve(1.0)
+
+    assert plan.complete
+    assert sorted(plan.recipe_ids) == [1, 3]
+    assert plan.score == 3 - BUY_PENALTY
+
+
+def test_respects_time_budget():
+    """Test the total cooking time never exceeds max_total_time"""
+    candidates = [
+        MealCandidate(1, bits(0, 1, 2), 90),
+        MealCandidate(2, bits(0), 20),
+        MealCandidate(3, bits(1), 20),
+    ]
+    plan = MealPlanSolver(candidates, bits(0, 1, 2), meals=2, max_total_time=60).solve(1.0)
+    assert sorted(plan.recipe_ids) == [2, 3]
+
+    plan = MealPlanSolver(candidates, bits(0, 1, 2), meals=3, max_total_time=10).solve(1.0)
+    assert plan.recipe_ids == []
+
+
+def test_matches_exhaustive_search():
+    """Test the search finds the optimal plan on small random instances"""
+    rng = random.Random(7)
+    for _ in range(20):
+        pantry = rng.getrandbits(12)
+        candidates = [
+            MealCandidate(recipe_id, rng.getrandbits(12), rng.randint(10, 60))
+            for recipe_id in range(9)
+        ]
+        plan = MealPlanSolver(candidates, pantry, meals=3, max_total_time=120).solve(5.0)
+
+        feasible = [
+            combo for combo in itertools.combinations(candidates, 3)
+            if sum(c.total_time for c in combo) <= 120
+        ]
+        if feasible:
+            assert len(plan.recipe_ids) == 3
+            assert abs(plan.score - max(plan_score(combo, pantry) for combo in feasible)) < 1e-9
+
+
+def test_deadline_returns_best_so_far(monkeypatch):
+    """Test an expired deadline still returns the greedy plan"""
+    monkeypatch.setattr("app.services.meal_plan.DEADLINE_CHECK_INTERVAL", 1)
+    rng = random.Random(3)
+    candidates = [MealCandidate(recipe_id, rng.getrandbits(64), 30) for recipe_id in range(400)]
+    plan = MealPlanSolver(candidates, rng.getrandbits(64), meals=7).solve(0.0)
+
+    assert not plan.complete
+    assert len(plan.recipe_ids) == 7
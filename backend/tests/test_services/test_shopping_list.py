@@ -0,0 +1,77 @@
+"""
+Tests for shopping-list aggregation and quantity parsing
+"""
+
+import json
+
+from app.services.quantities import Quantity, format_quantity, normalize_quantity, parse_quantity
+from app.services.shopping_list import build_shopping_list
+
+
+def test_parse_quantity():
+    """Test amounts, fractions and unit aliases"""
+    assert parse_quantity("2 cups flour") == Quantity(2.0, "cup")
+    assert parse_quantity("1 1/2 tbsp sugar") == Quantity(1.5, "tbsp")
+    assert parse_quantity("500g") == Quantity(500.0, "g")
+    assert parse_quantity("1,5 l milk") == Quantity(1.5, "l")
+    assert parse_quantity("3 eggs") == Quantity(3.0, None)
+    assert parse_quantity("salt to taste") is None
+    assert parse_quantity("1/0 cup") is None
+    assert parse_quantity("½ tsp salt") == Quantity(0.5, "tsp")
+    assert parse_quantity("1½ cups milk") == Quantity(1.5, "cup")
+    assert parse_quantity("12/3 cup") == Quantity(4.0, "cup")
+    assert format_quantity(2.0, "cup") == "2 cup"
+    assert format_quantity(0.3333, None) == "0.33"
+
+
+def test_normalize_quantity():
+    """Test conversion to grams, millilitres and counts"""
+    assert normalize_quantity("1.5 kg") == Quantity(1500.0, "g")
+    assert normalize_quantity("2 lb") == Quantity(2 * 453.59237, "g")
+    assert normalize_quantity("1 l") == Quantity(1000.0, "ml")
+    assert normalize_quantity("3 tsp") == Quantity(3 * 4.92892159375, "ml")
+    assert normalize_quantity("2 cloves") == Quantity(2.0, "clove")
+    assert normalize_quantity("6") == Quantity(6.0, None)
+    assert normalize_quantity("a handful") is None
+    assert normalize_quantity(None) is None
+
+
+def test_merges_quantities_and_subtracts_pantry():
+    """Test shared ingredients merge per unit and pantry items are excluded"""
+    recipes = [
+        (1, json.dumps(["2 cups flour", "2 eggs", "1 tsp salt"])),
+        (2, json.dumps(["1 cup all-purpose flour", "4 tbsp flour", "100 g flour", "Salt and pepper"])),
+    ]
+
+    result = build_shopping_list(recipes, pantry=[("Salt", None, None)])
+
+    assert result["in_pantry"] == ["salt"]
+    items = {item["ingredient"]: item for item in result["items"]}
+    assert set(items) == {"flour", "egg", "pepper"}
+    # Volumes merge into the first unit seen; mass stays separate
+    assert items["flour"]["quantities"] == ["3.25 cup", "100 g"]
+    assert items["flour"]["recipe_ids"] == [1, 2]
+    assert items["egg"]["quantities"] == ["2"]
+    # Lines naming several ingredients carry no quantity
+    assert items["pepper"]["quantities"] == []
+
+
+def test_pantry_amounts_are_subtracted():
+    """Test stored pantry amounts reduce or cover what recipes need"""
+    recipes = [
+        (1, json.dumps(["500 g flour", "1 cup milk", "2 eggs"])),
+        (2, json.dumps(["0.5 kg flour", "1 tbsp sugar"])),
+    ]
+    pantry = [
+        ("flour", *normalize_quantity("600 g")),
+        ("whole milk", *normalize_quantity("1 l")),
+        ("egg", 1.0, None),
+        ("sugar", None, None),
+    ]
+
+    result = build_shopping_list(recipes, pantry)
+
+    assert result["in_pantry"] == ["milk", "sugar"]
+    items = {item["ingredient"]: item for item in result["items"]}
+    assert items["flour"]["quantities"] == ["400 g"]
+    assert items["egg"]["quantities"] == ["1"]
@@ -0,0 +1,94 @@
+"""
+Tests for the MinHash/LSH similar-recipe index
+"""
+
+from app.models.models import Recipe, RecipeSignature
+from app.services.similarity import SimilarityIndex, estimate_similarity, minhash
+
+BASE = ["egg", "flour", "sugar", "butter", "milk", "vanilla", "salt", "baking powder"]
+
+
+def make_recipe(name, ingredients):
+    import json
+    return Recipe(name=name, prep_time=1, cook_time=2, difficulty="easy",
+                  instructions="Cook", ingredients=json.dumps(ingredients))
+
+
+def test_signature_estimates_jaccard():
+    """Test identical sets match exactly and disjoint sets do not"""
+    assert minhash(BASE) == minhash(list(reversed(BASE)))
+    assert estimate_similarity(minhash(BASE), minhash(BASE)) == 1.0
+    assert estimate_similarity(minhash(BASE), minhash(["rice", "beef", "soy sauce"])) < 0.2
+    assert minhash([]) is None
+
+
+def test_query_ranks_similar_recipes():
+    """Test close ingredient sets are found and unrelated ones are not"""
+    index = SimilarityIndex(refresh_interval=60)
+    index.add(1, minhash(BASE))
+    index.add(2, minhash(BASE[:-1] + ["cinnamon"]))
+    index.add(3, minhash(["rice", "beef", "soy sauce", "ginger", "garlic"]))
+
+    results = index.query(index.signature(1), limit=5, exclude=1)
+    assert [recipe_id for recipe_id, _ in results] == [2]
+    assert results[0][1] > 0.5
+
+
+def test_refresh_persists_and_reloads_signatures(db_session):
+    """Test signatures are stored and reused by a fresh index"""
+    recipes = [make_recipe("Cake", BASE), make_recipe("Cake 2", BASE)]
+    db_session.add_all(recipes)
+    db_session.commit()
+
+    index = SimilarityIndex(refresh_interval=60)
+    assert index.refresh(db_session, persist=True) == 2
+    assert db_session.query(RecipeSignature).count() == 2
+
+    reloaded = SimilarityIndex(refresh_interval=60)
+    assert reloaded.refresh(db_session) == 0
+    assert reloaded.query(reloaded.signature(recipes[0].id), limit=5, exclude=recipes[0].id) == [
+        (recipes[1].id, 1.0)
+    ]
+
+
+def test_refresh_rehashes_only_changed_ingredients(db_session):
+    """Test re-read rows with unchanged ingredients are not re-hashed, ingredient edits are"""
+    import json
+    from datetime import datetime, timedelta
+    from sqlalchemy import update
+
+    cake, bread = make_recipe("Cake", BASE), make_recipe("Bread", ["flour", "salt", "yeast"])
+    db_session.add_all([cake, bread])
+    db_session.commit()
+    index = SimilarityIndex(refresh_interval=60)
+    assert index.refresh(db_session, persist=True) == 2
+
+    db_session.execute(update(Recipe).where(Recipe.id == cake.id).values(like_count=Recipe.like_count + 1))
+    db_session.commit()
+    assert index.refresh(db_session) == 0
+    assert SimilarityIndex(refresh_interval=60).refresh(db_session) == 0
+
+    # Explicit later timestamp: SQLite's CURRENT_TIMESTAMP has one-second resolution
+    db_session.execute(update(Recipe).where(Recipe.id == bread.id).values(
+        ingredients=json.dumps(["flour", "water"]), updated_at=datetime.now() + timedelta(minutes=1),
+    ))
+    db_session.commit()
+    assert index.refresh(db_session) == 1
+
+
+def test_index_recipes_flags_near_duplicates(db_session):
+    """Test the import hook reports near-duplicates of existing recipes"""
+    index = SimilarityIndex(refresh_interval=60)
+    original = make_recipe("Cake", BASE)
+    db_session.add(original)
+    db_session.flush()
+    assert index.index_recipes(db_session, [original]) == {}
+
+    copy = make_recipe("Cake (copy)", BASE)
+    db_session.add(copy)
+    db_session.flush()
+    duplicates = index.index_recipes(db_session, [copy])
+    db_session.commit()
+
+    assert duplicates == {copy.id: [(original.id, 1.0)]}
+    assert index.near_duplicates(BASE) != []